@@ -0,0 +1,315 @@
+from fcntl import flock, LOCK_EX
+from json import dumps, loads
+from os import unlink
+from queue import Queue, Full
+from socket import socket, AF_UNIX, SOCK_STREAM
+from struct import pack, unpack
+from threading import Thread, Lock, RLock
+from time import sleep
+from typing import Hashable, Optional, Tuple, Any, Iterable
+
+from services.brokers import IBroker, LocalBroker, room_message_handler
+
+
+class _FrameSocket:
+    """Socket exchanging length-prefixed JSON frames."""
+
+    def __init__(self, socket_: socket):
+        self.socket = socket_
+        self._sending_lock = Lock()
+
+    def send(self, *frame: Any) -> None:
+        self.send_many((frame, ))
+
+    def send_many(self, frames: Iterable[Tuple]) -> None:
+        payloads = tuple(dumps(frame, separators=(',', ':')).encode() for frame in frames)
+        data = b"".join(pack("!I", len(payload)) + payload for payload in payloads)
+
+        with self._sending_lock:
+            self.socket.sendall(data)
+
+    def receive(self) -> Optional[list]:
+        header = self._receive_exactly(4)
+
+        if header is None:
+            return None
+
+        payload = self._receive_exactly(unpack("!I", header)[0])
+
+        return loads(payload) if payload is not None else None
+
+    def close(self) -> None:
+        self.socket.close()
+
+    def _receive_exactly(self, size: int) -> Optional[bytes]:
+        chunks = list()
+
+        while size:
+            chunk = self.socket.recv(min(size, 1 << 16))
+
+            if not chunk:
+                return None
+
+            chunks.append(chunk)
+            size -= len(chunk)
+
+        return b"".join(chunks)
+
+
+class _Peer:
+    """
+    Broker process connected to the hub with its own queue of frames written
+    by its own thread, so that a slow process delays only its own frames.
+
+    A process whose queue is full is disconnected to reconnect and resubscribe.
+    """
+
+    def __init__(self, connection: _FrameSocket, queue_size: int):
+        self.connection = connection
+        self._queue = Queue[Optional[Tuple]](queue_size)
+
+        Thread(target=self._write_forever, daemon=True).start()
+
+    def offer(self, *frame: Any) -> bool:
+        try:
+            self._queue.put_nowait(frame)
+        except Full:
+            self.close()
+            return False
+
+        return True
+
+    def close(self) -> None:
+        try:
+            self._queue.put_nowait(None)
+        except Full:
+            pass
+
+        self.connection.close()
+
+    def _write_forever(self) -> None:
+        while (frame := self._queue.get()) is not None:
+            frames = [frame]
+
+            while not self._queue.empty() and (frame := self._queue.get_nowait()) is not None:
+                frames.append(frame)
+
+            try:
+                self.connection.send_many(frames)
+            except OSError:
+                return
+
+            if frame is None:
+                return
+
+
+class UnixSocketBrokerHub:
+    """
+    Relay between broker processes connected through a Unix domain socket.
+
+    Processes subscribe once per room regardless of the number of their own
+    subscribers, so each message published by one process is sent to each
+    other subscribed process exactly once. Messages are queued to each
+    process and written by its own thread, batching frames queued meanwhile.
+    """
+
+    def __init__(self, path: str, *, peer_queue_size: int = 4096):
+        self.path = path
+        self.peer_queue_size = peer_queue_size
+
+        self._listening_socket = socket(AF_UNIX, SOCK_STREAM)
+        self._listening_socket.bind(path)
+        self._listening_socket.listen(128)
+
+        self._rooms_by_worker: dict[_Peer, set[Hashable]] = dict()
+        self._workers_by_room: dict[Hashable, set[_Peer]] = dict()
+        self._lock = RLock()
+
+    def serve_forever(self) -> None:
+        while True:
+            try:
+                worker_socket, _ = self._listening_socket.accept()
+            except OSError:
+                return
+
+            Thread(
+                target=self._serve,
+                args=(_Peer(_FrameSocket(worker_socket), self.peer_queue_size), ),
+                daemon=True
+            ).start()
+
+    def close(self) -> None:
+        self._listening_socket.close()
+
+        try:
+            unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def _serve(self, worker: _Peer) -> None:
+        with self._lock:
+            self._rooms_by_worker[worker] = set()
+
+        try:
+            while (frame := worker.connection.receive()) is not None:
+                kind, room, *arguments = frame
+
+                if kind == "publish":
+                    self._relay(worker, room, arguments[0])
+                elif kind == "subscribe":
+                    self._subscribe(worker, room)
+                elif kind == "unsubscribe":
+                    self._unsubscribe(worker, room)
+        except OSError:
+            pass
+        finally:
+            with self._lock:
+                for room in tuple(self._rooms_by_worker.pop(worker)):
+                    self._unsubscribe(worker, room)
+
+            worker.close()
+
+    def _relay(self, publisher: _Peer, room: Hashable, message: str) -> None:
+        with self._lock:
+            workers = tuple(self._workers_by_room.get(room, tuple()))
+
+        for worker in workers:
+            if worker is not publisher:
+                worker.offer("message", room, message)
+
+    def _subscribe(self, worker: _Peer, room: Hashable) -> None:
+        with self._lock:
+            self._rooms_by_worker[worker].add(room)
+            self._workers_by_room.setdefault(room, set()).add(worker)
+
+    def _unsubscribe(self, worker: _Peer, room: Hashable) -> None:
+        with self._lock:
+            self._rooms_by_worker.get(worker, set()).discard(room)
+            workers = self._workers_by_room.get(room, set())
+            workers.discard(worker)
+
+            if not workers:
+                self._workers_by_room.pop(room, None)
+
+
+class UnixSocketBroker(IBroker):
+    """
+    Broker connecting processes of one host through a Unix domain socket.
+
+    The first process that can't connect to the socket hosts the hub in a
+    background thread. If the hub disappears, the process reconnects, hosting
+    the hub itself if nobody else does, and restores its room subscriptions.
+
+    Rooms and messages must be JSON serializable.
+    """
+
+    def __init__(self, path: str, *, reconnection_delay: float = 0.1):
+        self.path = path
+        self.reconnection_delay = reconnection_delay
+
+        self._local_broker = LocalBroker()
+        self._subscription_lock = RLock()
+        self._hub: Optional[UnixSocketBrokerHub] = None
+        self._connection = self._connect()
+
+        Thread(target=self._receive_forever, daemon=True).start()
+
+    @property
+    def is_hosting(self) -> bool:
+        return self._hub is not None
+
+    def publish(self, room: Hashable, message: str) -> None:
+        self._local_broker.publish(room, message)
+
+        try:
+            self._connection.send("publish", room, message)
+        except OSError:
+            pass
+
+    def subscribe(self, room: Hashable, handler: room_message_handler) -> None:
+        with self._subscription_lock:
+            is_first_subscription = not self._local_broker.has_subscribers_of(room)
+            self._local_broker.subscribe(room, handler)
+
+            if is_first_subscription:
+                self._send_quietly("subscribe", room)
+
+    def unsubscribe(self, room: Hashable, handler: room_message_handler) -> None:
+        with self._subscription_lock:
+            self._local_broker.unsubscribe(room, handler)
+
+            if not self._local_broker.has_subscribers_of(room):
+                self._send_quietly("unsubscribe", room)
+
+    def _send_quietly(self, *frame: Any) -> None:
+        try:
+            self._connection.send(*frame)
+        except OSError:
+            pass
+
+    def _receive_forever(self) -> None:
+        while True:
+            try:
+                while (frame := self._connection.receive()) is not None:
+                    _, room, message = frame
+                    self._local_broker.publish(room, message)
+            except OSError:
+                pass
+
+            sleep(self.reconnection_delay)
+            self._reconnect()
+
+    def _reconnect(self) -> None:
+        with self._subscription_lock:
+            self._connection.close()
+            self._connection = self._connect()
+
+            for room in self._local_broker.rooms:
+                self._send_quietly("subscribe", room)
+
+    def _connect(self) -> _FrameSocket:
+        while True:
+            connection = self._try_to_connect()
+
+            if connection is not None:
+                return connection
+
+            if self._try_to_host():
+                continue
+
+            sleep(self.reconnection_delay)
+
+    def _try_to_connect(self) -> Optional[_FrameSocket]:
+        connection_socket = socket(AF_UNIX, SOCK_STREAM)
+
+        try:
+            connection_socket.connect(self.path)
+        except (FileNotFoundError, ConnectionRefusedError):
+            connection_socket.close()
+            return None
+
+        return _FrameSocket(connection_socket)
+
+    def _try_to_host(self) -> bool:
+        with open(f"{self.path}.lock", "w") as lock_file:
+            flock(lock_file, LOCK_EX)
+
+            connection = self._try_to_connect()
+
+            if connection is not None:
+                connection.close()
+                return True
+
+            try:
+                unlink(self.path)
+            except FileNotFoundError:
+                pass
+
+            try:
+                self._hub = UnixSocketBrokerHub(self.path)
+            except OSError:
+                return False
+
+        Thread(target=self._hub.serve_forever, daemon=True).start()
+
+        return True
@@ -0,0 +1,174 @@
+from threading import Lock
+from time import perf_counter
+from typing import Any, Mapping, Final, Callable
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.pool import QueuePool, Pool
+
+from tools.histograms import LogHistogram
+
+
+class PoolMetrics:
+    """
+    Metrics of connection pool usage: checkout and wait latencies, and counts
+    of checkouts, waits, timeouts and opened, closed and invalidated
+    connections.
+    """
+
+    def __init__(self):
+        self.checkout_seconds = LogHistogram()
+        self.wait_seconds = LogHistogram()
+        self.connection_seconds = LogHistogram()
+
+        self.checkouts = 0
+        self.checkins = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.opened_connections = 0
+        self.closed_connections = 0
+        self.invalidated_connections = 0
+        self.waiting = 0
+
+        self._lock = Lock()
+
+    def increase(self, counter_name: str, value: int = 1) -> None:
+        with self._lock:
+            setattr(self, counter_name, getattr(self, counter_name) + value)
+
+    def as_dict(self) -> dict:
+        return dict(
+            checkouts=self.checkouts,
+            checkins=self.checkins,
+            waits=self.waits,
+            waiting=self.waiting,
+            timeouts=self.timeouts,
+            opened_connections=self.opened_connections,
+            closed_connections=self.closed_connections,
+            invalidated_connections=self.invalidated_connections,
+            checkout_seconds=self.checkout_seconds.as_dict(),
+            wait_seconds=self.wait_seconds.as_dict(),
+            connection_seconds=self.connection_seconds.as_dict()
+        )
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool measuring time to get a connection from the pool, time spent
+    waiting for a returned connection when the pool is exhausted and time to
+    open new connections.
+
+    Each pool has its own metrics, which a pool recreated by its engine
+    continues.
+    """
+
+    def __init__(
+        self,
+        creator: Callable,
+        pool_size: int = 5,
+        max_overflow: int = 10,
+        timeout: float = 30.,
+        **kwargs
+    ):
+        super().__init__(creator, pool_size=pool_size, max_overflow=max_overflow, timeout=timeout, **kwargs)
+
+        self.max_overflow = max_overflow
+        self.metrics = PoolMetrics()
+
+        # A recreated pool inherits event listeners of the previous one
+        if kwargs.get("_dispatch") is None:
+            listen_pool_events_of(self, self.metrics)
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        pool = super().recreate()
+        pool.metrics = self.metrics
+
+        return pool
+
+    def report(self) -> dict:
+        return dict(
+            size=self.size(),
+            checked_in=self.checkedin(),
+            checked_out=self.checkedout(),
+            overflow=self.overflow(),
+            max_overflow=self.max_overflow,
+            timeout=self.timeout(),
+            **self.metrics.as_dict()
+        )
+
+    def _do_get(self) -> Any:
+        is_waiting = 0 <= self.max_overflow <= self.overflow() and self.checkedin() == 0
+        start_time = perf_counter()
+
+        if is_waiting:
+            self.metrics.increase("waits")
+            self.metrics.increase("waiting")
+
+        try:
+            return super()._do_get()
+        except TimeoutError:
+            self.metrics.increase("timeouts")
+            raise
+        finally:
+            duration = perf_counter() - start_time
+            self.metrics.checkout_seconds.record(duration)
+
+            if is_waiting:
+                self.metrics.increase("waiting", -1)
+                self.metrics.wait_seconds.record(duration)
+
+    def _create_connection(self) -> Any:
+        start_time = perf_counter()
+
+        try:
+            return super()._create_connection()
+        finally:
+            self.metrics.connection_seconds.record(perf_counter() - start_time)
+
+
+def listen_pool_events_of(pool: Pool | type[Pool], metrics: PoolMetrics) -> None:
+    """Function to count connection churn of the input pool in the metrics."""
+
+    event.listen(pool, "connect", lambda *_: metrics.increase("opened_connections"))
+    event.listen(pool, "close", lambda *_: metrics.increase("closed_connections"))
+    event.listen(pool, "invalidate", lambda *_: metrics.increase("invalidated_connections"))
+    event.listen(pool, "checkout", lambda *_: metrics.increase("checkouts"))
+    event.listen(pool, "checkin", lambda *_: metrics.increase("checkins"))
+
+
+_engine_option_name_by_config_key: Final[dict[str, str]] = {
+    "DATABASE_POOL_SIZE": "pool_size",
+    "DATABASE_POOL_MAX_OVERFLOW": "max_overflow",
+    "DATABASE_POOL_TIMEOUT_SECONDS": "pool_timeout",
+    "DATABASE_POOL_RECYCLE_SECONDS": "pool_recycle",
+    "DATABASE_POOL_PRE_PING": "pool_pre_ping"
+}
+
+
+def engine_options_from(config: Mapping[str, Any]) -> dict:
+    """
+    Function to get SQLAlchemy engine options of an instrumented pool by
+    `DATABASE_POOL_*` values of the input config.
+
+    In-memory SQLite databases keep their single shared connection and the
+    statement timeout is set only for PostgreSQL.
+    """
+
+    url = make_url(config["SQLALCHEMY_DATABASE_URI"])
+    options = dict()
+
+    if url.get_backend_name() != "sqlite" or url.database not in (None, "", ":memory:"):
+        options["poolclass"] = InstrumentedQueuePool
+        options.update(
+            (option_name, config[config_key])
+            for config_key, option_name in _engine_option_name_by_config_key.items()
+            if config_key in config
+        )
+
+    if url.get_backend_name() == "postgresql" and config.get("DATABASE_STATEMENT_TIMEOUT_MILLISECONDS"):
+        options["connect_args"] = dict(
+            options=f"-c statement_timeout={config['DATABASE_STATEMENT_TIMEOUT_MILLISECONDS']}"
+        )
+
+    return options
@@ -1,86 +1,665 @@
-from typing import Iterable, Optional, Callable, TypeVar, Generic, Iterator
+import operator
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict, deque, OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass
+from functools import partial
+from itertools import count
+from threading import RLock
+from time import monotonic
+from typing import Iterable, Optional, Callable, TypeVar, Generic, Iterator, Tuple, Hashable, Final
 
 from flask_sqlalchemy import SQLAlchemy
 from pyannotating import Special, many_or_one
-from pyhandling import as_collection
+from pyhandling import as_collection, by, nothing
+from pyhandling.annotations import event, event_for
 from sqlalchemy.orm.attributes import InstrumentedAttribute
-from sqlalchemy.sql.expression import BinaryExpression, and_, or_, not_
+from sqlalchemy import select, bindparam, delete, inspect, event as sqlalchemy_event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Result
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, SessionTransaction, make_transient_to_detached
+from sqlalchemy.orm.base import NO_VALUE
+from sqlalchemy.sql import Select, Insert, Delete
+from sqlalchemy.sql.expression import BinaryExpression, and_, or_, not_, true, false
 
-from services.repositories import MonolithicRepository, IRepository
+from services.errors import RepositoryError
+from services.repositories import MonolithicRepository, IRepository, StoredT, as_condition_collection
+from services.repositories.optimization import optimized_conditions
 from services.repositories.search_annotations import *
 from orm import db
+from rules.chat import Message
+from tools.caches import LRUCache, CacheStatistics
+from tools.utils import dict_value_map, chunks_of
 
 
 class SQLAlchemyRepository(MonolithicRepository):
-    def __init__(self, model: db.Model, session: SQLAlchemy):
+    _stream_chunk_size: int = 500
+
+    def __init__(self, model: db.Model, session: SQLAlchemy, *, is_flushing_on_add: bool = False):
         self._model = model
         self._session = session
+        self._is_flushing_on_add = is_flushing_on_add
+
+    def __iter__(self) -> Iterator[db.Model]:
+        return iter(self._session.session.execute(
+            select(self._model),
+            execution_options=dict(yield_per=self._stream_chunk_size)
+        ).scalars())
 
     def all(self) -> Iterable[db.Model]:
         return self._model.query.all()
 
     def add(self, instance: db.Model) -> None:
-        self._model.add(instance)
+        self._session.session.add(instance)
+
+        if self._is_flushing_on_add:
+            self._session.session.flush((instance, ))
+
+    def add_if_absent(self, instance: db.Model) -> bool:
+        """
+        Method to add an object unless it violates a unique constraint.
+
+        Objects without related objects are inserted by a single
+        `INSERT ... ON CONFLICT DO NOTHING` on dialects supporting it, others
+        are flushed inside a savepoint rolled back on a conflict.
+        """
+
+        conflict_ignoring_insert = self._conflict_ignoring_insert_by_dialect_name.get(
+            self._session.session.get_bind().dialect.name
+        )
+
+        if conflict_ignoring_insert is not None and not self.__has_related_objects(instance):
+            return self.__insert_if_absent(instance, conflict_ignoring_insert)
+
+        try:
+            with self._session.session.begin_nested():
+                self._session.session.add(instance)
+                self._session.session.flush()
+        except IntegrityError:
+            return False
+
+        return True
+
+    def add_many(self, instances: Iterable[db.Model]) -> None:
+        with self._session.session.begin_nested():
+            for instance_chunk in chunks_of(self._max_batch_size, instances):
+                self._session.session.bulk_save_objects(
+                    instance_chunk,
+                    return_defaults=self._is_flushing_on_add
+                )
 
     def remove(self, instance: db.Model) -> None:
-        self._model.delete(instance)
+        self._session.session.delete(instance)
+
+    def remove_many(self, instances: Iterable[db.Model]) -> None:
+        primary_key_column, = inspect(self._model).primary_key
+
+        with self._session.session.begin_nested():
+            for instance_chunk in chunks_of(self._max_batch_size, instances):
+                self._session.session.execute(
+                    delete(self._model)
+                    .where(primary_key_column.in_(
+                        getattr(instance, primary_key_column.key) for instance in instance_chunk
+                    ))
+                    .execution_options(synchronize_session=False)
+                )
+
+                for instance in instance_chunk:
+                    if instance in self._session.session:
+                        self._session.session.expunge(instance)
+
+    def identity_of(self, instance: db.Model) -> Tuple:
+        return tuple(inspect(self._model).primary_key_from_instance(instance))
+
+    def detached_copy_of(self, instance: db.Model) -> db.Model:
+        """
+        Method to copy column values of a stored object into an object bound to
+        no session, which can be shared between sessions through `attached`.
+        """
+
+        detached_copy = self._model(**{
+            column_attribute.key: getattr(instance, column_attribute.key)
+            for column_attribute in inspect(self._model).column_attrs
+        })
+        make_transient_to_detached(detached_copy)
+
+        return detached_copy
+
+    def attached(self, detached_copy: db.Model) -> db.Model:
+        """
+        Method to get an object of the current session for a detached copy
+        without reaching the database and without binding the copy itself.
+        """
+
+        return self._session.session.merge(detached_copy, load=False)
+
+    def remove_by(
+        self,
+        conditions: dict[str, Special[SearchAnnotation]] = dict(),
+        **keyword_conditions: Special[SearchAnnotation]
+    ) -> None:
+        """
+        Method to remove objects satisfying the input conditions by one DELETE
+        statement without loading them.
+
+        Removed objects already loaded into the session are not expunged.
+        """
+
+        conditions = optimized_conditions(
+            dict_value_map(as_condition_collection, conditions | keyword_conditions)
+        )
+
+        if conditions is not None:
+            self.__execute(conditions, self.__removal_statement_options)
+
+    def after_transaction(self, action: event) -> None:
+        """
+        Method to call the input action once the current transaction of the
+        session ends by a commit, a rollback or closing of the session, or
+        at once without a transaction.
+        """
+
+        session = self._session.session()
+
+        if not session.in_transaction():
+            action()
+            return
+
+        session.info.setdefault(_transaction_ending_actions_key, list()).append(action)
+
+    def after_commit(self, action: event) -> None:
+        """
+        Method to call the input action once the current transaction of the
+        session is committed, dropping the action if the transaction ends
+        otherwise, or at once without a transaction.
+        """
+
+        session = self._session.session()
+
+        if not session.in_transaction():
+            action()
+            return
+
+        session.info.setdefault(_commit_actions_key, list()).append(action)
+
+    _conflict_ignoring_insert_by_dialect_name: dict[str, Callable[[db.Model], Insert]] = {
+        "postgresql": postgresql.insert, "sqlite": sqlite.insert
+    }
+
+    def __insert_if_absent(self, instance: db.Model, conflict_ignoring_insert: Callable[[db.Model], Insert]) -> bool:
+        mapper = inspect(self._model)
+        values = {
+            column_attribute.key: getattr(instance, column_attribute.key)
+            for column_attribute in mapper.column_attrs
+            if getattr(instance, column_attribute.key) is not None
+        }
+
+        result = self._session.session.execute(
+            conflict_ignoring_insert(self._model).values(**values).on_conflict_do_nothing()
+        )
+
+        if result.rowcount == 0:
+            return False
+
+        for column, value in zip(mapper.primary_key, result.inserted_primary_key):
+            setattr(instance, mapper.get_property_by_column(column).key, value)
+
+        make_transient_to_detached(instance)
+        self._session.session.add(instance)
+
+        return True
+
+    def __has_related_objects(self, instance: db.Model) -> bool:
+        instance_state = inspect(instance)
+
+        return any(
+            instance_state.attrs[relationship.key].loaded_value not in (None, NO_VALUE, list())
+            for relationship in instance_state.mapper.relationships
+        )
+
+    plan_cache = LRUCache[Hashable, Select](512)
 
     def _get_by_conditions(
         self,
         conditions: dict[str, Iterable[SearchAnnotation | object]],
         is_many: bool
     ) -> Optional[db.Model] | Iterable[db.Model]:
-        sqlalchemy_conditions = list()
+        objects = self.__execute(conditions, (is_many, )).scalars()
 
-        for attribute_name, condition in conditions.items():
-            sqlalchemy_conditions.extend(self.__get_sqlalchemy_conditions_by(
-                condition, attribute_name
-            ))
+        return objects.all() if is_many else objects.first()
 
-        objects = self._model.query.filter(*sqlalchemy_conditions)
+    def _stream_by_conditions(
+        self,
+        conditions: dict[str, Iterable[SearchAnnotation | object]],
+        order_by: str,
+        is_descending: bool,
+        limit: Optional[int]
+    ) -> Iterator[db.Model]:
+        return iter(self.__execute(
+            conditions,
+            (order_by, is_descending, limit is not None),
+            dict(limit=limit) if limit is not None else dict(),
+            execution_options=dict(yield_per=self._stream_chunk_size)
+        ).scalars())
 
-        return objects.all() if is_many else objects.first()
+    def __execute(
+        self,
+        conditions: dict[str, Iterable[SearchAnnotation | object]],
+        statement_options: Tuple[Hashable],
+        extra_parameters: dict = dict(),
+        **execution_arguments
+    ) -> Result:
+        values = list()
+        plan_key = (
+            self._model,
+            tuple(
+                (attribute_name, self.__get_shape_of(attribute_conditions, values))
+                for attribute_name, attribute_conditions in conditions.items()
+            ),
+            statement_options
+        )
+
+        statement = self.plan_cache.get(plan_key)
+
+        if statement is None:
+            statement = self.__get_statement_by(plan_key)
+            self.plan_cache.set(plan_key, statement)
+
+        return self._session.session.execute(
+            statement,
+            {f"p{index}": value for index, value in enumerate(values)} | extra_parameters,
+            **execution_arguments
+        )
+
+    def __get_shape_of(self, conditions: Iterable[SearchAnnotation | object], values: list) -> Tuple[Hashable]:
+        """
+        Method to get the structure of the input conditions without their
+        values, which are added in the order of traversal to the input list.
+        """
+
+        shape = list()
+
+        for condition in conditions:
+            if isinstance(condition, GroupingAnnotation):
+                shape.append((type(condition), self.__get_shape_of(condition.annotations, values)))
+            elif isinstance(condition, Not):
+                shape.append((Not, self.__get_shape_of((condition.value, ), values)))
+            elif isinstance(condition, Between):
+                shape.append(Between)
+                values.extend(condition.value)
+            elif not isinstance(condition, SearchAnnotation) or type(condition) is Equal:
+                value = condition.value if isinstance(condition, Equal) else condition
+
+                if value is None:
+                    shape.append((Equal, None))
+                else:
+                    shape.append(Equal)
+                    values.append(value)
+            else:
+                shape.append(type(condition))
+                values.append(condition.value)
+
+        return tuple(shape)
+
+    __removal_statement_options: Final[Tuple[Hashable]] = ("removal", )
+
+    def __get_statement_by(self, plan_key: Tuple[Hashable]) -> Select | Delete:
+        _, shapes_by_attribute_name, statement_options = plan_key
+        parameter_indexes = count()
+
+        sqlalchemy_conditions = tuple(
+            sqlalchemy_condition
+            for attribute_name, shape in shapes_by_attribute_name
+            for sqlalchemy_condition in self.__get_sqlalchemy_conditions_by(
+                shape,
+                getattr(self._model, attribute_name),
+                parameter_indexes
+            )
+        )
+
+        if statement_options == self.__removal_statement_options:
+            return (
+                delete(self._model)
+                .where(*sqlalchemy_conditions)
+                .execution_options(synchronize_session=False)
+            )
+
+        statement = select(self._model).where(*sqlalchemy_conditions)
+
+        if len(statement_options) == 1:
+            is_many, = statement_options
+
+            return statement if is_many else statement.limit(1)
+
+        order_by, is_descending, is_limited = statement_options
+        order_attribute = getattr(self._model, order_by)
+
+        statement = statement.order_by(
+            order_attribute.desc().nulls_first() if is_descending else order_attribute.asc().nulls_last()
+        )
+
+        return statement.limit(bindparam("limit")) if is_limited else statement
 
     __sqlalchemy_grouper_by_annotation_type: dict[SearchAnnotation, Callable] = {
         And: and_, Or: or_, Not: not_
     }
 
+    __sqlalchemy_empty_group_by_annotation_type: dict[SearchAnnotation, Callable] = {
+        And: true, Or: false
+    }
+
+    __sqlalchemy_operator_by_annotation_type: dict[SearchAnnotation, Callable] = {
+        Equal: operator.eq, Greater: operator.gt, Lesser: operator.lt, In: InstrumentedAttribute.in_
+    }
+
     def __get_sqlalchemy_conditions_by(
         self,
-        conditions: Iterable[SearchAnnotation | object],
-        attribute_name: str
+        shape: Tuple[Hashable],
+        model_attribute: InstrumentedAttribute,
+        parameter_indexes: Iterator[int]
     ) -> Iterable[BinaryExpression]:
-        model_attribute = getattr(self._model, attribute_name)
         sqlalchemy_conditions = list()
 
-        for condition in conditions:
-            if isinstance(condition, Greater):
-                sqlalchemy_conditions.append(model_attribute > condition.value)
-            elif isinstance(condition, Lesser):
-                sqlalchemy_conditions.append(model_attribute < condition.value)
-            elif isinstance(condition, GroupingAnnotation) or isinstance(condition, Not):
+        for node in shape:
+            if node == (Equal, None):
+                sqlalchemy_conditions.append(model_attribute.is_(None))
+            elif node is Between:
+                sqlalchemy_conditions.append(and_(
+                    model_attribute > bindparam(f"p{next(parameter_indexes)}"),
+                    model_attribute < bindparam(f"p{next(parameter_indexes)}")
+                ))
+            elif isinstance(node, tuple):
+                annotation_type, nested_shape = node
+                nested_conditions = self.__get_sqlalchemy_conditions_by(
+                    nested_shape,
+                    model_attribute,
+                    parameter_indexes
+                )
+
                 sqlalchemy_conditions.append(
-                    self.__sqlalchemy_grouper_by_annotation_type[type(condition)](
-                        *self.__get_sqlalchemy_conditions_by(
-                            (
-                                condition.annotations
-                                if isinstance(condition, GroupingAnnotation)
-                                else (condition.value, )
-                            ),
-                            attribute_name
-                        )
+                    self.__sqlalchemy_grouper_by_annotation_type[annotation_type](*nested_conditions)
+                    if nested_conditions
+                    else self.__sqlalchemy_empty_group_by_annotation_type[annotation_type]()
+                )
+            else:
+                sqlalchemy_conditions.append(
+                    self.__sqlalchemy_operator_by_annotation_type[node](
+                        model_attribute,
+                        bindparam(f"p{next(parameter_indexes)}", expanding=node is In)
                     )
                 )
-            elif isinstance(condition, Equal) or not isinstance(condition, SearchAnnotation):
-                sqlalchemy_conditions.append(model_attribute == (
-                    condition.value
-                    if isinstance(condition, Equal)
-                    else condition
-                ))
 
         return sqlalchemy_conditions
 
 
+_transaction_ending_actions_key: Final[str] = "transaction_ending_actions"
+_commit_actions_key: Final[str] = "commit_actions"
+
+
+@sqlalchemy_event.listens_for(Session, "after_transaction_end")
+def _call_transaction_ending_actions(session: Session, transaction: SessionTransaction) -> None:
+    if transaction.parent is not None:
+        return
+
+    session.info.pop(_commit_actions_key, None)
+
+    for action in session.info.pop(_transaction_ending_actions_key, tuple()):
+        action()
+
+
+@sqlalchemy_event.listens_for(Session, "after_commit")
+def _call_commit_actions(session: Session) -> None:
+    if session.in_nested_transaction():
+        return
+
+    for action in session.info.pop(_commit_actions_key, tuple()):
+        action()
+
+
+class MemoryRepository(MonolithicRepository, Generic[StoredT]):
+    """
+    Repository storing objects in process memory.
+
+    Keeps hash indexes of the declared attributes for Equal and In conditions
+    and sorted indexes for Greater and Lesser ones, evaluating And, Or and Not
+    by intersecting and uniting the index postings. Conditions on attributes
+    without indexes are checked by scanning.
+
+    Indexes are updated on adding and removing, so a changed object should be
+    added again to be found by its new attribute values.
+
+    Attributes declared unique are hash indexed and checked by `add_if_absent`.
+    """
+
+    def __init__(
+        self,
+        objects: Iterable[StoredT] = tuple(),
+        *,
+        hash_indexed: Iterable[str] = tuple(),
+        sorted_indexed: Iterable[str] = tuple(),
+        unique: Iterable[str] = tuple()
+    ):
+        self._objects: dict[int, StoredT] = dict()
+        self._sequence_numbers: dict[int, int] = dict()
+        self._sequence_number_counter = count()
+
+        self._unique_attribute_names = tuple(unique)
+        self._hash_indexes: dict[str, defaultdict[Hashable, set[int]]] = {
+            attribute_name: defaultdict(set)
+            for attribute_name in (*hash_indexed, *self._unique_attribute_names)
+        }
+        self._sorted_indexes: dict[str, list[Tuple[object, int]]] = {
+            attribute_name: list() for attribute_name in sorted_indexed
+        }
+
+        self._lock = RLock()
+
+        for object_ in objects:
+            self.add(object_)
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+    def all(self) -> Iterable[StoredT]:
+        with self._lock:
+            return tuple(self._objects.values())
+
+    def add(self, instance: StoredT) -> None:
+        with self._lock:
+            if id(instance) in self._objects:
+                self.remove(instance)
+
+            self._objects[id(instance)] = instance
+            self._sequence_numbers[id(instance)] = next(self._sequence_number_counter)
+
+            for attribute_name, index in self._hash_indexes.items():
+                index[getattr(instance, attribute_name)].add(id(instance))
+
+            for attribute_name, index in self._sorted_indexes.items():
+                value = getattr(instance, attribute_name)
+
+                if value is not None:
+                    insort(index, (value, id(instance)))
+
+    def add_if_absent(self, instance: StoredT) -> bool:
+        with self._lock:
+            if id(instance) in self._objects or any(
+                getattr(instance, attribute_name) is not None
+                and self._hash_indexes[attribute_name].get(getattr(instance, attribute_name))
+                for attribute_name in self._unique_attribute_names
+            ):
+                return False
+
+            self.add(instance)
+
+            return True
+
+    def remove(self, instance: StoredT) -> None:
+        with self._lock:
+            if self._objects.pop(id(instance), None) is None:
+                return
+
+            del self._sequence_numbers[id(instance)]
+
+            for attribute_name, index in self._hash_indexes.items():
+                value = getattr(instance, attribute_name)
+                index[value].discard(id(instance))
+
+                if not index[value]:
+                    del index[value]
+
+            for attribute_name, index in self._sorted_indexes.items():
+                value = getattr(instance, attribute_name)
+
+                if value is not None:
+                    del index[bisect_left(index, (value, id(instance)))]
+
+    def _get_by_conditions(
+        self,
+        conditions: dict[str, Iterable[SearchAnnotation | object]],
+        is_many: bool
+    ) -> Optional[StoredT] | Tuple[StoredT]:
+        found_objects = self.__get_objects_by(conditions)
+
+        if is_many:
+            return found_objects
+
+        return found_objects[0] if found_objects else None
+
+    def _stream_by_conditions(
+        self,
+        conditions: dict[str, Iterable[SearchAnnotation | object]],
+        order_by: str,
+        is_descending: bool,
+        limit: Optional[int]
+    ) -> Iterator[StoredT]:
+        found_objects = sorted(
+            self.__get_objects_by(conditions),
+            key=lambda object_: (getattr(object_, order_by) is None, getattr(object_, order_by)),
+            reverse=is_descending
+        )
+
+        return iter(found_objects[:limit] if limit is not None else found_objects)
+
+    def __get_objects_by(self, conditions: dict[str, Iterable[SearchAnnotation | object]]) -> Tuple[StoredT]:
+        with self._lock:
+            postings, is_exact = self.__get_postings_by(And(*(
+                _AttributeCondition(attribute_name, condition)
+                for attribute_name, attribute_conditions in conditions.items()
+                for condition in attribute_conditions
+            )))
+
+            if postings is None:
+                postings = self._objects.keys()
+
+            found_objects = (
+                self._objects[object_id]
+                for object_id in sorted(postings, key=self._sequence_numbers.__getitem__)
+            )
+
+            if is_exact:
+                return tuple(found_objects)
+
+            return tuple(
+                object_ for object_ in found_objects
+                if all(
+                    is_satisfying(getattr(object_, attribute_name), condition)
+                    for attribute_name, attribute_conditions in conditions.items()
+                    for condition in attribute_conditions
+                )
+            )
+
+    def __get_postings_by(
+        self,
+        condition: SearchAnnotation | object,
+        attribute_name: Optional[str] = None
+    ) -> Tuple[Optional[set[int]], bool]:
+        """
+        Method to get identifiers of objects that can satisfy the input condition
+        from indexes.
+
+        Returns the identifiers with a flag of whether they all satisfy the
+        condition or None when indexes can't narrow down the search.
+        """
+
+        if isinstance(condition, _AttributeCondition):
+            return self.__get_postings_by(condition.condition, condition.attribute_name)
+
+        elif isinstance(condition, And):
+            postings = None
+            is_exact = True
+
+            for annotation in condition.annotations:
+                annotation_postings, is_annotation_exact = self.__get_postings_by(annotation, attribute_name)
+                is_exact &= is_annotation_exact
+
+                if annotation_postings is not None:
+                    postings = annotation_postings if postings is None else postings & annotation_postings
+
+            return postings, is_exact and postings is not None
+
+        elif isinstance(condition, Or):
+            postings = set()
+
+            for annotation in condition.annotations:
+                annotation_postings, is_annotation_exact = self.__get_postings_by(annotation, attribute_name)
+
+                if not is_annotation_exact:
+                    return None, False
+
+                postings |= annotation_postings
+
+            return postings, True
+
+        elif isinstance(condition, Not):
+            postings, is_exact = self.__get_postings_by(condition.value, attribute_name)
+
+            # Objects for which the negated condition is unknown are not excluded
+            return (self._objects.keys() - postings, False) if is_exact else (None, False)
+
+        elif isinstance(condition, Greater | Lesser | Between) and attribute_name in self._sorted_indexes:
+            index = self._sorted_indexes[attribute_name]
+            lower_bound, upper_bound = (
+                condition.value if isinstance(condition, Between)
+                else (condition.value, nothing) if isinstance(condition, Greater)
+                else (nothing, condition.value)
+            )
+
+            if lower_bound is None or upper_bound is None:
+                return set(), True
+
+            index_slice = index[
+                bisect_right(index, (lower_bound, _max_object_id)) if lower_bound is not nothing else 0
+                :bisect_left(index, (upper_bound, _min_object_id)) if upper_bound is not nothing else len(index)
+            ]
+
+            return {object_id for _, object_id in index_slice}, True
+
+        elif attribute_name in self._hash_indexes and (
+            isinstance(condition, Equal | In) or not isinstance(condition, SearchAnnotation)
+        ):
+            index = self._hash_indexes[attribute_name]
+            values = (
+                tuple(value for value in condition.value if value is not None)
+                if isinstance(condition, In)
+                else (condition.value if isinstance(condition, Equal) else condition, )
+            )
+
+            return set().union(*(index.get(value, tuple()) for value in values)), True
+
+        return None, False
+
+
+@dataclass(frozen=True)
+class _AttributeCondition(SearchAnnotation):
+    attribute_name: str
+    condition: SearchAnnotation | object
+
+
+_min_object_id: Final[float] = float("-inf")
+_max_object_id: Final[float] = float("inf")
+
 
 OriginalT = TypeVar("OriginalT")
 ConvertedT = TypeVar("OriginalT")
@@ -99,7 +678,7 @@ class ConvertingRepository(IRepository, Generic[OriginalT, ConvertedT]):
         self._isoconverter = isoconverter
 
     def __iter__(self) -> Iterator[ConvertedT]:
-        return iter(self.all())
+        return map(self._converter, self._repository)
 
     def all(self) -> Iterable[ConvertedT]:
         return tuple(map(self._converter, self._repository.all()))
@@ -107,9 +686,25 @@ class ConvertingRepository(IRepository, Generic[OriginalT, ConvertedT]):
     def add(self, instance: ConvertedT) -> None:
         self._repository.add(self._isoconverter(instance))
 
+    def add_many(self, instances: Iterable[ConvertedT]) -> None:
+        self._repository.add_many(tuple(map(self._isoconverter, instances)))
+
+    def add_if_absent(self, instance: ConvertedT) -> bool:
+        return self._repository.add_if_absent(self._isoconverter(instance))
+
     def remove(self, instance: ConvertedT) -> None:
         self._repository.remove(self._isoconverter(instance))
 
+    def remove_many(self, instances: Iterable[ConvertedT]) -> None:
+        self._repository.remove_many(tuple(map(self._isoconverter, instances)))
+
+    def remove_by(
+        self,
+        conditions: dict[str, Special[SearchAnnotation]] = dict(),
+        **keyword_conditions: Special[SearchAnnotation]
+    ) -> None:
+        self._repository.remove_by(conditions, **keyword_conditions)
+
     def get_by(
         self,
         conditions: dict[str, Special[SearchAnnotation]] = dict(),
@@ -117,9 +712,806 @@ class ConvertingRepository(IRepository, Generic[OriginalT, ConvertedT]):
         is_many: bool = False,
         **keyword_conditions: Special[SearchAnnotation]
     ) -> Optional[many_or_one[ConvertedT]]:
-        found_object_resource = self._repository(conditions, is_many=is_many, **keyword_conditions)
+        found_object_resource = self._repository.get_by(conditions, is_many=is_many, **keyword_conditions)
 
         if found_object_resource is None:
             return None
 
-        return tuple(map(self._converter, as_collection(found_object_resource)))
\ No newline at end of file
+        return tuple(map(self._converter, as_collection(found_object_resource)))
+
+    def stream_by(
+        self,
+        conditions: dict[str, Special[SearchAnnotation]] = dict(),
+        *,
+        order_by: str,
+        is_descending: bool = False,
+        limit: Optional[int] = None,
+        **keyword_conditions: Special[SearchAnnotation]
+    ) -> Iterator[ConvertedT]:
+        return map(self._converter, self._repository.stream_by(
+            conditions,
+            order_by=order_by,
+            is_descending=is_descending,
+            limit=limit,
+            **keyword_conditions
+        ))
+
+    def get_each_by(self, attribute_name: str, values: Iterable[Hashable]) -> Tuple[Optional[ConvertedT]]:
+        return tuple(
+            self._converter(found_object) if found_object is not None else None
+            for found_object in self._repository.get_each_by(attribute_name, values)
+        )
+
+
+class CachingRepository(IRepository, Generic[StoredT]):
+    """
+    Repository proxy caching search results of another repository by their
+    conditions, including searches that found nothing.
+
+    Found objects are cached as copies made by the input detacher and given
+    out through the attacher, so that an object bound to a session of one
+    thread is never given to another.
+
+    Adding and removing through the proxy invalidate only the results that
+    contain the changed object or whose conditions it satisfies, found by
+    indexes of results by identities of their objects and by values of their
+    equality conditions. A search that raced such a change is not cached.
+
+    With transactions, ends of which are passed to actions by the input
+    `after_transaction`, nothing is cached while changes are uncommitted,
+    since other transactions still read the previous state, and searches
+    that raced a commit are not cached either.
+    """
+
+    def __init__(
+        self,
+        repository: IRepository[StoredT],
+        *,
+        max_size: int = 1024,
+        time_to_live: Optional[float] = None,
+        negative_time_to_live: Optional[float] = None,
+        identity_of: Callable[[StoredT], Hashable] = id,
+        detacher: Callable[[StoredT], StoredT] = lambda instance: instance,
+        attacher: Callable[[StoredT], StoredT] = lambda instance: instance,
+        after_transaction: Optional[Callable[[event], None]] = None,
+        clock: event_for[float] = monotonic
+    ):
+        self._repository = repository
+        self._after_transaction = after_transaction
+
+        self.time_to_live = time_to_live
+        self.negative_time_to_live = (
+            negative_time_to_live if negative_time_to_live is not None else time_to_live
+        )
+
+        self._identity_of = identity_of
+        self._detacher = detacher
+        self._attacher = attacher
+
+        self._clock = clock
+        self.cache = LRUCache[Hashable, Optional[many_or_one[StoredT]]](
+            max_size,
+            clock=clock,
+            discarding_handler=self.__forget
+        )
+
+        self._keys_by_identity: dict[Hashable, set[Hashable]] = dict()
+        self._keys_by_value_by_attribute_name: dict[str, dict[Hashable, set[Hashable]]] = dict()
+        self._scanned_keys: set[Hashable] = set()
+        self._index_entries_by_key: dict[Hashable, Tuple[Tuple[Hashable], Optional[Tuple[str, Hashable]]]] = dict()
+
+        self._generation = 0
+        self._uncommitted_change_number = 0
+        self._lock = RLock()
+
+    def __iter__(self) -> Iterator[StoredT]:
+        return iter(self._repository)
+
+    def all(self) -> Iterable[StoredT]:
+        return self._repository.all()
+
+    def add(self, instance: StoredT) -> None:
+        self._repository.add(instance)
+        self.__invalidate_by(instance)
+
+    def add_many(self, instances: Iterable[StoredT]) -> None:
+        instances = tuple(instances)
+
+        self._repository.add_many(instances)
+        self.__invalidate_by(*instances)
+
+    def add_if_absent(self, instance: StoredT) -> bool:
+        is_added = self._repository.add_if_absent(instance)
+
+        if is_added:
+            self.__invalidate_by(instance)
+
+        return is_added
+
+    def remove(self, instance: StoredT) -> None:
+        self._repository.remove(instance)
+        self.__invalidate_by(instance)
+
+    def remove_many(self, instances: Iterable[StoredT]) -> None:
+        instances = tuple(instances)
+
+        self._repository.remove_many(instances)
+        self.__invalidate_by(*instances)
+
+    def remove_by(
+        self,
+        conditions: dict[str, Special[SearchAnnotation]] = dict(),
+        **keyword_conditions: Special[SearchAnnotation]
+    ) -> None:
+        self._repository.remove_by(conditions, **keyword_conditions)
+        self.__invalidate_all()
+
+    def get_by(
+        self,
+        conditions: dict[str, Special[SearchAnnotation]] = dict(),
+        *,
+        is_many: bool = False,
+        **keyword_conditions: Special[SearchAnnotation]
+    ) -> Optional[many_or_one[StoredT]]:
+        key = self.__key_of(conditions | keyword_conditions, is_many)
+
+        if key is None:
+            return self._repository.get_by(conditions, is_many=is_many, **keyword_conditions)
+
+        with self._lock:
+            cached_resource = self.cache.get(key, nothing)
+            generation = self._generation
+
+        if cached_resource is not nothing:
+            return self.__attached(cached_resource, is_many)
+
+        found_object_resource = self._repository.get_by(
+            conditions,
+            is_many=is_many,
+            **keyword_conditions
+        )
+        self.__remember(key, found_object_resource, is_many, generation)
+
+        return found_object_resource
+
+    def get_each_by(self, attribute_name: str, values: Iterable[Hashable]) -> Tuple[Optional[StoredT]]:
+        values = tuple(values)
+        keys = tuple(self.__key_of({attribute_name: value}, False) for value in values)
+
+        with self._lock:
+            found_objects = [
+                self.cache.get(key, nothing) if key is not None else nothing
+                for key in keys
+            ]
+            generation = self._generation
+
+        found_objects = [
+            self.__attached(found_object, False) if found_object is not nothing else nothing
+            for found_object in found_objects
+        ]
+
+        lost_indexes = tuple(index for index, found_object in enumerate(found_objects) if found_object is nothing)
+        loaded_objects = self._repository.get_each_by(
+            attribute_name,
+            (values[index] for index in lost_indexes)
+        )
+
+        for index, loaded_object in zip(lost_indexes, loaded_objects):
+            found_objects[index] = loaded_object
+
+            if keys[index] is not None:
+                self.__remember(keys[index], loaded_object, False, generation)
+
+        return tuple(found_objects)
+
+    def stream_by(
+        self,
+        conditions: dict[str, Special[SearchAnnotation]] = dict(),
+        *,
+        order_by: str,
+        is_descending: bool = False,
+        limit: Optional[int] = None,
+        **keyword_conditions: Special[SearchAnnotation]
+    ) -> Iterator[StoredT]:
+        return self._repository.stream_by(
+            conditions,
+            order_by=order_by,
+            is_descending=is_descending,
+            limit=limit,
+            **keyword_conditions
+        )
+
+    def __key_of(self, conditions: dict[str, Special[SearchAnnotation]], is_many: bool) -> Optional[Hashable]:
+        """Method to get a key of search results, which is None for unhashable conditions."""
+
+        key = (
+            tuple(sorted(dict_value_map(as_condition_collection, conditions).items())),
+            is_many
+        )
+
+        try:
+            hash(key)
+        except TypeError:
+            return None
+
+        return key
+
+    def __attached(self, cached_resource: Optional[many_or_one[StoredT]], is_many: bool) -> Optional[many_or_one[StoredT]]:
+        if is_many:
+            return tuple(map(self._attacher, cached_resource))
+
+        return self._attacher(cached_resource) if cached_resource is not None else None
+
+    def __remember(
+        self,
+        key: Hashable,
+        found_object_resource: Optional[many_or_one[StoredT]],
+        is_many: bool,
+        generation: int
+    ) -> None:
+        found_objects = (
+            tuple(found_object_resource)
+            if is_many
+            else (found_object_resource, ) if found_object_resource is not None else tuple()
+        )
+        detached_objects = tuple(map(self._detacher, found_objects))
+        time_to_live = self.time_to_live if found_objects else self.negative_time_to_live
+
+        with self._lock:
+            if generation != self._generation or self._uncommitted_change_number:
+                return
+
+            self.__forget(key)
+            self.cache.set(
+                key,
+                detached_objects if is_many else next(iter(detached_objects), None),
+                expiration_time=self._clock() + time_to_live if time_to_live is not None else None
+            )
+
+            if key in self.cache:
+                self.__index(key, detached_objects)
+
+    def __index(self, key: Hashable, found_objects: Tuple[StoredT]) -> None:
+        identities = tuple(map(self._identity_of, found_objects))
+        equality = self.__equality_of(key[0])
+
+        for identity in identities:
+            self._keys_by_identity.setdefault(identity, set()).add(key)
+
+        if equality is None:
+            self._scanned_keys.add(key)
+        else:
+            attribute_name, value = equality
+            keys_by_value = self._keys_by_value_by_attribute_name.setdefault(attribute_name, dict())
+            keys_by_value.setdefault(value, set()).add(key)
+
+        self._index_entries_by_key[key] = (identities, equality)
+
+    def __forget(self, key: Hashable) -> None:
+        index_entry = self._index_entries_by_key.pop(key, None)
+
+        if index_entry is None:
+            return
+
+        identities, equality = index_entry
+
+        for identity in identities:
+            _discard_from_index(self._keys_by_identity, identity, key)
+
+        if equality is None:
+            self._scanned_keys.discard(key)
+        else:
+            attribute_name, value = equality
+            keys_by_value = self._keys_by_value_by_attribute_name[attribute_name]
+            _discard_from_index(keys_by_value, value, key)
+
+            if not keys_by_value:
+                del self._keys_by_value_by_attribute_name[attribute_name]
+
+    def __equality_of(
+        self,
+        conditions: Iterable[Tuple[str, Iterable[SearchAnnotation | object]]]
+    ) -> Optional[Tuple[str, Hashable]]:
+        for attribute_name, attribute_conditions in conditions:
+            for condition in attribute_conditions:
+                if isinstance(condition, Equal):
+                    return attribute_name, condition.value
+                elif not isinstance(condition, SearchAnnotation):
+                    return attribute_name, condition
+
+        return None
+
+    def __invalidate_by(self, *instances: StoredT) -> None:
+        with self._lock:
+            self.__start_change()
+
+            for instance in instances:
+                keys = set(self._keys_by_identity.get(self._identity_of(instance), tuple()))
+                keys.update(
+                    key for key in self.__candidate_keys_of(instance)
+                    if self.__is_satisfying(instance, key[0])
+                )
+
+                for key in keys:
+                    self.cache.remove(key)
+                    self.__forget(key)
+
+        if self._after_transaction is not None:
+            self._after_transaction(self.__end_change)
+
+    def __invalidate_all(self) -> None:
+        with self._lock:
+            self.__start_change()
+
+            self.cache.clear()
+            self._keys_by_identity.clear()
+            self._keys_by_value_by_attribute_name.clear()
+            self._scanned_keys.clear()
+            self._index_entries_by_key.clear()
+
+        if self._after_transaction is not None:
+            self._after_transaction(self.__end_change)
+
+    def __start_change(self) -> None:
+        self._generation += 1
+
+        if self._after_transaction is not None:
+            self._uncommitted_change_number += 1
+
+    def __end_change(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._uncommitted_change_number -= 1
+
+    def __candidate_keys_of(self, instance: StoredT) -> Iterator[Hashable]:
+        yield from tuple(self._scanned_keys)
+
+        for attribute_name, keys_by_value in tuple(self._keys_by_value_by_attribute_name.items()):
+            value = getattr(instance, attribute_name, nothing)
+
+            try:
+                keys = keys_by_value.get(value, tuple()) if value is not nothing else None
+            except TypeError:
+                keys = None
+
+            if keys is None:
+                yield from tuple(key for keys in keys_by_value.values() for key in keys)
+            else:
+                yield from tuple(keys)
+
+    def __is_satisfying(
+        self,
+        instance: StoredT,
+        conditions: Iterable[Tuple[str, Iterable[SearchAnnotation | object]]]
+    ) -> bool:
+        for attribute_name, attribute_conditions in conditions:
+            value = getattr(instance, attribute_name, nothing)
+
+            if value is not nothing and not all(
+                is_satisfying(value, condition) for condition in attribute_conditions
+            ):
+                return False
+
+        return True
+
+
+def _discard_from_index(keys_by_index_key: dict[Hashable, set[Hashable]], index_key: Hashable, key: Hashable) -> None:
+    keys = keys_by_index_key.get(index_key)
+
+    if keys is None:
+        return
+
+    keys.discard(key)
+
+    if not keys:
+        del keys_by_index_key[index_key]
+
+
+class AppendOnlyRepository(IRepository, Generic[StoredT]):
+    """Repository proxy forbidding the removal of stored objects."""
+
+    def __init__(self, repository: IRepository[StoredT]):
+        self._repository = repository
+
+    def __iter__(self) -> Iterator[StoredT]:
+        return iter(self._repository)
+
+    def all(self) -> Iterable[StoredT]:
+        return self._repository.all()
+
+    def add(self, instance: StoredT) -> None:
+        self._repository.add(instance)
+
+    def add_many(self, instances: Iterable[StoredT]) -> None:
+        self._repository.add_many(instances)
+
+    def add_if_absent(self, instance: StoredT) -> bool:
+        return self._repository.add_if_absent(instance)
+
+    def remove(self, instance: StoredT) -> None:
+        raise RepositoryError("Objects can't be removed from an append-only repository")
+
+    def remove_many(self, instances: Iterable[StoredT]) -> None:
+        raise RepositoryError("Objects can't be removed from an append-only repository")
+
+    def remove_by(
+        self,
+        conditions: dict[str, Special[SearchAnnotation]] = dict(),
+        **keyword_conditions: Special[SearchAnnotation]
+    ) -> None:
+        raise RepositoryError("Objects can't be removed from an append-only repository")
+
+    def get_by(
+        self,
+        conditions: dict[str, Special[SearchAnnotation]] = dict(),
+        *,
+        is_many: bool = False,
+        **keyword_conditions: Special[SearchAnnotation]
+    ) -> Optional[many_or_one[StoredT]]:
+        return self._repository.get_by(conditions, is_many=is_many, **keyword_conditions)
+
+    def get_each_by(self, attribute_name: str, values: Iterable[Hashable]) -> Tuple[Optional[StoredT]]:
+        return self._repository.get_each_by(attribute_name, values)
+
+    def stream_by(
+        self,
+        conditions: dict[str, Special[SearchAnnotation]] = dict(),
+        *,
+        order_by: str,
+        is_descending: bool = False,
+        limit: Optional[int] = None,
+        **keyword_conditions: Special[SearchAnnotation]
+    ) -> Iterator[StoredT]:
+        return self._repository.stream_by(
+            conditions,
+            order_by=order_by,
+            is_descending=is_descending,
+            limit=limit,
+            **keyword_conditions
+        )
+
+
+class MessageRecord:
+    """Read-only copy of a message bound to no session."""
+
+    __slots__ = ("id", "room_id", "author_id", "text", "creation_time")
+
+    def __init__(self, message: Message):
+        self.id = message.id
+        self.room_id = message.room_id
+        self.author_id = message.author_id
+        self.text = message.text
+        self.creation_time = message.creation_time
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {self.id} of room {self.room_id}>"
+
+
+class _RoomBuffer:
+    __slots__ = ("records", "is_history_complete", "loading_time")
+
+    def __init__(self, records: Iterable[MessageRecord], capacity: int, is_history_complete: bool, loading_time: float):
+        self.records = deque(records, maxlen=capacity)
+        self.is_history_complete = is_history_complete
+        self.loading_time = loading_time
+
+    def remember(self, record: MessageRecord) -> None:
+        if self.records and len(self.records) == self.records.maxlen:
+            self.is_history_complete = False
+
+        if not self.records or self.records[-1].id < record.id:
+            self.records.append(record)
+        elif all(buffered_record.id != record.id for buffered_record in self.records):
+            ordered_records = sorted((*self.records, record), key=getattr |by| "id")
+            self.records.clear()
+            self.records.extend(ordered_records[-self.records.maxlen:])
+
+    def is_covering_since(self, id_: Optional[int]) -> bool:
+        return self.is_history_complete or (
+            id_ is not None and bool(self.records) and id_ >= self.records[0].id
+        )
+
+
+class _RoomLoading:
+    __slots__ = ("future", "remembered_records", "is_forgotten")
+
+    def __init__(self):
+        self.future = Future[_RoomBuffer]()
+        self.remembered_records = list[MessageRecord]()
+        self.is_forgotten = False
+
+
+class RecentMessageRepository(IRepository[Message]):
+    """
+    Message repository proxy keeping the last messages of recently read rooms
+    in fixed-capacity ring buffers and writing added messages through to them.
+
+    Keyset history reads by room (`room_id` equality with Greater and Lesser
+    conditions on `id`, ordered by `id`) are answered from the buffers, reaching
+    the wrapped repository only to load a room or to scroll past its buffer.
+    History reads give out `MessageRecord` copies either way.
+
+    A room is loaded outside the lock of the buffers by the first thread that
+    reads it while other readers of the room wait for that loading.
+
+    Buffers are local to the process, so with several processes messages
+    posted elsewhere should be passed to `remember` or buffers should have a
+    time to live.
+
+    With `after_commit`, added messages are written through to the buffers
+    only once they are committed, so buffers never keep rolled back messages.
+    Messages should have their ids by then, like ones flushed on adding.
+    """
+
+    def __init__(
+        self,
+        repository: IRepository[Message],
+        *,
+        room_capacity: int = 100,
+        max_rooms: int = 1024,
+        time_to_live: Optional[float] = None,
+        clock: event_for[float] = monotonic,
+        after_commit: Optional[Callable[[event], None]] = None
+    ):
+        self._repository = repository
+        self._after_commit = after_commit
+
+        self.room_capacity = room_capacity
+        self.max_rooms = max_rooms
+        self.time_to_live = time_to_live
+        self.statistics = CacheStatistics()
+
+        self._clock = clock
+        self._buffers: OrderedDict[Hashable, _RoomBuffer] = OrderedDict()
+        self._loadings: dict[Hashable, _RoomLoading] = dict()
+        self._lock = RLock()
+
+    def __iter__(self) -> Iterator[Message]:
+        return iter(self._repository)
+
+    def all(self) -> Iterable[Message]:
+        return self._repository.all()
+
+    def add(self, instance: Message) -> None:
+        self._repository.add(instance)
+        self.__remember_on_commit(instance)
+
+    def add_many(self, instances: Iterable[Message]) -> None:
+        instances = tuple(instances)
+
+        self._repository.add_many(instances)
+
+        for instance in instances:
+            self.__remember_on_commit(instance)
+
+    def add_if_absent(self, instance: Message) -> bool:
+        is_added = self._repository.add_if_absent(instance)
+
+        if is_added:
+            self.__remember_on_commit(instance)
+
+        return is_added
+
+    def remove(self, instance: Message) -> None:
+        self._repository.remove(instance)
+        self.forget(instance.room_id)
+
+    def remove_many(self, instances: Iterable[Message]) -> None:
+        instances = tuple(instances)
+
+        self._repository.remove_many(instances)
+
+        for room_id in {instance.room_id for instance in instances}:
+            self.forget(room_id)
+
+    def remove_by(
+        self,
+        conditions: dict[str, Special[SearchAnnotation]] = dict(),
+        **keyword_conditions: Special[SearchAnnotation]
+    ) -> None:
+        self._repository.remove_by(conditions, **keyword_conditions)
+
+        with self._lock:
+            for room_id in (*self._buffers.keys(), *self._loadings.keys()):
+                self.forget(room_id)
+
+    def remember(self, message: Message) -> None:
+        with self._lock:
+            buffer = self._buffers.get(message.room_id)
+            loading = self._loadings.get(message.room_id)
+
+            if buffer is None and loading is None:
+                return
+
+            if message.id is None:
+                self.forget(message.room_id)
+            elif buffer is not None:
+                buffer.remember(MessageRecord(message))
+            else:
+                loading.remembered_records.append(MessageRecord(message))
+
+    def forget(self, room_id: Hashable) -> None:
+        with self._lock:
+            self._buffers.pop(room_id, None)
+            loading = self._loadings.get(room_id)
+
+            if loading is not None:
+                loading.is_forgotten = True
+
+    def get_by(
+        self,
+        conditions: dict[str, Special[SearchAnnotation]] = dict(),
+        *,
+        is_many: bool = False,
+        **keyword_conditions: Special[SearchAnnotation]
+    ) -> Optional[many_or_one[Message]]:
+        return self._repository.get_by(conditions, is_many=is_many, **keyword_conditions)
+
+    def get_each_by(self, attribute_name: str, values: Iterable[Hashable]) -> Tuple[Optional[Message]]:
+        return self._repository.get_each_by(attribute_name, values)
+
+    def stream_by(
+        self,
+        conditions: dict[str, Special[SearchAnnotation]] = dict(),
+        *,
+        order_by: str,
+        is_descending: bool = False,
+        limit: Optional[int] = None,
+        **keyword_conditions: Special[SearchAnnotation]
+    ) -> Iterator[Message | MessageRecord]:
+        history_query = self.__history_query_of(conditions | keyword_conditions, order_by)
+
+        if history_query is not None:
+            records = self.__get_buffered_records_by(*history_query, is_descending, limit)
+
+            with self._lock:
+                if records is not None:
+                    self.statistics.hits += 1
+                else:
+                    self.statistics.misses += 1
+
+            if records is not None:
+                return iter(records)
+
+        found_messages = self._repository.stream_by(
+            conditions,
+            order_by=order_by,
+            is_descending=is_descending,
+            limit=limit,
+            **keyword_conditions
+        )
+
+        return map(MessageRecord, found_messages) if history_query is not None else found_messages
+
+    def __remember_on_commit(self, message: Message) -> None:
+        if self._after_commit is None:
+            self.remember(message)
+        else:
+            self._after_commit(partial(self.remember, MessageRecord(message)))
+
+    def __get_buffered_records_by(
+        self,
+        room_id: Hashable,
+        after: Optional[int],
+        before: Optional[int],
+        is_descending: bool,
+        limit: Optional[int]
+    ) -> Optional[Tuple[MessageRecord]]:
+        buffer = self.__get_buffer_of(room_id)
+
+        with self._lock:
+            records = tuple(
+                record for record in buffer.records
+                if (after is None or record.id > after) and (before is None or record.id < before)
+            )
+            is_covering = buffer.is_covering_since(after)
+
+        if is_descending:
+            records = records[::-1]
+
+            if limit is not None and len(records) >= limit:
+                return records[:limit]
+
+        return records[:limit] if is_covering else None
+
+    def __get_buffer_of(self, room_id: Hashable) -> _RoomBuffer:
+        with self._lock:
+            buffer = self._buffers.get(room_id)
+
+            if buffer is not None and (
+                self.time_to_live is None
+                or self._clock() - buffer.loading_time < self.time_to_live
+            ):
+                self._buffers.move_to_end(room_id)
+                return buffer
+
+            loading = self._loadings.get(room_id)
+
+            if loading is not None:
+                is_loading_here = False
+            else:
+                loading = self._loadings[room_id] = _RoomLoading()
+                is_loading_here = True
+
+        if not is_loading_here:
+            return loading.future.result()
+
+        try:
+            buffer = self.__loaded_buffer_of(room_id)
+        except BaseException as error:
+            with self._lock:
+                del self._loadings[room_id]
+
+            loading.future.set_exception(error)
+            raise
+
+        with self._lock:
+            del self._loadings[room_id]
+
+            for record in loading.remembered_records:
+                buffer.remember(record)
+
+            if not loading.is_forgotten:
+                self.__store(room_id, buffer)
+
+        loading.future.set_result(buffer)
+
+        return buffer
+
+    def __loaded_buffer_of(self, room_id: Hashable) -> _RoomBuffer:
+        records = tuple(map(MessageRecord, self._repository.stream_by(
+            room_id=room_id,
+            order_by="id",
+            is_descending=True,
+            limit=self.room_capacity
+        )))[::-1]
+
+        return _RoomBuffer(records, self.room_capacity, len(records) < self.room_capacity, self._clock())
+
+    def __store(self, room_id: Hashable, buffer: _RoomBuffer) -> None:
+        self._buffers[room_id] = buffer
+
+        while len(self._buffers) > self.max_rooms:
+            self._buffers.popitem(last=False)
+            self.statistics.evictions += 1
+
+    def __history_query_of(
+        self,
+        conditions: dict[str, Special[SearchAnnotation]],
+        order_by: str
+    ) -> Optional[Tuple[Hashable, Optional[int], Optional[int]]]:
+        """
+        Method to get room id and id bounds from conditions of a history read or
+        None if the conditions are not a history read.
+        """
+
+        if order_by != "id" or "room_id" not in conditions or not conditions.keys() <= {"room_id", "id"}:
+            return None
+
+        room_conditions = as_condition_collection(conditions["room_id"])
+
+        if len(room_conditions) != 1 or (
+            isinstance(room_conditions[0], SearchAnnotation) and type(room_conditions[0]) is not Equal
+        ):
+            return None
+
+        room_id = room_conditions[0].value if isinstance(room_conditions[0], Equal) else room_conditions[0]
+        after = before = None
+
+        for condition in _flat_and_conditions_of(as_condition_collection(conditions.get("id", tuple()))):
+            if isinstance(condition, Greater):
+                after = condition.value if after is None else max(after, condition.value)
+            elif isinstance(condition, Lesser):
+                before = condition.value if before is None else min(before, condition.value)
+            else:
+                return None
+
+        return room_id, after, before
+
+
+def _flat_and_conditions_of(conditions: Iterable[SearchAnnotation | object]) -> Iterator[SearchAnnotation | object]:
+    for condition in conditions:
+        if isinstance(condition, And):
+            yield from _flat_and_conditions_of(condition.annotations)
+        else:
+            yield condition
@@ -0,0 +1,149 @@
+from contextlib import nullcontext
+from datetime import datetime
+from threading import RLock, Event, Thread
+from time import time
+from typing import ContextManager, Iterable
+
+from pyhandling.annotations import event_for
+
+from orm.models import TokenRevocation
+from services.repositories import IRepository
+from services.repositories.search_annotations import Greater, Lesser
+from tools.utils import chunks_of
+
+
+class TokenRevocationIndex:
+    """
+    In-memory index of ids of revoked tokens bucketed by their expiration
+    time, so that a whole bucket is dropped once its tokens expire.
+
+    Revocations made by other processes are learned by syncing rows added to
+    the repository since the last sync in batches, so checking revocation
+    doesn't reach the repository. Rows of recently synced ids are read again
+    to catch rows committed out of their id order.
+    """
+
+    def __init__(
+        self,
+        repository: IRepository[TokenRevocation],
+        *,
+        bucket_seconds: float = 3600,
+        sync_batch_size: int = 1000,
+        sync_overlap: int = 100
+    ):
+        self._repository = repository
+
+        self.bucket_seconds = bucket_seconds
+        self.sync_batch_size = sync_batch_size
+        self.sync_overlap = sync_overlap
+
+        self._buckets: dict[int, set[str]] = dict()
+        self._last_synced_id = 0
+        self._lock = RLock()
+
+    def __len__(self) -> int:
+        return sum(map(len, tuple(self._buckets.values())))
+
+    def is_revoked(self, token_id: str, expiration_time: float) -> bool:
+        bucket = self._buckets.get(self.__bucket_number_of(expiration_time))
+
+        return bucket is not None and token_id in bucket
+
+    def revoke(self, token_id: str, expiration_time: float) -> bool:
+        """
+        Method to revoke a token until its expiration time.
+
+        Returns whether the token was revoked by this call rather than earlier,
+        here or by another process.
+        """
+
+        if self.is_revoked(token_id, expiration_time):
+            return False
+
+        is_revoked_now = self._repository.add_if_absent(TokenRevocation(
+            token_id=token_id,
+            expiration_time=datetime.fromtimestamp(expiration_time)
+        ))
+        self.remember(token_id, expiration_time)
+
+        return is_revoked_now
+
+    def remember(self, token_id: str, expiration_time: float) -> None:
+        if expiration_time <= time():
+            return
+
+        with self._lock:
+            self._buckets.setdefault(self.__bucket_number_of(expiration_time), set()).add(token_id)
+
+    def drop_expired(self) -> None:
+        current_bucket_number = self.__bucket_number_of(time())
+
+        with self._lock:
+            for bucket_number in tuple(self._buckets):
+                if bucket_number < current_bucket_number:
+                    del self._buckets[bucket_number]
+
+    def sync(self) -> None:
+        """Method to remember unexpired revocations added to the repository."""
+
+        self.drop_expired()
+        last_id = max(0, self._last_synced_id - self.sync_overlap)
+
+        while True:
+            revocations = tuple(self._repository.stream_by(
+                id=Greater(last_id),
+                expiration_time=Greater(datetime.now()),
+                order_by="id",
+                limit=self.sync_batch_size
+            ))
+
+            for revocation in revocations:
+                self.remember(revocation.token_id, revocation.expiration_time.timestamp())
+
+            if revocations:
+                last_id = revocations[-1].id
+                self._last_synced_id = max(self._last_synced_id, last_id)
+
+            if len(revocations) < self.sync_batch_size:
+                return
+
+    def purge(self) -> None:
+        """Method to delete rows of expired revocations in batches."""
+
+        self._remove_in_batches(self._repository.stream_by(
+            expiration_time=Lesser(datetime.now()),
+            order_by="id"
+        ))
+
+    def sync_periodically(
+        self,
+        interval_seconds: float,
+        *,
+        context: event_for[ContextManager] = nullcontext,
+        is_purging: bool = True
+    ) -> Event:
+        """
+        Method to sync and optionally purge the index in a background thread
+        within the input context until the returned event is set.
+        """
+
+        stopping_event = Event()
+
+        def sync_until_stopping() -> None:
+            while not stopping_event.wait(interval_seconds):
+                with context():
+                    self.sync()
+
+                    if is_purging:
+                        self.purge()
+
+        Thread(target=sync_until_stopping, daemon=True).start()
+
+        return stopping_event
+
+    def _remove_in_batches(self, revocations: Iterable[TokenRevocation]) -> None:
+        for revocation_chunk in chunks_of(self.sync_batch_size, revocations):
+            self._repository.remove_many(revocation_chunk)
+
+    def __bucket_number_of(self, timestamp: float) -> int:
+        return int(timestamp // self.bucket_seconds)
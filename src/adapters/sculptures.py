@@ -1,6 +1,6 @@
-from typing import Callable
+from typing import Callable, Optional
 
-from pyhandling import close, by, then
+from pyhandling import close
 from sculpting import Sculpture
 
 from orm.models import User, UserSession
@@ -13,11 +13,16 @@ profile_sculture_from: Callable[[User], Profile] = close(Sculpture)(
 
 
 session_sculture_from: Callable[[UserSession], Session] = close(Sculpture)(
+    token="token",
     cancellation_time="cancellation_time"
 )
 
 
+def _session_sculpture_of(user: User) -> Optional[Session]:
+    return None if user.session is None else session_sculture_from(user.session)
+
+
 account_sculture_from: Callable[[User], Account] = close(Sculpture)(
     profile=profile_sculture_from,
-    session=(getattr |by| "session") |then>> session_sculture_from
+    session=_session_sculpture_of
 )
\ No newline at end of file
@@ -0,0 +1,152 @@
+from contextlib import nullcontext
+from datetime import datetime
+from threading import RLock, Event, Thread
+from typing import Optional, Hashable, ContextManager
+
+from pyhandling.annotations import event_for
+
+from orm.models import UserSession
+from services.repositories import IRepository
+from services.repositories.search_annotations import Greater, Lesser
+from tools.timers import HierarchicalTimerWheel
+
+
+class SessionRecord:
+    """Read-only copy of a session bound to no database session."""
+
+    __slots__ = ("user_id", "token", "cancellation_time")
+
+    def __init__(self, session: UserSession):
+        self.user_id = session.user_id
+        self.token = session.token
+        self.cancellation_time = session.cancellation_time
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} of user {self.user_id}>"
+
+
+class SessionStore:
+    """
+    Store of active sessions kept in memory by token and by user, with their
+    cancellation times tracked by a timer wheel.
+
+    Sessions are kept as `SessionRecord` copies, so the store holds no rows of
+    database sessions. Expired sessions are dropped from memory as time passes
+    and their rows are deleted from the repository by conditions on purging.
+    """
+
+    def __init__(
+        self,
+        repository: IRepository[UserSession],
+        *,
+        tick_seconds: float = 1,
+        clock: event_for[datetime] = datetime.now
+    ):
+        self._repository = repository
+        self._clock = clock
+
+        self._sessions_by_token: dict[str, SessionRecord] = dict()
+        self._sessions_by_user_id: dict[Hashable, SessionRecord] = dict()
+
+        self._wheel = HierarchicalTimerWheel[str](
+            tick_seconds=tick_seconds,
+            clock=lambda: self._clock().timestamp()
+        )
+        self._lock = RLock()
+
+    def __len__(self) -> int:
+        return len(self._sessions_by_token)
+
+    def load(self) -> None:
+        """Method to fill the store with active sessions of the repository."""
+
+        for session in self._repository.stream_by(
+            cancellation_time=Greater(self._clock()),
+            order_by="id"
+        ):
+            self.remember(session)
+
+    def add(self, session: UserSession) -> None:
+        self._repository.add(session)
+        self.remember(session)
+
+    def remember(self, session: UserSession) -> None:
+        record = SessionRecord(session)
+
+        with self._lock:
+            self.forget(session.token)
+
+            if record.user_id is not None:
+                previous_user_record = self._sessions_by_user_id.get(record.user_id)
+
+                if previous_user_record is not None:
+                    self.forget(previous_user_record.token)
+
+                self._sessions_by_user_id[record.user_id] = record
+
+            self._sessions_by_token[record.token] = record
+            self._wheel.schedule(record.token, record.cancellation_time.timestamp())
+
+    def forget(self, token: str) -> None:
+        with self._lock:
+            record = self._sessions_by_token.pop(token, None)
+
+            if record is None:
+                return
+
+            self._wheel.cancel(token)
+
+            if record.user_id is not None and self._sessions_by_user_id.get(record.user_id) is record:
+                del self._sessions_by_user_id[record.user_id]
+
+    def get_by_token(self, token: str) -> Optional[SessionRecord]:
+        with self._lock:
+            self.expire()
+
+            return self._sessions_by_token.get(token)
+
+    def get_by_user_id(self, user_id: Hashable) -> Optional[SessionRecord]:
+        with self._lock:
+            self.expire()
+
+            return self._sessions_by_user_id.get(user_id)
+
+    def is_active(self, token: str) -> bool:
+        return self.get_by_token(token) is not None
+
+    def expire(self) -> None:
+        with self._lock:
+            for token in self._wheel.advance():
+                self.forget(token)
+
+    def purge(self) -> None:
+        """
+        Method to drop expired sessions from memory and delete their rows,
+        including rows that expired before the store was loaded, without
+        loading them.
+        """
+
+        self.expire()
+        self._repository.remove_by(cancellation_time=Lesser(self._clock()))
+
+    def purge_periodically(
+        self,
+        interval_seconds: float,
+        *,
+        context: event_for[ContextManager] = nullcontext
+    ) -> Event:
+        """
+        Method to purge the store in a background thread within the input
+        context until the returned event is set.
+        """
+
+        stopping_event = Event()
+
+        def purge_until_stopping() -> None:
+            while not stopping_event.wait(interval_seconds):
+                with context():
+                    self.purge()
+
+        Thread(target=purge_until_stopping, daemon=True).start()
+
+        return stopping_event
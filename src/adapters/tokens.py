@@ -1,24 +1,177 @@
+from services.errors import TokenError
 from services.tokens import TokenDecoderResult
 
-from jwt import encode, decode, InvalidTokenError
-from datetime import datetime
+from dataclasses import dataclass
+from os import listdir, path
+from threading import Lock
+from typing import Any, Optional, Iterable, Tuple
+
+from jwt import encode, decode, get_unverified_header, InvalidTokenError
+from jwt.algorithms import get_default_algorithms
+
+
+@dataclass(frozen=True)
+class TokenKey:
+    id: str
+    algorithm: str
+    signing_key: Optional[Any]
+    verifying_key: Any
+
+
+def token_key_of(id_: str, algorithm: str, key: str | bytes) -> TokenKey:
+    """
+    Function to parse a raw key of the input algorithm once into key objects.
+
+    Asymmetric keys are verified by the public part of a private key, so a
+    public key alone only verifies tokens.
+    """
+
+    algorithm_object = get_default_algorithms().get(algorithm)
+
+    if algorithm_object is None:
+        raise ValueError(f"Token algorithm {algorithm} is not supported")
+
+    parsed_key = algorithm_object.prepare_key(key)
+
+    if isinstance(parsed_key, bytes):
+        return TokenKey(id_, algorithm, parsed_key, parsed_key)
+
+    if hasattr(parsed_key, "public_key"):
+        return TokenKey(id_, algorithm, parsed_key, parsed_key.public_key())
+
+    return TokenKey(id_, algorithm, None, parsed_key)
+
+
+class KeyRing:
+    """
+    Token keys selected by their id (`kid` header).
+
+    The active key signs new tokens and all keys verify them, so a key being
+    introduced can verify tokens of workers that already sign with it and a
+    retiring key verifies tokens signed before the rotation until removed.
+    """
+
+    def __init__(self, active_key: TokenKey, keys: Iterable[TokenKey] = tuple()):
+        self._active_key = active_key
+        self._keys = {key.id: key for key in (*keys, active_key)}
+        self._lock = Lock()
+
+    @property
+    def active_key(self) -> TokenKey:
+        return self._active_key
+
+    @property
+    def keys(self) -> Tuple[TokenKey]:
+        return tuple(self._keys.values())
+
+    def get(self, id_: str) -> Optional[TokenKey]:
+        return self._keys.get(id_)
+
+    def add(self, key: TokenKey) -> None:
+        with self._lock:
+            self._keys = self._keys | {key.id: key}
+
+    def rotate(self, key: TokenKey) -> None:
+        """Method to sign with the input key, keeping the previous one to verify."""
+
+        with self._lock:
+            self._keys = self._keys | {key.id: key}
+            self._active_key = key
+
+    def remove(self, id_: str) -> None:
+        with self._lock:
+            if id_ == self._active_key.id:
+                raise ValueError("Active token key can't be removed")
+
+            self._keys = {key_id: key for key_id, key in self._keys.items() if key_id != id_}
+
+
+def key_ring_from(
+    *,
+    secret_key: Optional[str] = None,
+    algorithm: str = "HS256",
+    key_directory: Optional[str] = None,
+    active_key_id: Optional[str] = None
+) -> KeyRing:
+    """
+    Function to get a key ring of keys stored in files of the input directory
+    or of the single secret key when there is no directory.
+
+    Key files are named `<key id>.<algorithm>.<extension>`, like
+    `2024-01.RS256.pem`, so that keys of different algorithms verify tokens
+    during a rotation between them. Keys of files without an algorithm in the
+    name, like `2024-01.pem`, are of the input algorithm.
+    """
+
+    if key_directory is None:
+        if not secret_key:
+            raise ValueError("Token key ring needs a secret key or a key directory")
+
+        return KeyRing(token_key_of(active_key_id or "default", algorithm, secret_key))
+
+    keys = list()
+
+    for file_name in sorted(listdir(key_directory)):
+        key_id, key_algorithm = _key_id_and_algorithm_of(file_name, algorithm)
+
+        with open(path.join(key_directory, file_name), "rb") as key_file:
+            keys.append(token_key_of(key_id, key_algorithm, key_file.read()))
+
+    active_key = next((key for key in keys if key.id == active_key_id), None)
+
+    if active_key is None:
+        raise ValueError(f"Active token key {active_key_id} is not in {key_directory}")
+
+    return KeyRing(active_key, keys)
+
+
+def _key_id_and_algorithm_of(file_name: str, default_algorithm: str) -> Tuple[str, str]:
+    stem = path.splitext(file_name)[0]
+    key_id, _, algorithm = stem.rpartition(".")
+
+    if key_id and algorithm in get_default_algorithms():
+        return key_id, algorithm
+
+    return stem, default_algorithm
 
 
 class JWTSerializator:
-    def __init__(self, key: str, is_symmetric: bool = True, leeway: int | float = 0):
-        self.key = key
-        self.is_symmetric = is_symmetric
+    """
+    Serializator signing tokens by the active key of a key ring and verifying
+    them by the key of their `kid` header.
+
+    Tokens without the header are verified by the active key.
+    """
+
+    def __init__(self, key_ring: KeyRing, leeway: int | float = 0):
+        self.key_ring = key_ring
         self.leeway = leeway
 
-    @property
-    def algorithm(self) -> str:
-        return 'HS256' if self.is_symmetric else 'RS256'
+    @classmethod
+    def from_config(cls, config: Any) -> "JWTSerializator":
+        return cls(key_ring_from(
+            secret_key=config.get("SECRET_KEY"),
+            algorithm=config.get("TOKEN_ALGORITHM", "HS256"),
+            key_directory=config.get("TOKEN_KEY_DIRECTORY"),
+            active_key_id=config.get("TOKEN_ACTIVE_KEY_ID")
+        ))
 
     def encode(self, data: dict, *, headers: dict = dict()) -> str:
-        return encode(data, key=self.key, algorithm=self.algorithm, headers=headers)
+        key = self.key_ring.active_key
+
+        if key.signing_key is None:
+            raise TokenError(f"Token key {key.id} can't sign tokens")
+
+        return encode(data, key=key.signing_key, algorithm=key.algorithm, headers=headers | dict(kid=key.id))
 
     def decode(self, token: str) -> dict | TokenDecoderResult:
         try:
-            return decode(token, key=self.key, algorithms=(self.algorithm, ), leeway=self.leeway)
+            key_id = get_unverified_header(token).get("kid")
+            key = self.key_ring.active_key if key_id is None else self.key_ring.get(key_id)
+
+            if key is None:
+                return TokenDecoderResult.INCORRECT
+
+            return decode(token, key=key.verifying_key, algorithms=(key.algorithm, ), leeway=self.leeway)
         except InvalidTokenError:
-            return TokenDecoderResult.INCORRECT
\ No newline at end of file
+            return TokenDecoderResult.INCORRECT
@@ -1 +1,8 @@
-from api.api import *
\ No newline at end of file
+from importlib import import_module
+from typing import Any
+
+
+def __getattr__(name: str) -> Any:
+    # The API is imported on first access, so that importing submodules, like
+    # components, doesn't register its resources
+    return getattr(import_module("api.api"), name)
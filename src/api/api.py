@@ -1,11 +1,45 @@
-from flask import Blueprint
-from flask_restful import Api
+from typing import Iterable
 
-from api.resources import *
+from flask import Blueprint
+from flask_restful import Api, Resource
+from werkzeug.utils import import_string
 
 
 api_blueprint = Blueprint('api', __name__)
 
 api = Api(api_blueprint)
 
-api.add_resource(UserResource, "/users")
\ No newline at end of file
+
+def _lazy_resource_of(import_name: str, methods: Iterable[str]) -> type[Resource]:
+    """
+    Function to get a resource handling the input methods by the resource with
+    the input import name, imported on the first request, so that registering
+    the API doesn't import the whole stack of its resources.
+    """
+
+    resource_type = None
+
+    class LazyResource(Resource):
+        def dispatch_request(self, *args, **kwargs):
+            nonlocal resource_type
+
+            if resource_type is None:
+                resource_type = import_string(import_name)
+
+            return resource_type().dispatch_request(*args, **kwargs)
+
+    LazyResource.methods = set(method.upper() for method in methods)
+    LazyResource.__name__ = import_name.rsplit(".", 1)[-1]
+
+    return LazyResource
+
+
+api.add_resource(_lazy_resource_of("api.resources.UserResource", ["get", "post"]), "/users")
+api.add_resource(_lazy_resource_of("api.resources.TokenResource", ["post"]), "/tokens")
+api.add_resource(_lazy_resource_of("api.resources.RefreshTokenResource", ["post", "delete"]), "/tokens/refresh")
+api.add_resource(
+    _lazy_resource_of("api.resources.MessageResource", ["get", "post"]),
+    "/rooms/<int:room_id>/messages"
+)
+api.add_resource(_lazy_resource_of("api.resources.PoolResource", ["get"]), "/internal/pool")
+api.add_resource(_lazy_resource_of("api.resources.ProfilingResource", ["get"]), "/internal/profiling")
@@ -0,0 +1,80 @@
+from typing import Any, Mapping
+
+from flask import current_app
+from werkzeug.local import LocalProxy
+
+from adapters.brokers import UnixSocketBroker
+from adapters.repositories import SQLAlchemyRepository, CachingRepository, RecentMessageRepository
+from adapters.revocations import TokenRevocationIndex
+from adapters.sessions import SessionStore
+from services.brokers import IBroker, LocalBroker
+from services.hashing import PoolPasswordHasher
+from orm import db
+from orm.models import User, UserSession, TokenRevocation, Room, Message
+from tools.filters import BloomFilter
+
+
+def components_from(config: Mapping[str, Any]) -> dict[str, Any]:
+    """
+    Function to create stateful components of the API by the input app config
+    to be stored in extensions of the app.
+
+    Without a broker socket path in the config, messages are published only
+    to the current process.
+    """
+
+    stored_user_repository = SQLAlchemyRepository(User, db)
+    stored_message_repository = SQLAlchemyRepository(Message, db, is_flushing_on_add=True)
+
+    return dict(
+        user_repository=CachingRepository(
+            stored_user_repository,
+            max_size=config["USER_CACHE_SIZE"],
+            time_to_live=config["USER_CACHE_TIME_TO_LIVE_SECONDS"],
+            identity_of=stored_user_repository.identity_of,
+            detacher=stored_user_repository.detached_copy_of,
+            attacher=stored_user_repository.attached,
+            after_transaction=stored_user_repository.after_transaction
+        ),
+        url_token_filter=BloomFilter(
+            config["URL_TOKEN_FILTER_EXPECTED_SIZE"],
+            false_positive_rate=config["URL_TOKEN_FILTER_FALSE_POSITIVE_RATE"]
+        ),
+        session_store=SessionStore(SQLAlchemyRepository(UserSession, db)),
+        token_revocations=TokenRevocationIndex(
+            SQLAlchemyRepository(TokenRevocation, db),
+            bucket_seconds=config["TOKEN_REVOCATION_BUCKET_SECONDS"],
+            sync_batch_size=config["TOKEN_REVOCATION_SYNC_BATCH_SIZE"]
+        ),
+        password_hasher=PoolPasswordHasher(
+            worker_number=config["PASSWORD_HASHING_WORKER_NUMBER"],
+            max_queue_depth=config["PASSWORD_HASHING_MAX_QUEUE_DEPTH"],
+            cost=config["PASSWORD_HASHING_COST"]
+        ),
+        room_repository=SQLAlchemyRepository(Room, db),
+        message_repository=RecentMessageRepository(
+            stored_message_repository,
+            room_capacity=config["MESSAGE_ROOM_BUFFER_CAPACITY"],
+            max_rooms=config["MESSAGE_BUFFER_MAX_ROOMS"],
+            after_commit=stored_message_repository.after_commit
+        ),
+        broker=(
+            UnixSocketBroker(config["BROKER_SOCKET_PATH"])
+            if config.get("BROKER_SOCKET_PATH")
+            else LocalBroker()
+        )
+    )
+
+
+def _component_proxy_of(name: str) -> Any:
+    return LocalProxy(lambda: current_app.extensions[name])
+
+
+user_repository: CachingRepository = _component_proxy_of("user_repository")
+url_token_filter: BloomFilter = _component_proxy_of("url_token_filter")
+session_store: SessionStore = _component_proxy_of("session_store")
+token_revocations: TokenRevocationIndex = _component_proxy_of("token_revocations")
+password_hasher: PoolPasswordHasher = _component_proxy_of("password_hasher")
+room_repository: SQLAlchemyRepository = _component_proxy_of("room_repository")
+message_repository: RecentMessageRepository = _component_proxy_of("message_repository")
+broker: IBroker = _component_proxy_of("broker")
@@ -1,20 +1,40 @@
 from abc import ABC
-from functools import partial
+from functools import partial, wraps
+from json import dumps
+from hmac import compare_digest
+from typing import Iterable, Any, Optional, Callable
 
-from flask import request
+from flask import request, Response, stream_with_context, current_app
 from flask_restful import Resource
-from pyhandling import to, then, call, close, post_partial
+from pyhandling import to, then, close, post_partial, returnly, by, callmethod, eventually, previous_action_decorator_of
 from pyhandling.annotations import decorator
 from sculpting import material_of
 
-from api.schemes import UserSchema, user_schema_without_passwords
-from adapters.repositories import ConvertingRepository, SQLAlchemyRepository
+from api.components import (
+    user_repository, url_token_filter, session_store, token_revocations, password_hasher,
+    room_repository, message_repository, broker
+)
+from api.schemes import UserSchema, MessageSchema, user_schema_without_passwords
+from adapters.pools import InstrumentedQueuePool
+from adapters.repositories import ConvertingRepository
 from adapters.sculptures import account_sculture_from, profile_sculture_from
-from infrastructure.controllers import convert_by, search_in, call_service
-from rules.authorization import register_account, is_session_timed_out
+from infrastructure.controllers import convert_by, search_in, call_service, keyset_page_of, keyset_page_arguments_from, history_arguments_from
+from rules.authorization import register_account, is_session_active_in, token_for, refresh_token_for
+from rules.chat import post_message, message_history_of
+from services.errors import RegistrationError, RefreshTokenError, PasswordHashingOverloadError, MessagePostingError
+from services.hashing import hash_password_in
+from services.tokens import rotated_tokens_of, revoke_refresh_token, revoke_access_token, bearer_token_of
 from orm import db
-from orm.models import User
-from tools.utils import data_additing_decorator_by, dict_value_map
+from orm.models import User, UserSession, Message
+from tools.formatters import json_object_chunks_with
+from tools.profiling import profiler
+from tools.schemes import compiled
+from tools.utils import dict_value_map, fused
+
+
+def _remember_session(session: Optional[UserSession]) -> None:
+    if session is not None:
+        session_store.remember(session)
 
 
 class DecoratedResourceMixin(Resource, ABC):
@@ -34,23 +54,248 @@ class DecoratedResourceMixin(Resource, ABC):
 
 
 class UserResource(DecoratedResourceMixin):
-    _decorator = data_additing_decorator_by(
-        (getattr |to* (request, 'json')) |then>> call
-    )
-
-    get = (
-        (convert_by |to| user_schema_without_passwords(many=True))
-        |then>> (search_in |to| SQLAlchemyRepository(db, User))
-        |then>> (dict_value_map |to| user_schema_without_passwords().dump)
-    )
-
-    post = (
-        (convert_by |to| UserSchema(exclude=["password"], many=False))
+    _decorator = previous_action_decorator_of(
+        eventually(partial(callmethod, request, "get_json", silent=True))
+    ) |then>> fused
+
+    _search = staticmethod(fused(
+        (convert_by |to| compiled(user_schema_without_passwords(many=True)))
+        |then>> (search_in |to| user_repository)
+        |then>> profiler.timed(
+            "serialization_seconds",
+            dict_value_map |to| compiled(user_schema_without_passwords()).dump
+        )
+    ))
+
+    def get(self, chunk: Iterable) -> Any:
+        page_arguments = keyset_page_arguments_from(request.args, max_limit=current_app.config["PAGE_MAX_SIZE"])
+
+        if page_arguments is None:
+            return self._search(chunk)
+
+        is_streaming = page_arguments.pop("is_streaming")
+        schema = compiled(user_schema_without_passwords())
+
+        page = keyset_page_of(
+            user_repository,
+            convert_by(schema, chunk, is_partial=True) if isinstance(chunk, dict) else dict(),
+            key_attribute="id",
+            **page_arguments
+        )
+
+        if not is_streaming:
+            return dict(
+                users=profiler.timed("serialization_seconds", schema.dump)(page, many=True),
+                next_cursor=page.next_cursor
+            )
+
+        return Response(
+            stream_with_context(json_object_chunks_with(
+                "users",
+                map(schema.dump, page),
+                tail=lambda: dict(next_cursor=page.next_cursor)
+            )),
+            mimetype="application/json"
+        )
+
+    _register = staticmethod(fused(
+        (hash_password_in |to| password_hasher)
+        |then>> (convert_by |to| compiled(UserSchema(exclude=["password"], many=False)))
         |then>> (call_service |to| User)
         |then>> account_sculture_from
-        |then>> close(register_account, closer=post_partial)(
-            ConvertingRepository(SQLAlchemyRepository(db, User), account_sculture_from, material_of),
-            ConvertingRepository(SQLAlchemyRepository(db, User), profile_sculture_from, material_of),
-            is_session_timed_out
+        |then>> returnly(close(register_account, closer=post_partial)(
+            ConvertingRepository(user_repository, account_sculture_from, material_of),
+            ConvertingRepository(user_repository, profile_sculture_from, material_of),
+            partial(is_session_active_in, session_store),
+            url_token_filter
+        ))
+        |then>> material_of
+        |then>> returnly((getattr |by| "url_token") |then>> partial(callmethod, url_token_filter, "add"))
+        |then>> (getattr |by| "session")
+        |then>> _remember_session
+    ))
+
+    def post(self, chunk: Any) -> Any:
+        try:
+            self._register(chunk)
+        except RegistrationError as error:
+            db.session.rollback()
+            return dict(message=str(error)), 409
+        except PasswordHashingOverloadError as error:
+            return dict(message=str(error)), 503, {"Retry-After": "1"}
+
+        db.session.commit()
+
+        return None, 201
+
+
+class TokenResource(Resource):
+    def post(self) -> Any:
+        data = request.get_json(silent=True)
+        data = data if isinstance(data, dict) else dict()
+        url_token, password = data.get("url_token"), data.get("password")
+
+        if not isinstance(url_token, str) or not isinstance(password, str):
+            return dict(message="Url token and password are required"), 400
+
+        user = user_repository.get_by(url_token=url_token)
+
+        try:
+            is_password_correct = password_hasher.verify(
+                password,
+                user.password_hash if user is not None else password_hasher.dummy_hash
+            )
+        except PasswordHashingOverloadError as error:
+            return dict(message=str(error)), 503, {"Retry-After": "1"}
+
+        if user is None or not is_password_correct:
+            return dict(message="Url token or password is incorrect"), 401
+
+        profile = profile_sculture_from(user)
+        coder = current_app.extensions["token_serializator"].encode
+
+        return dict(
+            access_token=token_for(profile, coder, current_app.config["ACCESS_TOKEN_LIFE_MINUTES"]),
+            refresh_token=refresh_token_for(profile, coder, current_app.config["REFRESH_TOKEN_LIFE_DAYS"] * 24 * 60)
         )
-    )
\ No newline at end of file
+
+
+class RefreshTokenResource(Resource):
+    def post(self) -> Any:
+        serializator = current_app.extensions["token_serializator"]
+
+        try:
+            tokens = rotated_tokens_of(
+                self.__refresh_token,
+                serializator.decode,
+                serializator.encode,
+                token_revocations,
+                access_token_life_minutes=current_app.config["ACCESS_TOKEN_LIFE_MINUTES"],
+                refresh_token_life_minutes=current_app.config["REFRESH_TOKEN_LIFE_DAYS"] * 24 * 60
+            )
+        except RefreshTokenError as error:
+            return dict(message=str(error)), 401
+
+        db.session.commit()
+
+        return tokens
+
+    def delete(self) -> Any:
+        token_decoder = current_app.extensions["token_serializator"].decode
+
+        try:
+            revoke_refresh_token(self.__refresh_token, token_decoder, token_revocations)
+        except RefreshTokenError as error:
+            return dict(message=str(error)), 401
+
+        revoke_access_token(bearer_token_of(request.headers.get("Authorization")), token_decoder, token_revocations)
+        db.session.commit()
+
+        return None, 204
+
+    @property
+    def __refresh_token(self) -> Any:
+        return (request.get_json(silent=True) or dict()).get("refresh_token")
+
+
+class MessageResource(Resource):
+    def get(self, room_id: int) -> Any:
+        messages = message_history_of(
+            room_id,
+            message_repository,
+            **history_arguments_from(
+                request.args,
+                default_limit=current_app.config["MESSAGE_PAGE_SIZE"],
+                max_limit=current_app.config["PAGE_MAX_SIZE"]
+            )
+        )
+
+        return dict(messages=compiled(MessageSchema()).dump(messages, many=True))
+
+    def post(self, room_id: int) -> Any:
+        author = self.__author
+
+        if author is None:
+            return dict(message="Access token is invalid"), 401
+
+        if room_repository.get_by(id=room_id) is None:
+            return dict(message="Room is not found"), 404
+
+        data = request.get_json(silent=True)
+        schema = compiled(MessageSchema())
+
+        message = Message(
+            room_id=room_id,
+            author_id=author.id,
+            **convert_by(schema, data if isinstance(data, dict) else dict())
+        )
+
+        try:
+            post_message(message, message_repository)
+        except MessagePostingError as error:
+            db.session.rollback()
+            return dict(message=str(error)), 400
+
+        posted_message = schema.dump(message)
+        db.session.commit()
+
+        broker.publish(str(room_id), dumps(posted_message))
+
+        return posted_message, 201
+
+    @property
+    def __author(self) -> Optional[User]:
+        access_token = bearer_token_of(request.headers.get("Authorization"))
+
+        if access_token is None:
+            return None
+
+        data = current_app.extensions["access_token_decoder"](access_token)
+
+        if not isinstance(data, dict) or data.get("type") != "access":
+            return None
+
+        return user_repository.get_by(url_token=data["token"])
+
+
+def _internal_only(method: Callable) -> Callable:
+    """
+    Decorator to hide the input resource method unless the request has the
+    internal API token of the config in the `X-Internal-Token` header.
+    """
+
+    @wraps(method)
+    def internal_method(*args, **kwargs) -> Any:
+        internal_token = current_app.config.get("INTERNAL_API_TOKEN")
+
+        if not internal_token:
+            return dict(message="Internal API is disabled"), 404
+
+        if not compare_digest(request.headers.get("X-Internal-Token", "").encode(), internal_token.encode()):
+            return dict(message="Internal API token is invalid"), 403
+
+        return method(*args, **kwargs)
+
+    return internal_method
+
+
+class InternalResource(Resource):
+    method_decorators = [_internal_only]
+
+
+class PoolResource(InternalResource):
+    def get(self) -> Any:
+        pool = db.engine.pool
+
+        if not isinstance(pool, InstrumentedQueuePool):
+            return dict(message=f"{type(pool).__name__} is not instrumented"), 404
+
+        return pool.report()
+
+
+class ProfilingResource(InternalResource):
+    def get(self) -> Any:
+        if not profiler.is_enabled:
+            return dict(message="Profiling is disabled"), 404
+
+        return profiler.report()
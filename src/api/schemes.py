@@ -2,9 +2,9 @@ from functools import partial
 
 from marshmallow import Schema, fields, EXCLUDE, post_dump
 
-from orm.models import User
-from tools.utils import length_validator_by_column, ascii_range_as
-from tools.validators import CharactersValidator
+from orm.models import User, Message
+from tools.utils import ascii_range_as
+from tools.validators import CharactersValidator, length_validator_by_column
 
 
 class UserSchema(Schema):
@@ -45,4 +45,21 @@ class UserSchema(Schema):
 user_schema_without_passwords = partial(
     UserSchema,
     exclude=('password', 'password_hash')
-)
\ No newline at end of file
+)
+
+
+class MessageSchema(Schema):
+    class Meta:
+        unknown = EXCLUDE
+
+    id = fields.Integer(dump_only=True)
+    room_id = fields.Integer(dump_only=True)
+    author_id = fields.Integer(dump_only=True)
+
+    text = fields.String(
+        required=True,
+        validate=[length_validator_by_column("text", Message)],
+        error_messages={"required": "Text is required."}
+    )
+
+    creation_time = fields.DateTime(dump_only=True)
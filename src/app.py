@@ -1,25 +1,176 @@
-from flask import Flask, Config
-from flask_middlewares import MultipleMiddlewareRegistrar
+from contextlib import contextmanager
+from functools import partial
+from logging import INFO
+from typing import Iterator
+
+from flask import Flask
 from flask_migrate import Migrate
-from flask_pack import config_from
 
-from api import api_blueprint
 from orm import db
-from views import view_blueprint
+from tools.startup import StartupRecorder
+
+
+migrate = Migrate()
+
+
+def create_app(config: str | object = "config") -> Flask:
+    """
+    Function to create the application by the input config object or its
+    import name.
+
+    Blueprints and middlewares are imported on creation, so that importing this
+    module stays cheap, and API resources with their schemes are imported on
+    the first request to them.
+
+    Stateful components, like caches and the session store, are created by
+    the config of each application and kept in its extensions. Background
+    threads and processes they start are stopped by `stop_app`.
+    """
+
+    app = Flask(__name__)
+    startup_recorder = StartupRecorder()
+
+    with startup_recorder.stage("config"):
+        app.config.from_object(config)
+
+    if not app.config.get("SECRET_KEY"):
+        raise ValueError("Environment variable SECRET_KEY not set")
+
+    if "DATABASE_PASSWORD" in app.config and app.config["DATABASE_PASSWORD"] is None:
+        raise ValueError("Environment variable DATABASE_PASSWORD not set")
+
+    with startup_recorder.stage("blueprints"):
+        from api import api_blueprint
+        from views import view_blueprint
+
+        app.register_blueprint(api_blueprint, url_prefix='/api')
+        app.register_blueprint(view_blueprint)
+
+    with startup_recorder.stage("tokens"):
+        from adapters.tokens import JWTSerializator
+
+        app.extensions["token_serializator"] = JWTSerializator.from_config(app.config)
+
+    with startup_recorder.stage("database"):
+        from adapters.pools import engine_options_from
+
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = (
+            engine_options_from(app.config) | app.config.get("SQLALCHEMY_ENGINE_OPTIONS", dict())
+        )
+
+        db.init_app(app)
+        migrate.init_app(app, db)
+
+    with startup_recorder.stage("components"):
+        from api.components import components_from
+
+        app.extensions.update(components_from(app.config))
+        app.extensions["stopping_events"] = list()
+
+    with startup_recorder.stage("middlewares"):
+        from flask_middlewares import MultipleMiddlewareRegistrar
+        from flask_pack import config_from
+
+        middleware_config = config_from("middlewares.config")
+
+        MultipleMiddlewareRegistrar.from_config(middleware_config, environments_only=True).init_app(app)
+
+    if app.config.get("PROFILING"):
+        with startup_recorder.stage("profiling"):
+            _init_profiling_of(app)
+
+    with startup_recorder.stage("sessions"):
+        _init_sessions_of(app)
+
+    with startup_recorder.stage("filters"):
+        _init_filters_of(app)
+
+    with startup_recorder.stage("revocations"):
+        _init_revocations_of(app)
+
+    app.extensions["startup_report"] = startup_recorder.report
+
+    if app.config.get("STARTUP_REPORT"):
+        app.logger.setLevel(INFO)
+        app.logger.info("\n".join(startup_recorder.report.lines()))
+
+    return app
+
+
+def stop_app(app: Flask) -> None:
+    """Function to stop background threads and processes of the application."""
+
+    for stopping_event in app.extensions["stopping_events"]:
+        stopping_event.set()
+
+    app.extensions["stopping_events"].clear()
+    app.extensions["password_hasher"].shutdown()
+
+
+def _init_profiling_of(app: Flask) -> None:
+    from flask_middlewares import MiddlewareRegistrar
+
+    from middlewares.middlewares import profile_view
+    from tools.profiling import profiler, profile_statements_of
+
+    MiddlewareRegistrar([profile_view]).init_app(app)
+
+    profiler.is_enabled = True
+    profiler.sampling_rate = app.config.get("PROFILING_SAMPLING_RATE", 0)
+    profiler.profile_directory = app.config.get("PROFILING_DIRECTORY")
+
+    with app.app_context():
+        profile_statements_of(db.engine, profiler)
+
+
+@contextmanager
+def _committing_context_of(app: Flask) -> Iterator[None]:
+    with app.app_context():
+        yield
+        db.session.commit()
+
+
+def _init_sessions_of(app: Flask) -> None:
+    session_store = app.extensions["session_store"]
+
+    with app.app_context():
+        session_store.load()
+
+    app.extensions["stopping_events"].append(session_store.purge_periodically(
+        app.config["SESSION_PURGE_INTERVAL_SECONDS"],
+        context=partial(_committing_context_of, app)
+    ))
+
+
+def _init_filters_of(app: Flask) -> None:
+    from adapters.repositories import SQLAlchemyRepository
+    from orm.models import User
+
+    with app.app_context():
+        app.extensions["url_token_filter"].rebuild(
+            user.url_token for user in SQLAlchemyRepository(User, db).stream_by(order_by="id")
+        )
+
 
+def _init_revocations_of(app: Flask) -> None:
+    from middlewares.middlewares import access_token_decoder_of
 
-app = Flask(__name__)
-app.config.from_object("config")
+    token_revocations = app.extensions["token_revocations"]
 
-app.register_blueprint(api_blueprint, url_prefix='/api')
-app.register_blueprint(view_blueprint)
+    app.extensions["access_token_decoder"] = access_token_decoder_of(
+        app.extensions["token_serializator"].decode,
+        token_revocations,
+        app.config["ACCESS_TOKEN_CACHE_SIZE"]
+    )
 
-db.init_app(app)
-migrate = Migrate(app, db)
+    with app.app_context():
+        token_revocations.sync()
 
-middleware_config = config_from("middlewares.config")
+    app.extensions["stopping_events"].append(token_revocations.sync_periodically(
+        app.config["TOKEN_REVOCATION_SYNC_INTERVAL_SECONDS"],
+        context=partial(_committing_context_of, app)
+    ))
 
-MultipleMiddlewareRegistrar.from_config(middleware_config, environments_only=True).init_app(app)
 
 if __name__ == "__main__":
-    app.run(port='8048')
+    create_app().run(port='8048')
@@ -0,0 +1,46 @@
+from argparse import ArgumentParser
+
+from benchmarks.cases import *
+from benchmarks.core import benchmarks, run_benchmarks, regressions_between, save_results, load_results, BenchmarkResult
+
+
+def _report(result: BenchmarkResult) -> None:
+    print(
+        f"{result.name:<48} {str(result.size or '-'):>9} "
+        f"{result.throughput:>14.1f}/s "
+        f"p50 {result.p50_seconds * 1e6:>12.1f}us "
+        f"p99 {result.p99_seconds * 1e6:>12.1f}us",
+        flush=True
+    )
+
+
+parser = ArgumentParser(description="Benchmarks of repository, middleware, schema and token hot paths.")
+parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000], help="numbers of seeded users")
+parser.add_argument("--only", nargs="+", default=tuple(), help="parts of names of benchmarks to run")
+parser.add_argument("--min-seconds", type=float, default=1, help="minimum duration of each benchmark")
+parser.add_argument("--output", default="benchmark-results.json", help="path to save results to")
+parser.add_argument("--baseline", help="path to results to compare with")
+parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative slowdown")
+
+arguments = parser.parse_args()
+
+results = run_benchmarks(
+    (
+        benchmark_ for name, benchmark_ in benchmarks.items()
+        if not arguments.only or any(part in name for part in arguments.only)
+    ),
+    arguments.sizes,
+    min_seconds=arguments.min_seconds,
+    reporter=_report
+)
+
+save_results(results, arguments.output)
+
+if arguments.baseline is not None:
+    regressions = regressions_between(results, load_results(arguments.baseline), tolerance=arguments.tolerance)
+
+    for regression in regressions:
+        print(f"REGRESSION {regression.result.name} ({regression.result.size or '-'}): {regression.reason}")
+
+    if regressions:
+        raise SystemExit(1)
@@ -0,0 +1,372 @@
+from atexit import register as register_at_exit
+from functools import lru_cache
+from itertools import cycle, islice, count
+from asyncio import run, gather
+from multiprocessing import get_context
+from random import Random
+from tempfile import mkdtemp
+from threading import Event, Lock
+from os import path
+from typing import Callable, Any, Optional, Tuple
+
+from flask import Flask
+from flask.ctx import AppContext
+from pyhandling import then, to
+from jwt.algorithms import has_crypto
+from sqlalchemy import insert
+
+from adapters.brokers import UnixSocketBroker
+from adapters.repositories import SQLAlchemyRepository, MemoryRepository
+from adapters.tokens import JWTSerializator, KeyRing, token_key_of
+from api.schemes import UserSchema, user_schema_without_passwords
+from benchmarks.core import benchmark
+from benchmarks.workers import acknowledge_broker_messages
+from gateway.load import GatewayFanOut
+from gateway.rooms import WebSocketConnection, RoomHub
+from infrastructure.controllers import convert_by, search_in
+from orm import db
+from orm.models import User
+from services.brokers import IBroker, LocalBroker
+from services.hashing import PoolPasswordHasher
+from services.tokens import CachingTokenDecoder, validate_access_token
+from tools.schemes import compiled
+from tools.utils import chunks_of, get_time_after, dict_value_map, data_additing_decorator_by, fused
+
+
+_SEED = 48
+_SEEDING_CHUNK_SIZE = 10_000
+
+
+class _UserRecord:
+    __slots__ = ("id", "url_token", "password_hash")
+
+    def __init__(self, id: int, url_token: str, password_hash: str):
+        self.id = id
+        self.url_token = url_token
+        self.password_hash = password_hash
+
+
+def _url_token_of(user_number: int) -> str:
+    return f"user-{user_number:08d}"
+
+
+def _user_records_of(size: int) -> Tuple[_UserRecord]:
+    return tuple(
+        _UserRecord(user_number, _url_token_of(user_number), f"hash-{user_number}")
+        for user_number in range(1, size + 1)
+    )
+
+
+def _searched_url_tokens_of(size: int, number: int = 4096) -> cycle:
+    random = Random(_SEED)
+
+    return cycle([_url_token_of(random.randint(1, size)) for _ in range(number)])
+
+
+_sqlite_app_contexts: list[AppContext] = list()
+
+
+@register_at_exit
+def _pop_sqlite_app_contexts() -> None:
+    while _sqlite_app_contexts:
+        engine = db.engine
+        _sqlite_app_contexts.pop().pop()
+        engine.dispose()
+
+
+@lru_cache(maxsize=1)
+def _sqlite_app_of(size: int) -> Flask:
+    _pop_sqlite_app_contexts()
+
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+
+    db.init_app(app)
+
+    # Operations of the SQLite benchmarks use the session of this context
+    # until the app of another size replaces it
+    app_context = app.app_context()
+    app_context.push()
+    _sqlite_app_contexts.append(app_context)
+
+    db.create_all()
+
+    for user_chunk in chunks_of(_SEEDING_CHUNK_SIZE, _user_records_of(size)):
+        db.session.execute(insert(User), [
+            dict(url_token=user.url_token, password_hash=user.password_hash)
+            for user in user_chunk
+        ])
+
+    db.session.commit()
+
+    return app
+
+
+@benchmark("repository.sqlalchemy.get_by")
+def _sqlalchemy_getting(size: int) -> Callable[[], Any]:
+    _sqlite_app_of(size)
+    repository = SQLAlchemyRepository(User, db)
+    url_tokens = _searched_url_tokens_of(size)
+
+    return lambda: repository.get_by(url_token=next(url_tokens))
+
+
+@benchmark("repository.sqlalchemy.get_each_by")
+def _sqlalchemy_batch_getting(size: int) -> Callable[[], Any]:
+    _sqlite_app_of(size)
+    repository = SQLAlchemyRepository(User, db)
+    url_tokens = _searched_url_tokens_of(size)
+    url_token_chunks = cycle(chunks_of(100, islice(url_tokens, 4096)))
+
+    return lambda: repository.get_each_by("url_token", next(url_token_chunks))
+
+
+@benchmark("repository.sqlalchemy.stream_by")
+def _sqlalchemy_streaming(size: int) -> Callable[[], Any]:
+    _sqlite_app_of(size)
+    repository = SQLAlchemyRepository(User, db)
+
+    return lambda: tuple(repository.stream_by(order_by="id", limit=1000))
+
+
+@benchmark("controllers.search_in")
+def _user_searching(size: int) -> Callable[[], Any]:
+    _sqlite_app_of(size)
+    repository = SQLAlchemyRepository(User, db)
+    schema = compiled(user_schema_without_passwords(many=True))
+    url_tokens = _searched_url_tokens_of(size)
+
+    return lambda: search_in(
+        repository,
+        convert_by(schema, [dict(url_token=next(url_tokens)) for _ in range(10)])
+    )
+
+
+@benchmark("repository.memory.get_by")
+def _memory_getting(size: int) -> Callable[[], Any]:
+    repository = MemoryRepository(_user_records_of(size), hash_indexed=("url_token", ))
+    url_tokens = _searched_url_tokens_of(size)
+
+    return lambda: repository.get_by(url_token=next(url_tokens))
+
+
+@benchmark("repository.linear_scan.get_by", max_size=100_000)
+def _linear_scan_getting(size: int) -> Callable[[], Any]:
+    users = _user_records_of(size)
+    url_tokens = _searched_url_tokens_of(size)
+
+    def get_user() -> Optional[_UserRecord]:
+        url_token = next(url_tokens)
+
+        return next((user for user in users if user.url_token == url_token), None)
+
+    return get_user
+
+
+@benchmark("schema.marshmallow.dump", is_sized=False)
+def _schema_dumping(_: None) -> Callable[[], Any]:
+    schema = UserSchema(many=True)
+    users = _user_records_of(10_000)
+
+    return lambda: schema.dump(users)
+
+
+@benchmark("schema.compiled.dump", is_sized=False)
+def _compiled_schema_dumping(_: None) -> Callable[[], Any]:
+    schema = compiled(UserSchema(many=True))
+    users = _user_records_of(10_000)
+
+    return lambda: schema.dump(users)
+
+
+@benchmark("schema.compiled.convert_by", is_sized=False)
+def _converting(_: None) -> Callable[[], Any]:
+    schema = compiled(user_schema_without_passwords(many=True))
+    chunk = [dict(url_token=user.url_token) for user in _user_records_of(10_000)]
+
+    return lambda: convert_by(schema, chunk)
+
+
+def _benchmark_key_of(algorithm: str) -> str | bytes:
+    if algorithm == "HS256":
+        return "benchmark-secret-key"
+
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa, ec, ed25519
+
+    private_key = {
+        "RS256": lambda: rsa.generate_private_key(public_exponent=65537, key_size=2048),
+        "ES256": lambda: ec.generate_private_key(ec.SECP256R1()),
+        "EdDSA": ed25519.Ed25519PrivateKey.generate,
+    }[algorithm]()
+
+    return private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption()
+    )
+
+
+def _access_token_and_serializator(algorithm: str = "HS256") -> Tuple[str, JWTSerializator]:
+    serializator = JWTSerializator(KeyRing(token_key_of("benchmark", algorithm, _benchmark_key_of(algorithm))))
+
+    return serializator.encode(dict(token="user", exp=get_time_after(60, is_time_raw=True))), serializator
+
+
+@benchmark("tokens.jwt.decode", is_sized=False)
+def _token_decoding(_: None) -> Callable[[], Any]:
+    token, serializator = _access_token_and_serializator()
+
+    return lambda: validate_access_token(token, serializator.decode)
+
+
+for _algorithm in ("RS256", "ES256", "EdDSA") if has_crypto else tuple():
+    @benchmark(f"tokens.jwt.decode.{_algorithm}", is_sized=False)
+    def _algorithm_token_decoding(_: None, algorithm: str = _algorithm) -> Callable[[], Any]:
+        token, serializator = _access_token_and_serializator(algorithm)
+
+        return lambda: validate_access_token(token, serializator.decode)
+
+
+@benchmark("tokens.caching.decode", is_sized=False)
+def _caching_token_decoding(_: None) -> Callable[[], Any]:
+    token, serializator = _access_token_and_serializator()
+    decoder = CachingTokenDecoder(serializator.decode)
+
+    return lambda: validate_access_token(token, decoder)
+
+
+class _DrainedConnection(WebSocketConnection):
+    def drain(self) -> None:
+        while not self._queue.empty():
+            self._frame_of(self._queue.get_nowait())
+
+
+@benchmark("gateway.room_hub.publish", max_size=100_000)
+def _room_publishing(size: int) -> Callable[[], Any]:
+    hub = RoomHub()
+    connections = tuple(_DrainedConnection(None, 1) for _ in range(size // 100))
+
+    for connection in connections:
+        hub.subscribe("room", connection)
+
+    def publish() -> None:
+        hub.publish("room", "benchmark message")
+
+        for connection in connections:
+            connection.drain()
+
+    return publish
+
+
+@benchmark("gateway.connections.fan_out", max_size=10_000)
+def _gateway_fan_out(size: int) -> Callable[[], Any]:
+    return GatewayFanOut(size)
+
+
+def _broker_publishing_by(
+    broker: IBroker,
+    delivery_number: int,
+    *,
+    handler_number: int = 1,
+    acknowledgement_room: str = "room"
+) -> Callable[[], Any]:
+    delivery_lock = Lock()
+    delivery_event = Event()
+    message_numbers = count()
+    current_message = None
+    remaining_deliveries = 0
+
+    def handle(_, message: str) -> None:
+        nonlocal remaining_deliveries
+
+        with delivery_lock:
+            if message != current_message:
+                return
+
+            remaining_deliveries -= 1
+
+            if remaining_deliveries == 0:
+                delivery_event.set()
+
+    def publish(*, timeout: Optional[float] = None) -> bool:
+        nonlocal current_message, remaining_deliveries
+
+        with delivery_lock:
+            current_message = f"benchmark message {next(message_numbers)}"
+            remaining_deliveries = delivery_number
+            delivery_event.clear()
+
+        broker.publish("room", current_message)
+
+        return delivery_event.wait(timeout)
+
+    for _ in range(handler_number):
+        broker.subscribe(acknowledgement_room, handle)
+
+    while not publish(timeout=0.1):
+        pass
+
+    return publish
+
+
+@benchmark("brokers.local.publish", is_sized=False)
+def _local_broker_publishing(_: None) -> Callable[[], Any]:
+    return _broker_publishing_by(LocalBroker(), 16, handler_number=16)
+
+
+for _worker_number in (1, 4, 16):
+    @benchmark(f"brokers.unix_socket.publish.{_worker_number}_workers", is_sized=False)
+    def _unix_socket_broker_publishing(_: None, worker_number: int = _worker_number) -> Callable[[], Any]:
+        socket_path = path.join(mkdtemp(), "broker.sock")
+        broker = UnixSocketBroker(socket_path)
+        context = get_context("spawn")
+
+        for _ in range(worker_number):
+            context.Process(
+                target=acknowledge_broker_messages,
+                args=(socket_path, "room", "acknowledgements"),
+                daemon=True
+            ).start()
+
+        return _broker_publishing_by(broker, worker_number, acknowledgement_room="acknowledgements")
+
+
+def _user_search_pipeline() -> Callable[[Any], Any]:
+    repository = MemoryRepository(_user_records_of(1000), hash_indexed=("url_token", ))
+    decorator = data_additing_decorator_by(lambda _: [dict(url_token=_url_token_of(1))])
+    search = (
+        (convert_by |to| compiled(user_schema_without_passwords(many=True)))
+        |then>> (search_in |to| repository)
+        |then>> (dict_value_map |to| compiled(user_schema_without_passwords()).dump)
+    )
+
+    return decorator(search)
+
+
+@benchmark("pipelines.user_search.plain", is_sized=False)
+def _plain_pipeline_calling(_: None) -> Callable[[], Any]:
+    pipeline = _user_search_pipeline()
+    chunk = [dict(url_token=_url_token_of(2))]
+
+    return lambda: pipeline(chunk)
+
+
+@benchmark("pipelines.user_search.fused", is_sized=False)
+def _fused_pipeline_calling(_: None) -> Callable[[], Any]:
+    pipeline = fused(_user_search_pipeline())
+    chunk = [dict(url_token=_url_token_of(2))]
+
+    return lambda: pipeline(chunk)
+
+
+for _burst_size in (1, 16):
+    @benchmark(f"hashing.pool.registration_burst.{_burst_size}", is_sized=False)
+    def _password_hashing_burst(_: None, burst_size: int = _burst_size) -> Callable[[], Any]:
+        hasher = PoolPasswordHasher(max_queue_depth=burst_size)
+
+        async def hash_burst() -> None:
+            await gather(*(hasher.hash_async(f"password-{number}") for number in range(burst_size)))
+
+        return lambda: run(hash_burst())
@@ -0,0 +1,187 @@
+from dataclasses import dataclass, asdict
+from json import dump, load
+from platform import platform, python_version
+from time import perf_counter
+from typing import Callable, Optional, Iterable, Any
+
+from tools.histograms import LogHistogram
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    name: str
+    operation_factory: Callable[[Optional[int]], Callable[[], Any]]
+    is_sized: bool = True
+    max_size: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class BenchmarkResult:
+    name: str
+    size: Optional[int]
+    operations: int
+    seconds: float
+    throughput: float
+    p50_seconds: float
+    p99_seconds: float
+
+
+@dataclass(frozen=True)
+class Regression:
+    result: BenchmarkResult
+    baseline: BenchmarkResult
+    reason: str
+
+
+benchmarks: dict[str, Benchmark] = dict()
+
+
+def benchmark(name: str, *, is_sized: bool = True, max_size: Optional[int] = None) -> Callable:
+    """
+    Decorator to register a function creating the benchmarked operation for a
+    data set size as a benchmark with the input name.
+    """
+
+    def registering_decorator(operation_factory: Callable[[Optional[int]], Callable[[], Any]]) -> Callable:
+        benchmarks[name] = Benchmark(name, operation_factory, is_sized, max_size)
+
+        return operation_factory
+
+    return registering_decorator
+
+
+def measure(
+    name: str,
+    size: Optional[int],
+    operation: Callable[[], Any],
+    *,
+    min_seconds: float = 1,
+    max_operations: int = 1_000_000,
+    warmup_operations: int = 10
+) -> BenchmarkResult:
+    """
+    Function to call the operation for at least `min_seconds` or until
+    `max_operations` are done, timing each call.
+    """
+
+    for _ in range(warmup_operations):
+        operation()
+
+    histogram = LogHistogram(lowest_value=1e-8)
+    start_time = perf_counter()
+    end_time = start_time
+
+    while histogram.count < max_operations and end_time - start_time < min_seconds:
+        operation_start_time = perf_counter()
+        operation()
+        end_time = perf_counter()
+
+        histogram.record(end_time - operation_start_time)
+
+    seconds = end_time - start_time
+
+    return BenchmarkResult(
+        name=name,
+        size=size,
+        operations=histogram.count,
+        seconds=seconds,
+        throughput=histogram.count / seconds if seconds else 0.,
+        p50_seconds=histogram.quantile(0.5),
+        p99_seconds=histogram.quantile(0.99)
+    )
+
+
+def run_benchmarks(
+    benchmarks_to_run: Iterable[Benchmark],
+    sizes: Iterable[int],
+    *,
+    min_seconds: float = 1,
+    reporter: Callable[[BenchmarkResult], Any] = lambda _: None
+) -> list[BenchmarkResult]:
+    """
+    Function to measure the input benchmarks for each of the input sizes.
+
+    Operations having a `close` method are closed right after they are
+    measured, so that their resources don't affect the next benchmarks.
+    """
+
+    benchmarks_to_run = tuple(benchmarks_to_run)
+    results = list()
+
+    def measure_by(benchmark_: Benchmark, size: Optional[int]) -> None:
+        operation = benchmark_.operation_factory(size)
+
+        try:
+            results.append(measure(benchmark_.name, size, operation, min_seconds=min_seconds))
+        finally:
+            if hasattr(operation, "close"):
+                operation.close()
+
+        reporter(results[-1])
+
+    for benchmark_ in benchmarks_to_run:
+        if not benchmark_.is_sized:
+            measure_by(benchmark_, None)
+
+    for size in sizes:
+        for benchmark_ in benchmarks_to_run:
+            if not benchmark_.is_sized or (benchmark_.max_size is not None and size > benchmark_.max_size):
+                continue
+
+            measure_by(benchmark_, size)
+
+    return results
+
+
+def regressions_between(
+    results: Iterable[BenchmarkResult],
+    baseline_results: Iterable[BenchmarkResult],
+    *,
+    tolerance: float = 0.2
+) -> list[Regression]:
+    """
+    Function to find results whose throughput dropped or whose p99 latency
+    grew by more than the tolerance relative to the same baseline results.
+    """
+
+    baseline_by_key = {(result.name, result.size): result for result in baseline_results}
+    regressions = list()
+
+    for result in results:
+        baseline = baseline_by_key.get((result.name, result.size))
+
+        if baseline is None:
+            continue
+
+        if result.throughput < baseline.throughput * (1 - tolerance):
+            regressions.append(Regression(
+                result,
+                baseline,
+                f"throughput {result.throughput:.1f}/s < {baseline.throughput:.1f}/s"
+            ))
+        elif result.p99_seconds > baseline.p99_seconds * (1 + tolerance):
+            regressions.append(Regression(
+                result,
+                baseline,
+                f"p99 {result.p99_seconds * 1e6:.1f}us > {baseline.p99_seconds * 1e6:.1f}us"
+            ))
+
+    return regressions
+
+
+def save_results(results: Iterable[BenchmarkResult], path: str) -> None:
+    with open(path, "w") as file:
+        dump(
+            dict(
+                python=python_version(),
+                platform=platform(),
+                results=[asdict(result) for result in results]
+            ),
+            file,
+            indent=2
+        )
+
+
+def load_results(path: str) -> list[BenchmarkResult]:
+    with open(path) as file:
+        return [BenchmarkResult(**result) for result in load(file)["results"]]
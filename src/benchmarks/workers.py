@@ -0,0 +1,15 @@
+from threading import Event
+
+from adapters.brokers import UnixSocketBroker
+
+
+def acknowledge_broker_messages(socket_path: str, room: str, acknowledgement_room: str) -> None:
+    """
+    Function to run a broker worker process that publishes each message of
+    the input room back to the acknowledgement room until terminated.
+    """
+
+    broker = UnixSocketBroker(socket_path)
+    broker.subscribe(room, lambda _, message: broker.publish(acknowledgement_room, message))
+
+    Event().wait()
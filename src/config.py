@@ -1,6 +1,5 @@
 from functools import partial
 from os import getenv
-from secrets import token_hex
 
 from dotenv import load_dotenv
 
@@ -9,20 +8,66 @@ load_dotenv()
 
 
 DEBUG = True
-SECRET_KEY = token_hex()
+SECRET_KEY = getenv('SECRET_KEY')
+
+TOKEN_ALGORITHM = getenv('TOKEN_ALGORITHM', 'HS256')
+TOKEN_KEY_DIRECTORY = getenv('TOKEN_KEY_DIRECTORY')
+TOKEN_ACTIVE_KEY_ID = getenv('TOKEN_ACTIVE_KEY_ID')
 
 DATABASE_NAME = getenv('DATABASE_NAME', 'online-chat-db')
 DATABASE_PATH = getenv('DATABASE_PATH', 'localhost:5432')
 DATABASE_USERNAME = getenv('DATABASE_USERNAME', 'postgres')
 DATABASE_PASSWORD = getenv('DATABASE_PASSWORD')
 
-if DATABASE_PASSWORD is None:
-    raise ValueError("Environment variable DATABASE_PASSWORD not set")
-
 
 SQLALCHEMY_DATABASE_URI = f"postgresql://{DATABASE_USERNAME}:{DATABASE_PASSWORD}@{DATABASE_PATH}/{DATABASE_NAME}"
 SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+DATABASE_POOL_SIZE = int(getenv('DATABASE_POOL_SIZE', 10))
+DATABASE_POOL_MAX_OVERFLOW = int(getenv('DATABASE_POOL_MAX_OVERFLOW', 10))
+DATABASE_POOL_TIMEOUT_SECONDS = float(getenv('DATABASE_POOL_TIMEOUT_SECONDS', 30))
+DATABASE_POOL_RECYCLE_SECONDS = int(getenv('DATABASE_POOL_RECYCLE_SECONDS', 1800))
+DATABASE_POOL_PRE_PING = getenv('DATABASE_POOL_PRE_PING', 'true').lower() in ('true', '1', 'yes')
+DATABASE_STATEMENT_TIMEOUT_MILLISECONDS = int(getenv('DATABASE_STATEMENT_TIMEOUT_MILLISECONDS', 5000))
+
+INTERNAL_API_TOKEN = getenv('INTERNAL_API_TOKEN')
+
+
+PAGE_MAX_SIZE = 1000
+
+USER_CACHE_SIZE = int(getenv('USER_CACHE_SIZE', 4096))
+USER_CACHE_TIME_TO_LIVE_SECONDS = float(getenv('USER_CACHE_TIME_TO_LIVE_SECONDS', 30))
+
+URL_TOKEN_FILTER_EXPECTED_SIZE = int(getenv('URL_TOKEN_FILTER_EXPECTED_SIZE', 1_000_000))
+URL_TOKEN_FILTER_FALSE_POSITIVE_RATE = float(getenv('URL_TOKEN_FILTER_FALSE_POSITIVE_RATE', 0.01))
+
+MESSAGE_PAGE_SIZE = 50
+MESSAGE_ROOM_BUFFER_CAPACITY = int(getenv('MESSAGE_ROOM_BUFFER_CAPACITY', 100))
+MESSAGE_BUFFER_MAX_ROOMS = int(getenv('MESSAGE_BUFFER_MAX_ROOMS', 1024))
+
 
 ACCESS_TOKEN_LIFE_MINUTES = 15
-REFRESH_TOKEN_LIFE_DAYS = 30
\ No newline at end of file
+ACCESS_TOKEN_CACHE_SIZE = int(getenv('ACCESS_TOKEN_CACHE_SIZE', 4096))
+REFRESH_TOKEN_LIFE_DAYS = 30
+
+TOKEN_REVOCATION_BUCKET_SECONDS = float(getenv('TOKEN_REVOCATION_BUCKET_SECONDS', 3600))
+TOKEN_REVOCATION_SYNC_INTERVAL_SECONDS = float(getenv('TOKEN_REVOCATION_SYNC_INTERVAL_SECONDS', 5))
+TOKEN_REVOCATION_SYNC_BATCH_SIZE = int(getenv('TOKEN_REVOCATION_SYNC_BATCH_SIZE', 1000))
+
+SESSION_PURGE_INTERVAL_SECONDS = float(getenv('SESSION_PURGE_INTERVAL_SECONDS', 60))
+
+PASSWORD_HASHING_WORKER_NUMBER = int(getenv('PASSWORD_HASHING_WORKER_NUMBER', 2))
+PASSWORD_HASHING_MAX_QUEUE_DEPTH = int(getenv('PASSWORD_HASHING_MAX_QUEUE_DEPTH', 32))
+PASSWORD_HASHING_COST = int(getenv('PASSWORD_HASHING_COST', 2 ** 14))
+
+
+GATEWAY_CONNECTION_QUEUE_SIZE = int(getenv('GATEWAY_CONNECTION_QUEUE_SIZE', 64))
+
+BROKER_SOCKET_PATH = getenv('BROKER_SOCKET_PATH', '/tmp/online-chat-broker.sock')
+
+
+PROFILING = getenv('PROFILING', 'false').lower() in ('true', '1', 'yes')
+PROFILING_SAMPLING_RATE = float(getenv('PROFILING_SAMPLING_RATE', 0))
+PROFILING_DIRECTORY = getenv('PROFILING_DIRECTORY')
+
+STARTUP_REPORT = getenv('STARTUP_REPORT', 'false').lower() in ('true', '1', 'yes')
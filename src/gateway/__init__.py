@@ -0,0 +1 @@
+from gateway.server import *
\ No newline at end of file
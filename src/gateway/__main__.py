@@ -0,0 +1,75 @@
+from argparse import ArgumentParser
+from asyncio import run
+
+from flask import Flask
+
+from adapters.brokers import UnixSocketBroker
+from adapters.pools import engine_options_from
+from adapters.repositories import SQLAlchemyRepository
+from adapters.revocations import TokenRevocationIndex
+from adapters.tokens import JWTSerializator, key_ring_from
+from config import SECRET_KEY, TOKEN_ALGORITHM, TOKEN_KEY_DIRECTORY, TOKEN_ACTIVE_KEY_ID, ACCESS_TOKEN_CACHE_SIZE, GATEWAY_CONNECTION_QUEUE_SIZE, BROKER_SOCKET_PATH, TOKEN_REVOCATION_BUCKET_SECONDS, TOKEN_REVOCATION_SYNC_BATCH_SIZE, TOKEN_REVOCATION_SYNC_INTERVAL_SECONDS
+from gateway import Gateway
+from middlewares.middlewares import access_token_decoder_of
+from orm import db
+from orm.models import TokenRevocation
+
+
+def _database_app() -> Flask:
+    """Function to create an app giving the gateway access to the database."""
+
+    app = Flask(__name__)
+    app.config.from_object("config")
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options_from(app.config)
+
+    db.init_app(app)
+
+    return app
+
+
+async def main(host: str, port: int) -> None:
+    serializator = JWTSerializator(key_ring_from(
+        secret_key=SECRET_KEY,
+        algorithm=TOKEN_ALGORITHM,
+        key_directory=TOKEN_KEY_DIRECTORY,
+        active_key_id=TOKEN_ACTIVE_KEY_ID
+    ))
+
+    database_app = _database_app()
+    token_revocations = TokenRevocationIndex(
+        SQLAlchemyRepository(TokenRevocation, db),
+        bucket_seconds=TOKEN_REVOCATION_BUCKET_SECONDS,
+        sync_batch_size=TOKEN_REVOCATION_SYNC_BATCH_SIZE
+    )
+
+    with database_app.app_context():
+        token_revocations.sync()
+
+    # Rows of expired revocations are purged by the API
+    stopping_event = token_revocations.sync_periodically(
+        TOKEN_REVOCATION_SYNC_INTERVAL_SECONDS,
+        context=database_app.app_context,
+        is_purging=False
+    )
+
+    gateway = Gateway(
+        access_token_decoder_of(serializator.decode, token_revocations, ACCESS_TOKEN_CACHE_SIZE),
+        connection_queue_size=GATEWAY_CONNECTION_QUEUE_SIZE,
+        broker=UnixSocketBroker(BROKER_SOCKET_PATH)
+    )
+    server = await gateway.start(host, port, backlog=4096)
+
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        stopping_event.set()
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Real-time message gateway")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8049)
+
+    arguments = parser.parse_args()
+    run(main(arguments.host, arguments.port))
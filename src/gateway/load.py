@@ -0,0 +1,370 @@
+from argparse import ArgumentParser
+from asyncio import StreamReader, StreamWriter, Semaphore, IncompleteReadError, open_connection, gather, wait_for, sleep, run, new_event_loop, run_coroutine_threadsafe, TimeoutError
+from base64 import b64encode
+from dataclasses import dataclass
+from multiprocessing import get_context
+from multiprocessing.connection import Connection as PipeConnection
+from multiprocessing.process import BaseProcess
+from os import urandom, sched_setaffinity, path
+from tempfile import TemporaryDirectory
+from threading import Thread
+from time import perf_counter
+from typing import Optional, Tuple, Any, AsyncIterator, Coroutine, Self
+
+from adapters.brokers import UnixSocketBroker
+from gateway.protocols import Opcode, ProtocolError, websocket_accept_key_for, websocket_messages_of
+from tools.histograms import LogHistogram
+
+
+_room = "load-test"
+
+
+@dataclass(frozen=True)
+class LoadTestResult:
+    connection_number: int
+    connected_number: int
+    connection_seconds: float
+    message_number: int
+    delivered_number: int
+    delivery_p50_seconds: float
+    delivery_p99_seconds: float
+
+    @property
+    def delivery_rate(self) -> float:
+        expected_number = self.connected_number * self.message_number
+
+        return self.delivered_number / expected_number if expected_number else 0.
+
+
+def run_load_test(
+    connection_number: int,
+    *,
+    message_number: int = 10,
+    message_interval: float = 0.1,
+    connecting_concurrency: int = 256,
+    timeout: float = 60,
+    cpu: Optional[int] = 0
+) -> LoadTestResult:
+    """
+    Function to measure a gateway serving the input number of concurrent
+    WebSocket connections to one room.
+
+    The gateway runs in its own process pinned to the input CPU, so that it
+    serves all connections on one core, and its clients run in the calling
+    process. Each message is published through a Unix socket broker hosted by
+    the calling process and is timed until each client receives it.
+    """
+
+    secret_key = urandom(32).hex()
+
+    with TemporaryDirectory() as broker_directory:
+        broker = UnixSocketBroker(path.join(broker_directory, "broker.sock"))
+        gateway_process, port = _started_gateway_process_of(secret_key, broker.path, cpu, timeout)
+
+        try:
+            return run(_load_gateway(
+                port,
+                _access_token_of(secret_key),
+                broker,
+                connection_number,
+                message_number=message_number,
+                message_interval=message_interval,
+                connecting_concurrency=connecting_concurrency,
+                timeout=timeout
+            ))
+        finally:
+            gateway_process.terminate()
+            gateway_process.join()
+
+
+class GatewayFanOut:
+
+    """
+    Gateway with the input number of WebSocket connections to one room, which
+    receive messages published through a broker.
+
+    The gateway runs in its own process pinned to the input CPU like in a load
+    test, and its clients run in an event loop of a background thread, so
+    that a message can be published synchronously until each connection
+    receives it.
+    """
+
+    def __init__(
+        self,
+        connection_number: int,
+        *,
+        connecting_concurrency: int = 256,
+        timeout: float = 60,
+        cpu: Optional[int] = 0
+    ):
+        self._timeout = timeout
+        self._loop = new_event_loop()
+        self._broker_directory = TemporaryDirectory()
+        self._broker = UnixSocketBroker(path.join(self._broker_directory.name, "broker.sock"))
+
+        secret_key = urandom(32).hex()
+        self._gateway_process, port = _started_gateway_process_of(secret_key, self._broker.path, cpu, timeout)
+        Thread(target=self._loop.run_forever, daemon=True).start()
+
+        try:
+            self._clients = self.__run(_connected_clients_of(
+                port,
+                _access_token_of(secret_key),
+                connection_number,
+                connecting_concurrency=connecting_concurrency
+            ))
+            # Connections are subscribed to the room right after the handshake
+            self.__run(sleep(0.1))
+        except BaseException:
+            self.close()
+            raise
+
+        self._message_streams = tuple(
+            websocket_messages_of(reader, 1024, is_masked=False)
+            for reader, _ in self._clients
+        )
+
+    @property
+    def connected_number(self) -> int:
+        return len(self._clients)
+
+    def publish(self) -> int:
+        """
+        Method to publish a message and wait until each connection receives it,
+        returning the number of connections that received it in time.
+        """
+
+        return self.__run(self.__publish())
+
+    def __call__(self) -> int:
+        return self.publish()
+
+    def close(self) -> None:
+        for _, writer in getattr(self, "_clients", tuple()):
+            self._loop.call_soon_threadsafe(writer.close)
+
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._gateway_process.terminate()
+        self._gateway_process.join()
+        self._broker_directory.cleanup()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    async def __publish(self) -> int:
+        if not self._clients:
+            return 0
+
+        self._broker.publish(_room, str(perf_counter()))
+
+        deadline = perf_counter() + self._timeout
+        received_numbers = await gather(*(
+            _received_message_number_of(messages, 1, None, deadline)
+            for messages in self._message_streams
+        ))
+
+        return sum(received_numbers)
+
+    def __run(self, coroutine: Coroutine) -> Any:
+        return run_coroutine_threadsafe(coroutine, self._loop).result()
+
+
+def _started_gateway_process_of(
+    secret_key: str,
+    broker_path: str,
+    cpu: Optional[int],
+    timeout: float
+) -> Tuple[BaseProcess, int]:
+    context = get_context("spawn")
+    port_receiving_connection, port_sending_connection = context.Pipe(duplex=False)
+    gateway_process = context.Process(
+        target=_serve_gateway,
+        args=(secret_key, broker_path, port_sending_connection, cpu),
+        daemon=True
+    )
+    gateway_process.start()
+
+    if not port_receiving_connection.poll(timeout):
+        gateway_process.terminate()
+        gateway_process.join()
+
+        raise TimeoutError("Gateway of the load test didn't start")
+
+    return gateway_process, port_receiving_connection.recv()
+
+
+async def _connected_clients_of(
+    port: int,
+    access_token: str,
+    connection_number: int,
+    *,
+    connecting_concurrency: int
+) -> Tuple[Tuple[StreamReader, StreamWriter]]:
+    connecting_semaphore = Semaphore(connecting_concurrency)
+
+    async def connect() -> Optional[Tuple[StreamReader, StreamWriter]]:
+        async with connecting_semaphore:
+            try:
+                return await _websocket_client_of("127.0.0.1", port, access_token)
+            except (OSError, ProtocolError):
+                return None
+
+    return tuple(client for client in await gather(*(connect() for _ in range(connection_number))) if client)
+
+
+async def _load_gateway(
+    port: int,
+    access_token: str,
+    broker: UnixSocketBroker,
+    connection_number: int,
+    *,
+    message_number: int,
+    message_interval: float,
+    connecting_concurrency: int,
+    timeout: float
+) -> LoadTestResult:
+    start_time = perf_counter()
+    clients = await _connected_clients_of(
+        port,
+        access_token,
+        connection_number,
+        connecting_concurrency=connecting_concurrency
+    )
+    connection_seconds = perf_counter() - start_time
+
+    histogram = LogHistogram(lowest_value=1e-6)
+
+    try:
+        # Connections are subscribed to the room right after the handshake
+        await sleep(message_interval)
+
+        receiving = gather(*(
+            _received_message_number_of(
+                websocket_messages_of(reader, 1024, is_masked=False),
+                message_number,
+                histogram,
+                perf_counter() + timeout
+            )
+            for reader, _ in clients
+        ))
+
+        for _ in range(message_number):
+            broker.publish(_room, str(perf_counter()))
+            await sleep(message_interval)
+
+        delivered_numbers = await receiving
+    finally:
+        for _, writer in clients:
+            writer.close()
+
+    return LoadTestResult(
+        connection_number=connection_number,
+        connected_number=len(clients),
+        connection_seconds=connection_seconds,
+        message_number=message_number,
+        delivered_number=sum(delivered_numbers),
+        delivery_p50_seconds=histogram.quantile(0.5),
+        delivery_p99_seconds=histogram.quantile(0.99)
+    )
+
+
+async def _websocket_client_of(host: str, port: int, access_token: str) -> Tuple[StreamReader, StreamWriter]:
+    reader, writer = await open_connection(host, port)
+    key = b64encode(urandom(16)).decode()
+
+    writer.write((
+        f"GET /rooms/{_room} HTTP/1.1\r\n"
+        f"Host: {host}:{port}\r\n"
+        "Upgrade: websocket\r\n"
+        "Connection: Upgrade\r\n"
+        f"Sec-WebSocket-Key: {key}\r\n"
+        "Sec-WebSocket-Version: 13\r\n"
+        f"Authorization: Bearer {access_token}\r\n"
+        "\r\n"
+    ).encode())
+    await writer.drain()
+
+    head = await reader.readuntil(b"\r\n\r\n")
+
+    if not head.startswith(b"HTTP/1.1 101") or websocket_accept_key_for(key).encode() not in head:
+        status_line = head.split(b"\r\n", 1)[0]
+        writer.close()
+
+        raise ProtocolError(f"Gateway refused the connection with {status_line!r}")
+
+    return reader, writer
+
+
+async def _received_message_number_of(
+    messages: AsyncIterator[Tuple[Opcode, bytes]],
+    message_number: int,
+    histogram: Optional[LogHistogram],
+    deadline: float
+) -> int:
+    received_number = 0
+
+    while received_number < message_number:
+        try:
+            opcode, payload = await wait_for(anext(messages), deadline - perf_counter())
+        except (StopAsyncIteration, TimeoutError, IncompleteReadError, OSError, ProtocolError):
+            break
+
+        if opcode is Opcode.CLOSE:
+            break
+        elif opcode is Opcode.TEXT:
+            if histogram is not None:
+                histogram.record(perf_counter() - float(payload))
+
+            received_number += 1
+
+    return received_number
+
+
+def _access_token_of(secret_key: str) -> str:
+    from adapters.tokens import JWTSerializator, key_ring_from
+    from services.tokens import token_claims_for
+
+    return JWTSerializator(key_ring_from(secret_key=secret_key)).encode(token_claims_for("load-test", 60))
+
+
+def _serve_gateway(secret_key: str, broker_path: str, port_connection: PipeConnection, cpu: Optional[int]) -> None:
+    from adapters.tokens import JWTSerializator, key_ring_from
+    from gateway.server import Gateway
+    from services.tokens import CachingTokenDecoder
+
+    if cpu is not None:
+        sched_setaffinity(0, {cpu})
+
+    async def serve() -> None:
+        gateway = Gateway(
+            CachingTokenDecoder(JWTSerializator(key_ring_from(secret_key=secret_key)).decode),
+            broker=UnixSocketBroker(broker_path)
+        )
+        server = await gateway.start("127.0.0.1", 0, backlog=4096)
+        port_connection.send(server.sockets[0].getsockname()[1])
+
+        async with server:
+            await server.serve_forever()
+
+    run(serve())
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Load test of the gateway serving WebSocket connections on one core")
+    parser.add_argument("--connections", type=int, default=10_000)
+    parser.add_argument("--messages", type=int, default=10)
+    parser.add_argument("--cpu", type=int, default=0)
+
+    arguments = parser.parse_args()
+    result = run_load_test(arguments.connections, message_number=arguments.messages, cpu=arguments.cpu)
+
+    print(
+        f"connected {result.connected_number}/{result.connection_number} "
+        f"in {result.connection_seconds:.2f}s, "
+        f"delivered {result.delivery_rate:.2%} of messages, "
+        f"p50 {result.delivery_p50_seconds * 1e3:.1f}ms, "
+        f"p99 {result.delivery_p99_seconds * 1e3:.1f}ms"
+    )
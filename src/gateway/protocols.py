@@ -0,0 +1,187 @@
+from asyncio import StreamReader, StreamWriter, IncompleteReadError
+from base64 import b64encode
+from enum import IntEnum
+from hashlib import sha1
+from struct import pack, unpack
+from typing import Optional, Tuple, AsyncIterator, Final
+
+
+class Opcode(IntEnum):
+    CONTINUATION = 0x0
+    TEXT = 0x1
+    BINARY = 0x2
+    CLOSE = 0x8
+    PING = 0x9
+    PONG = 0xA
+
+
+class ProtocolError(Exception):
+    pass
+
+
+class MessageTooBigError(ProtocolError):
+    pass
+
+
+_WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+def websocket_accept_key_for(key: str) -> str:
+    return b64encode(sha1((key + _WEBSOCKET_GUID).encode()).digest()).decode()
+
+
+def websocket_frame_of(payload: bytes, opcode: Opcode = Opcode.TEXT, *, mask: Optional[bytes] = None) -> bytes:
+    """
+    Function to get a final frame, unmasked as the server sends them or masked
+    by the input mask as clients do.
+    """
+
+    length = len(payload)
+    mask_bit = 0x80 if mask is not None else 0
+
+    if length < 126:
+        header = pack("!BB", 0x80 | opcode, mask_bit | length)
+    elif length < 1 << 16:
+        header = pack("!BBH", 0x80 | opcode, mask_bit | 126, length)
+    else:
+        header = pack("!BBQ", 0x80 | opcode, mask_bit | 127, length)
+
+    return header + payload if mask is None else header + mask + _unmasked(payload, mask)
+
+
+_MAX_CONTROL_PAYLOAD_SIZE: Final[int] = 125
+
+
+async def read_websocket_frame(
+    reader: StreamReader,
+    max_size: int,
+    *,
+    is_masked: bool = True
+) -> Tuple[bool, Opcode, bytes]:
+    """
+    Function to read a frame, masked as clients send them or unmasked as the
+    server does.
+
+    Control frames are limited by the protocol rather than by `max_size`.
+    """
+
+    first_byte, second_byte = await reader.readexactly(2)
+
+    if first_byte & 0x70:
+        raise ProtocolError("Frame uses reserved bits of an unnegotiated extension")
+
+    try:
+        opcode = Opcode(first_byte & 0x0F)
+    except ValueError as error:
+        raise ProtocolError(f"Frame has the reserved opcode {first_byte & 0x0F}") from error
+
+    is_final = bool(first_byte & 0x80)
+    length = second_byte & 0x7F
+
+    if bool(second_byte & 0x80) is not is_masked:
+        raise ProtocolError("Client frames must be masked" if is_masked else "Server frames must not be masked")
+
+    if length == 126:
+        length, = unpack("!H", await reader.readexactly(2))
+    elif length == 127:
+        length, = unpack("!Q", await reader.readexactly(8))
+
+    if opcode >= Opcode.CLOSE:
+        if not is_final:
+            raise ProtocolError("Control frames must not be fragmented")
+
+        if length > _MAX_CONTROL_PAYLOAD_SIZE:
+            raise ProtocolError(f"Control frame of {length} bytes exceeds {_MAX_CONTROL_PAYLOAD_SIZE} bytes")
+    elif length > max_size:
+        raise MessageTooBigError(f"Frame of {length} bytes exceeds {max_size} bytes")
+
+    mask = await reader.readexactly(4) if is_masked else None
+    payload = await reader.readexactly(length)
+
+    return is_final, opcode, _unmasked(payload, mask) if mask is not None else payload
+
+
+async def websocket_messages_of(
+    reader: StreamReader,
+    max_size: int,
+    *,
+    is_masked: bool = True
+) -> AsyncIterator[Tuple[Opcode, bytes]]:
+    """
+    Function to read data and control messages until the stream ends, joining
+    fragmented data messages.
+
+    Control messages arriving between fragments are given out as soon as they
+    are read, keeping the fragments read before them.
+    """
+
+    message_opcode: Optional[Opcode] = None
+    fragments = list()
+    size = 0
+
+    while True:
+        try:
+            is_final, opcode, payload = await read_websocket_frame(reader, max_size - size, is_masked=is_masked)
+        except IncompleteReadError:
+            if message_opcode is None:
+                return
+
+            raise
+
+        if opcode >= Opcode.CLOSE:
+            yield opcode, payload
+            continue
+
+        if (opcode is Opcode.CONTINUATION) is (message_opcode is None):
+            raise ProtocolError(
+                "Continuation frame doesn't continue a message"
+                if message_opcode is None
+                else "Data frame interrupts a fragmented message"
+            )
+
+        if message_opcode is None:
+            message_opcode = opcode
+
+        fragments.append(payload)
+        size += len(payload)
+
+        if is_final:
+            yield message_opcode, b"".join(fragments)
+
+            message_opcode = None
+            fragments = list()
+            size = 0
+
+
+def sse_event_of(data: str, event: Optional[str] = None) -> bytes:
+    return (
+        (f"event: {event}\n" if event is not None else "")
+        + "".join(f"data: {line}\n" for line in data.split("\n"))
+        + "\n"
+    ).encode()
+
+
+async def write_http_response(
+    writer: StreamWriter,
+    status: str,
+    headers: dict[str, str] = dict(),
+    body: bytes = b""
+) -> None:
+    writer.write(
+        f"HTTP/1.1 {status}\r\n".encode()
+        + "".join(f"{name}: {value}\r\n" for name, value in headers.items()).encode()
+        + b"\r\n"
+        + body
+    )
+    await writer.drain()
+
+
+def _unmasked(payload: bytes, mask: bytes) -> bytes:
+    length = len(payload)
+
+    if not length:
+        return payload
+
+    full_mask = (mask * (length // 4 + 1))[:length]
+
+    return (int.from_bytes(payload, "big") ^ int.from_bytes(full_mask, "big")).to_bytes(length, "big")
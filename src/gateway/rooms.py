@@ -0,0 +1,95 @@
+from abc import ABC, abstractmethod
+from asyncio import Queue, QueueFull, StreamWriter
+from collections import defaultdict
+from typing import Hashable, Iterable
+
+from gateway.protocols import Opcode, websocket_frame_of, sse_event_of
+
+
+class Connection(ABC):
+    """
+    Client connection with a bounded queue of undelivered messages.
+
+    Messages are written to the client by a single delivery loop, so a slow
+    client only fills its own queue.
+    """
+
+    def __init__(self, writer: StreamWriter, queue_size: int):
+        self.writer = writer
+        self.is_overloaded = False
+        self._queue = Queue[str](queue_size)
+
+    def offer(self, message: str) -> bool:
+        try:
+            self._queue.put_nowait(message)
+        except QueueFull:
+            self.is_overloaded = True
+            self.writer.close()
+
+            return False
+
+        return True
+
+    async def deliver_forever(self) -> None:
+        while not self.is_overloaded:
+            self.writer.write(self._frame_of(await self._queue.get()))
+            await self.writer.drain()
+
+    @abstractmethod
+    def _frame_of(self, message: str) -> bytes:
+        pass
+
+
+class WebSocketConnection(Connection):
+    def _frame_of(self, message: str) -> bytes:
+        return websocket_frame_of(message.encode(), Opcode.TEXT)
+
+
+class SSEConnection(Connection):
+    def _frame_of(self, message: str) -> bytes:
+        return sse_event_of(message)
+
+
+class RoomHub:
+    """
+    Registry of connections by room, delivering each published message to the
+    queues of room connections.
+
+    Connections whose queues are full are marked as overloaded and unsubscribed,
+    so that the gateway closes them instead of buffering without limit.
+    """
+
+    def __init__(self):
+        self._connections_by_room: defaultdict[Hashable, set[Connection]] = defaultdict(set)
+
+    @property
+    def rooms(self) -> Iterable[Hashable]:
+        return self._connections_by_room.keys()
+
+    def connection_number_of(self, room: Hashable) -> int:
+        return len(self._connections_by_room.get(room, tuple()))
+
+    def subscribe(self, room: Hashable, connection: Connection) -> None:
+        self._connections_by_room[room].add(connection)
+
+    def unsubscribe(self, room: Hashable, connection: Connection) -> None:
+        connections = self._connections_by_room.get(room)
+
+        if connections is None:
+            return
+
+        connections.discard(connection)
+
+        if not connections:
+            del self._connections_by_room[room]
+
+    def publish(self, room: Hashable, message: str) -> int:
+        delivered_number = 0
+
+        for connection in tuple(self._connections_by_room.get(room, tuple())):
+            if connection.offer(message):
+                delivered_number += 1
+            else:
+                self.unsubscribe(room, connection)
+
+        return delivered_number
@@ -0,0 +1,215 @@
+from asyncio import StreamReader, StreamWriter, Server, AbstractEventLoop, start_server, create_task, wait, get_running_loop, FIRST_COMPLETED, sleep, IncompleteReadError, LimitOverrunError
+from dataclasses import dataclass
+from typing import Optional
+from urllib.parse import urlsplit, parse_qs
+
+from gateway.protocols import Opcode, ProtocolError, MessageTooBigError, websocket_accept_key_for, websocket_frame_of, websocket_messages_of, write_http_response
+from gateway.rooms import RoomHub, Connection, WebSocketConnection, SSEConnection
+from services.brokers import IBroker
+from services.errors import AccessTokenError
+from services.tokens import token_decoder, bearer_token_of, validate_access_token
+
+
+@dataclass(frozen=True)
+class GatewayRequest:
+    method: str
+    path: str
+    query: dict[str, list[str]]
+    headers: dict[str, str]
+
+    @property
+    def access_token(self) -> Optional[str]:
+        authorization = self.headers.get("authorization")
+
+        if authorization is not None:
+            return bearer_token_of(authorization)
+
+        return self.query.get("token", [None])[0]
+
+
+class Gateway:
+    """
+    Asyncio server delivering room messages to WebSocket and Server-Sent
+    Events clients at `/rooms/<room>`.
+
+    The access token is taken from the Authorization header or the `token`
+    query parameter and is checked once on connection. Clients only receive
+    messages, which are posted through the API and published to rooms by the
+    broker, so WebSocket connections sending data are closed.
+    """
+
+    _room_path_prefix = "/rooms/"
+
+    def __init__(
+        self,
+        token_decoder: token_decoder,
+        *,
+        hub: Optional[RoomHub] = None,
+        connection_queue_size: int = 64,
+        max_message_size: int = 64 * 1024,
+        heartbeat_interval: float = 30,
+        broker: Optional[IBroker] = None
+    ):
+        self.hub = hub if hub is not None else RoomHub()
+        self.connection_queue_size = connection_queue_size
+        self.max_message_size = max_message_size
+        self.heartbeat_interval = heartbeat_interval
+
+        self._token_decoder = token_decoder
+        self._broker = broker
+        self._loop: Optional[AbstractEventLoop] = None
+
+    async def start(self, host: str, port: int, **server_options) -> Server:
+        self._loop = get_running_loop()
+
+        return await start_server(self.handle, host, port, **server_options)
+
+    async def handle(self, reader: StreamReader, writer: StreamWriter) -> None:
+        try:
+            try:
+                request = await self._read_request_from(reader)
+            except LimitOverrunError:
+                await write_http_response(writer, "431 Request Header Fields Too Large")
+                return
+            except ProtocolError:
+                await write_http_response(writer, "400 Bad Request")
+                return
+
+            if request is None:
+                return
+
+            if not request.path.startswith(self._room_path_prefix) or request.method != "GET":
+                await write_http_response(writer, "404 Not Found")
+                return
+
+            try:
+                validate_access_token(request.access_token, self._token_decoder)
+            except AccessTokenError as error:
+                await write_http_response(writer, "401 Unauthorized", body=str(error).encode())
+                return
+
+            room = request.path.removeprefix(self._room_path_prefix)
+
+            if request.headers.get("upgrade", "").lower() == "websocket":
+                await self._serve_websocket(room, request, reader, writer)
+            else:
+                await self._serve_sse(room, reader, writer)
+        except (ConnectionError, IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request_from(self, reader: StreamReader) -> Optional[GatewayRequest]:
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except IncompleteReadError:
+            return None
+
+        request_line, *header_lines = head.decode("latin-1").split("\r\n")[:-2]
+        request_line_parts = request_line.split(" ")
+
+        if len(request_line_parts) != 3 or not request_line_parts[2].startswith("HTTP/"):
+            raise ProtocolError(f"Malformed request line {request_line!r}")
+
+        method, target, _ = request_line_parts
+        url = urlsplit(target)
+
+        return GatewayRequest(
+            method=method,
+            path=url.path,
+            query=parse_qs(url.query),
+            headers={
+                name.strip().lower(): value.strip()
+                for name, value in (line.split(":", 1) for line in header_lines if ":" in line)
+            }
+        )
+
+    async def _serve_websocket(
+        self,
+        room: str,
+        request: GatewayRequest,
+        reader: StreamReader,
+        writer: StreamWriter
+    ) -> None:
+        key = request.headers.get("sec-websocket-key")
+
+        if key is None:
+            await write_http_response(writer, "400 Bad Request")
+            return
+
+        await write_http_response(writer, "101 Switching Protocols", {
+            "Upgrade": "websocket",
+            "Connection": "Upgrade",
+            "Sec-WebSocket-Accept": websocket_accept_key_for(key)
+        })
+
+        await self._serve_connection(
+            room,
+            WebSocketConnection(writer, self.connection_queue_size),
+            self._receive_websocket_messages(reader, writer)
+        )
+
+    async def _receive_websocket_messages(self, reader: StreamReader, writer: StreamWriter) -> None:
+        try:
+            async for opcode, payload in websocket_messages_of(reader, self.max_message_size):
+                if opcode is Opcode.CLOSE:
+                    writer.write(websocket_frame_of(payload[:2], Opcode.CLOSE))
+                    return
+                elif opcode is Opcode.PING:
+                    writer.write(websocket_frame_of(payload, Opcode.PONG))
+                elif opcode is not Opcode.PONG:
+                    writer.write(websocket_frame_of((1003).to_bytes(2, "big"), Opcode.CLOSE))
+                    return
+        except MessageTooBigError:
+            writer.write(websocket_frame_of((1009).to_bytes(2, "big"), Opcode.CLOSE))
+        except ProtocolError:
+            writer.write(websocket_frame_of((1002).to_bytes(2, "big"), Opcode.CLOSE))
+
+    async def _serve_sse(self, room: str, reader: StreamReader, writer: StreamWriter) -> None:
+        await write_http_response(writer, "200 OK", {
+            "Content-Type": "text/event-stream",
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive"
+        })
+
+        await self._serve_connection(
+            room,
+            SSEConnection(writer, self.connection_queue_size),
+            self._wait_for_sse_disconnection(reader, writer)
+        )
+
+    async def _wait_for_sse_disconnection(self, reader: StreamReader, writer: StreamWriter) -> None:
+        heartbeat_task = create_task(self._send_sse_heartbeats(writer))
+
+        try:
+            while await reader.read(4096):
+                pass
+        finally:
+            heartbeat_task.cancel()
+
+    async def _send_sse_heartbeats(self, writer: StreamWriter) -> None:
+        while True:
+            await sleep(self.heartbeat_interval)
+            writer.write(b":\n\n")
+
+    async def _serve_connection(self, room: str, connection: Connection, receiving) -> None:
+        if self._broker is not None and not self.hub.connection_number_of(room):
+            self._broker.subscribe(room, self._on_broker_message)
+
+        self.hub.subscribe(room, connection)
+
+        tasks = (create_task(connection.deliver_forever()), create_task(receiving))
+
+        try:
+            await wait(tasks, return_when=FIRST_COMPLETED)
+        finally:
+            self.hub.unsubscribe(room, connection)
+
+            if self._broker is not None and not self.hub.connection_number_of(room):
+                self._broker.unsubscribe(room, self._on_broker_message)
+
+            for task in tasks:
+                task.cancel()
+
+    def _on_broker_message(self, room: str, message: str) -> None:
+        self._loop.call_soon_threadsafe(self.hub.publish, room, message)
@@ -1,12 +1,15 @@
+from collections import defaultdict
 from dataclasses import dataclass, field
 from functools import partial
-from typing import Callable, Iterable, TypedDict, Any
+from typing import Callable, Iterable, TypedDict, Any, Optional, Hashable, Iterator, Mapping
 
 from marshmallow import Schema
-from pyhandling import then, on_condition, raise_, ArgumentPack
+from pyannotating import Special
+from pyhandling import then, on_condition, raise_, returnly, ArgumentPack
 from pyhandling.annotations import reformer_of
 
 from services.repositories import IRepository
+from services.repositories.search_annotations import SearchAnnotation, Equal, Greater, And
 from tools.errors import ReportingError
 from tools.utils import is_iterable_but_not_dict
 
@@ -16,10 +19,10 @@ class SearchResult(TypedDict):
     lost: Iterable = tuple()
 
 
-def convert_by(schema: Schema, chunk: Iterable) -> Iterable:
+def convert_by(schema: Schema, chunk: Iterable, *, is_partial: bool = False) -> Iterable:
     return chunk >= (
         returnly(
-            schema.validate
+            partial(schema.validate, partial=is_partial)
             |then>> partial(on_condition, bool)(
                 partial(ReportingError, ValueError("Incorect input data"))
                 |then>> raise_
@@ -29,17 +32,139 @@ def convert_by(schema: Schema, chunk: Iterable) -> Iterable:
     )
 
 
+class KeysetPage:
+    """
+    Lazy page of objects ordered by a key attribute, remembering the key of the
+    last passed object as the cursor to the next page.
+    """
+
+    def __init__(self, objects: Iterable, key_attribute: str, limit: Optional[int]):
+        self.key_attribute = key_attribute
+        self.limit = limit
+
+        self._objects = objects
+        self._passed_object_number = 0
+        self._last_key = None
+
+    @property
+    def next_cursor(self) -> Optional[Any]:
+        return self._last_key if self._passed_object_number == self.limit else None
+
+    def __iter__(self) -> Iterator:
+        for object_ in self._objects:
+            self._passed_object_number += 1
+            self._last_key = getattr(object_, self.key_attribute)
+
+            yield object_
+
+
+def keyset_page_of(
+    repository: IRepository,
+    conditions: dict[str, Special[SearchAnnotation]],
+    *,
+    key_attribute: str,
+    after: Optional[Any] = None,
+    limit: Optional[int] = None
+) -> KeysetPage:
+    if after is not None:
+        conditions = conditions | {key_attribute: (
+            Greater(after)
+            if key_attribute not in conditions
+            else And(conditions[key_attribute], Greater(after))
+        )}
+
+    return KeysetPage(
+        repository.stream_by(conditions, order_by=key_attribute, limit=limit),
+        key_attribute,
+        limit
+    )
+
+
+def keyset_page_arguments_from(arguments: Mapping[str, str], *, max_limit: int) -> Optional[dict]:
+    if not {"after", "limit", "stream"} & arguments.keys():
+        return None
+
+    is_streaming = arguments.get("stream", "false").lower() in ("1", "true")
+
+    try:
+        after = int(arguments["after"]) if "after" in arguments else None
+        limit = int(arguments["limit"]) if "limit" in arguments else None
+    except ValueError as error:
+        raise ReportingError(ValueError("Incorect page arguments"), dict(arguments)) from error
+
+    if limit is None and not is_streaming:
+        limit = max_limit
+
+    if limit is not None and not 0 < limit <= max_limit:
+        raise ReportingError(ValueError("Incorect page size"), dict(limit=limit, max_limit=max_limit))
+
+    return dict(after=after, limit=limit, is_streaming=is_streaming)
+
+
+def history_arguments_from(arguments: Mapping[str, str], *, default_limit: int, max_limit: int) -> dict:
+    try:
+        before = int(arguments["before"]) if "before" in arguments else None
+        after = int(arguments["after"]) if "after" in arguments else None
+        limit = int(arguments["limit"]) if "limit" in arguments else default_limit
+    except ValueError as error:
+        raise ReportingError(ValueError("Incorect history arguments"), dict(arguments)) from error
+
+    if not 0 < limit <= max_limit:
+        raise ReportingError(ValueError("Incorect page size"), dict(limit=limit, max_limit=max_limit))
+
+    return dict(before=before, after=after, limit=limit)
+
+
 def call_service(service: Callable, chunk: Iterable) -> Any:
-    return service(*data) if is_iterable_but_not_dict(data) else service(**data)
+    return service(*chunk) if is_iterable_but_not_dict(chunk) else service(**chunk)
+
+
+def search_in(repository: IRepository, query_packs: Iterable[ArgumentPack | dict]) -> Iterable:
+    query_packs = tuple(
+        query_pack if isinstance(query_pack, ArgumentPack) else ArgumentPack(kwargs=query_pack)
+        for query_pack in query_packs
+    )
+    resources = [None] * len(query_packs)
+    batched_query_indexes_by_attribute_name = defaultdict(list)
+
+    for index, query_pack in enumerate(query_packs):
+        attribute_name = _batchable_attribute_name_of(query_pack)
+
+        if attribute_name is None:
+            resources[index] = query_pack.call(repository.get_by)
+        else:
+            batched_query_indexes_by_attribute_name[attribute_name].append(index)
+
+    for attribute_name, indexes in batched_query_indexes_by_attribute_name.items():
+        found_resources = repository.get_each_by(
+            attribute_name,
+            (_equality_value_of(query_packs[index].kwargs[attribute_name]) for index in indexes)
+        )
+
+        for index, resource in zip(indexes, found_resources):
+            resources[index] = resource
+
+    return SearchResult(
+        found=tuple(resource for resource in resources if resource is not None),
+        lost=tuple(
+            query_pack
+            for query_pack, resource in zip(query_packs, resources)
+            if resource is None
+        )
+    )
+
+
+def _batchable_attribute_name_of(query_pack: ArgumentPack) -> Optional[str]:
+    if query_pack.args or len(query_pack.kwargs) != 1:
+        return None
+
+    attribute_name, value = tuple(query_pack.kwargs.items())[0]
 
+    if isinstance(value, SearchAnnotation) and not isinstance(value, Equal):
+        return None
 
-def search_in(repository: IRepository, query_packs: Iterable[ArgumentPack]) -> Iterable:
-    found_data = list()
-    lost_data = list()
+    return attribute_name if isinstance(_equality_value_of(value), Hashable) else None
 
-    for query_pack in query_packs:
-        resource = query_pack.call(self._repository.get_by)
-        
-        (found_data if resource is not None else lost_data).append(resource)
 
-    return SearchResult(found=tuple(found_data), lost=tuple(lost_data))
\ No newline at end of file
+def _equality_value_of(value: Special[Equal]) -> Any:
+    return value.value if isinstance(value, Equal) else value
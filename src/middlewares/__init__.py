@@ -1 +1,8 @@
-from middlewares.middlewares import *
\ No newline at end of file
+from importlib import import_module
+from typing import Any
+
+
+def __getattr__(name: str) -> Any:
+    # Middlewares are imported on first access, so that importing submodules
+    # doesn't import the middlewares
+    return getattr(import_module("middlewares.middlewares"), name)
@@ -1,13 +1,13 @@
 from flask_middlewares.tools import BinarySet
 from pyhandling import operation_by
 
-from middlewares import require_access_token, redirect_on_status_code_that
+from middlewares.middlewares import require_access_token, redirect_on_status_code_that
 
 
 MIDDLEWARE_ENVIRONMENTS = {
     'api': {
         "USE_FOR_BLUEPRINT": True,
-        "VIEW_NAMES": BinarySet(non_included="api.userresource"),
+        "VIEW_NAMES": BinarySet(non_included=["api.userresource", "api.tokenresource", "api.refreshtokenresource"]),
         "MIDDLEWARES": [require_access_token]
     },
     "redirecting": {
@@ -20,4 +20,4 @@ MIDDLEWARE_ENVIRONMENTS = {
             )
         ]
     }
-}
\ No newline at end of file
+}
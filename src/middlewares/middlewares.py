@@ -1,25 +1,89 @@
-from flask import redirect, request
+from contextlib import ExitStack
+from functools import wraps
+from typing import Callable, Iterable, Iterator
+
+from flask import Response, redirect, request, current_app
 from pyhandling import *
 from pyhandling.annotations import checker_of, decorator
 
-from adapters.tokens import JWTSerializator
-from config import SECRET_KEY
-from services.tokens import validate_access_token
-from tools.utils import status_code_parsing_with_default, merge_events
+from services.tokens import bearer_token_of, validate_access_token, CachingTokenDecoder, RevocationCheckingTokenDecoder, RevocationIndex, TokenDecoderResult, token_decoder
+from tools.profiling import profiler
+from tools.utils import status_code_parsing_with_default, merge_events, fused
 
 
 def redirect_on_status_code_that(status_code_checker: checker_of[int], url_to_redirect: str) -> decorator:
-    return (returnly |then>> next_action_decorator_of)(
+    return (returnly |then>> next_action_decorator_of)(fused(
         status_code_parsing_with_default(500)
         |then>> on_condition(
             status_code_checker,
             url_to_redirect >= close(redirect) |then>> eventually
         )
+    )) |then>> fused
+
+
+def access_token_decoder_of(
+    token_decoder: token_decoder,
+    revocation_index: RevocationIndex,
+    cache_size: int
+) -> Callable[[str], dict | TokenDecoderResult]:
+    """
+    Function to get a caching access token decoder checking revocation of
+    tokens in the input index.
+    """
+
+    return RevocationCheckingTokenDecoder(
+        CachingTokenDecoder(token_decoder, max_size=cache_size),
+        revocation_index
     )
 
 
-require_access_token: decorator = merge_events |by| (
-    event_as(getattr, request, "headers")
-    |then>> (callmethod |by| 'get')
-    |then>> (validate_access_token |by| JWTSerializator(SECRET_KEY))
-)
\ No newline at end of file
+require_access_token: decorator = merge_events(profiler.timed(
+    "access_token_seconds",
+    fused(
+        event_as(getattr, request, "headers")
+        |then>> (callmethod |by* ('get', 'Authorization'))
+        |then>> bearer_token_of
+        |then>> (validate_access_token |by| (lambda token: current_app.extensions["access_token_decoder"](token)))
+    )
+)) |then>> fused
+
+
+class _ScopedResponseBody:
+    """Body of a streamed response closing the input scopes when it's closed."""
+
+    def __init__(self, body: Iterable, scopes: ExitStack):
+        self._body = body
+        self._scopes = scopes
+
+    def __iter__(self) -> Iterator:
+        return iter(self._body)
+
+    def close(self) -> None:
+        try:
+            if hasattr(self._body, "close"):
+                self._body.close()
+        finally:
+            self._scopes.close()
+
+
+def profile_view(view: Callable) -> Callable:
+    """
+    Decorator to record metrics of the input view and of everything called
+    inside it under the view endpoint name.
+
+    The scope of a view with a streamed response lasts until the response
+    body is produced and closed.
+    """
+
+    @wraps(view)
+    def profiled_view(*args, **kwargs):
+        with ExitStack() as scopes:
+            scopes.enter_context(profiler.scope(request.endpoint or view.__name__))
+            response = view(*args, **kwargs)
+
+            if isinstance(response, Response) and response.is_streamed:
+                response.response = _ScopedResponseBody(response.response, scopes.pop_all())
+
+            return response
+
+    return profiled_view
\ No newline at end of file
@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from orm import db
 
 
@@ -21,3 +23,32 @@ class User(db.Model):
     password_hash = db.Column(db.String(1024), nullable=False)
 
     session = db.relationship("UserSession", foreign_keys=(session_id, ))
+
+
+class TokenRevocation(db.Model):
+    __tablename__ = "token_revocations"
+
+    id = db.Column(db.Integer, primary_key=True)
+    token_id = db.Column(db.String(64), nullable=False, unique=True)
+    expiration_time = db.Column(db.DateTime, nullable=False, index=True)
+
+
+class Room(db.Model):
+    __tablename__ = "rooms"
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(64), nullable=False, unique=True)
+
+
+class Message(db.Model):
+    __tablename__ = "messages"
+    __table_args__ = (db.Index("ix_messages_room_id_id", "room_id", "id"), )
+
+    id = db.Column(db.Integer, primary_key=True)
+    room_id = db.Column(db.Integer, db.ForeignKey(Room.id), nullable=False)
+    author_id = db.Column(db.Integer, db.ForeignKey(User.id), nullable=False)
+    text = db.Column(db.String(4096), nullable=False)
+    creation_time = db.Column(db.DateTime, nullable=False, default=datetime.now)
+
+    room = db.relationship("Room", foreign_keys=(room_id, ))
+    author = db.relationship("User", foreign_keys=(author_id, ))
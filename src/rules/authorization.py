@@ -1,15 +1,15 @@
 from datetime import datetime
-from typing import Protocol
+from typing import Protocol, Container, Optional
 
 from pyhandling.annotations import checker_of
 
 from services.errors import RegistrationError
 from services.repositories import IRepository
-from services.tokens import token_coder
-from tools.utils import get_time_after
+from services.tokens import token_coder, token_claims_for
 
 
 class Session(Protocol):
+    token: str
     cancellation_time: datetime
 
 
@@ -17,37 +17,70 @@ def is_session_timed_out(session: Session) -> bool:
     return datetime.now() < session.cancellation_time
 
 
+class SessionRegistry(Protocol):
+    def is_active(self, token: str) -> bool:
+        ...
+
+
+def is_session_active_in(session_registry: SessionRegistry, session: Optional[Session]) -> bool:
+    """
+    Function to check that an account has no session yet or a session that
+    the input registry knows as active.
+    """
+
+    return session is None or session_registry.is_active(session.token)
+
+
 class Profile(Protocol):
-    full_name: str
-    short_name: str
+    token: str
 
 
 def token_for(profile: Profile, coder: token_coder, life_minutes: int | float) -> str:
-    return coder(
-        dict(
-            token=profile.full_name,
-            exp=get_time_after(life_minutes, is_time_raw=True)
-        )
-    )
+    return coder(token_claims_for(profile.token, life_minutes))
+
+
+def refresh_token_for(profile: Profile, coder: token_coder, life_minutes: int | float) -> str:
+    return coder(token_claims_for(profile.token, life_minutes, token_type="refresh"))
+
+
+class _AnyContainer:
+    def __contains__(self, _: object) -> bool:
+        return True
 
 
 class Account(Protocol):
     profile: Profile
-    session: Session
+    session: Optional[Session]
 
 
 def register_account(
     account: Account,
     account_repository: IRepository[Account],
     profile_repository: IRepository[Profile],
-    session_validator: checker_of[Session]
+    session_validator: checker_of[Optional[Session]],
+    possible_profile_tokens: Container[str] = _AnyContainer()
 ) -> None:
-    if profile_repository.get_by(full_name=account.profile.full_name) is not None:
+    """
+    Function to add an account whose profile token isn't taken.
+
+    Tokens outside the input container of possibly taken ones are considered
+    free without searching for their profiles, leaving the final check to
+    the atomic adding. Profiles are searched by the `url_token` they are
+    stored with.
+    """
+
+    if (
+        account.profile.token in possible_profile_tokens
+        and profile_repository.get_by(url_token=account.profile.token) is not None
+    ):
         raise RegistrationError(
-            f"{account.profile.full_name}'s profile already exists"
+            f"{account.profile.token}'s profile already exists"
         )
 
     if not session_validator(account.session):
-        raise RegistrationError(f"Session for {account.profile.name}'s account is invalid")
+        raise RegistrationError(f"Session for {account.profile.token}'s account is invalid")
 
-    account_repository.add(account)
\ No newline at end of file
+    if not account_repository.add_if_absent(account):
+        raise RegistrationError(
+            f"{account.profile.token}'s profile already exists"
+        )
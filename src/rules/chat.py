@@ -0,0 +1,60 @@
+from datetime import datetime
+from typing import Protocol, Optional, Tuple
+
+from services.errors import MessagePostingError
+from services.repositories import IRepository
+from services.repositories.search_annotations import Greater, Lesser, And
+
+
+class Room(Protocol):
+    id: int
+    name: str
+
+
+class Message(Protocol):
+    id: int
+    room_id: int
+    author_id: int
+    text: str
+    creation_time: datetime
+
+
+def post_message(message: Message, message_repository: IRepository[Message]) -> None:
+    if not message.text.strip():
+        raise MessagePostingError("Message text is empty")
+
+    message_repository.add(message)
+
+
+def message_history_of(
+    room_id: int,
+    message_repository: IRepository[Message],
+    *,
+    before: Optional[int] = None,
+    after: Optional[int] = None,
+    limit: int
+) -> Tuple[Message]:
+    """
+    Function to get a page of room messages in chronological order by keyset
+    of message ids.
+
+    Without `after` gets the last messages before the `before` message or the
+    last messages of the room, otherwise the first messages after the `after`
+    one.
+    """
+
+    id_conditions = (
+        *((Greater(after), ) if after is not None else tuple()),
+        *((Lesser(before), ) if before is not None else tuple()),
+    )
+    is_scrolling_back = after is None
+
+    messages = tuple(message_repository.stream_by(
+        dict(id=And(*id_conditions)) if id_conditions else dict(),
+        room_id=room_id,
+        order_by="id",
+        is_descending=is_scrolling_back,
+        limit=limit
+    ))
+
+    return messages[::-1] if is_scrolling_back else messages
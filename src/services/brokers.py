@@ -0,0 +1,60 @@
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from threading import RLock
+from typing import Callable, Hashable, Tuple
+
+
+room_message_handler = Callable[[Hashable, str], None]
+
+
+class IBroker(ABC):
+    @abstractmethod
+    def publish(self, room: Hashable, message: str) -> None:
+        pass
+
+    @abstractmethod
+    def subscribe(self, room: Hashable, handler: room_message_handler) -> None:
+        pass
+
+    @abstractmethod
+    def unsubscribe(self, room: Hashable, handler: room_message_handler) -> None:
+        pass
+
+
+class LocalBroker(IBroker):
+    """Broker delivering messages to handlers of the current process."""
+
+    def __init__(self):
+        self._handlers_by_room: defaultdict[Hashable, list[room_message_handler]] = defaultdict(list)
+        self._lock = RLock()
+
+    @property
+    def rooms(self) -> Tuple[Hashable]:
+        with self._lock:
+            return tuple(self._handlers_by_room.keys())
+
+    def has_subscribers_of(self, room: Hashable) -> bool:
+        return room in self._handlers_by_room
+
+    def publish(self, room: Hashable, message: str) -> None:
+        with self._lock:
+            handlers = tuple(self._handlers_by_room.get(room, tuple()))
+
+        for handler in handlers:
+            handler(room, message)
+
+    def subscribe(self, room: Hashable, handler: room_message_handler) -> None:
+        with self._lock:
+            self._handlers_by_room[room].append(handler)
+
+    def unsubscribe(self, room: Hashable, handler: room_message_handler) -> None:
+        with self._lock:
+            handlers = self._handlers_by_room.get(room)
+
+            if handlers is None or handler not in handlers:
+                return
+
+            handlers.remove(handler)
+
+            if not handlers:
+                del self._handlers_by_room[room]
@@ -6,9 +6,29 @@ class RegistrationError(ServiceError):
     pass
 
 
+class RepositoryError(ServiceError):
+    pass
+
+
+class MessagePostingError(ServiceError):
+    pass
+
+
 class TokenError(ServiceError):
     pass
 
 
 class AccessTokenError(TokenError):
-    pass
\ No newline at end of file
+    pass
+
+
+class RefreshTokenError(TokenError):
+    pass
+
+
+class PasswordHashingError(ServiceError):
+    pass
+
+
+class PasswordHashingOverloadError(PasswordHashingError):
+    pass
@@ -0,0 +1,203 @@
+from abc import ABC, abstractmethod
+from asyncio import wrap_future
+from base64 import urlsafe_b64encode, urlsafe_b64decode
+from concurrent.futures import ProcessPoolExecutor, Future
+from functools import partial
+from hashlib import scrypt
+from hmac import compare_digest
+from multiprocessing import get_context, get_all_start_methods
+from os import urandom
+from threading import Lock
+from typing import Optional, Callable, Any
+
+from services.errors import PasswordHashingError, PasswordHashingOverloadError
+
+
+class IPasswordHasher(ABC):
+    @abstractmethod
+    def hash(self, password: str) -> str:
+        pass
+
+    @abstractmethod
+    def verify(self, password: str, password_hash: str) -> bool:
+        pass
+
+
+def scrypt_hash_of(password: str, *, cost: int = 2 ** 14, block_size: int = 8, parallelism: int = 1) -> str:
+    salt = urandom(16)
+    digest = scrypt(password.encode(), salt=salt, n=cost, r=block_size, p=parallelism, dklen=32)
+
+    return "$".join((
+        "scrypt",
+        str(cost),
+        str(block_size),
+        str(parallelism),
+        _encoded(salt),
+        _encoded(digest),
+    ))
+
+
+def dummy_scrypt_hash_of(*, cost: int = 2 ** 14, block_size: int = 8, parallelism: int = 1) -> str:
+    """
+    Function to get a hash of no password with random salt and digest, which
+    takes as long to check as hashes of the same parameters.
+    """
+
+    return "$".join((
+        "scrypt",
+        str(cost),
+        str(block_size),
+        str(parallelism),
+        _encoded(urandom(16)),
+        _encoded(urandom(32)),
+    ))
+
+
+def is_scrypt_hash_of(password: str, password_hash: str) -> bool:
+    try:
+        algorithm, cost, block_size, parallelism, salt, digest = password_hash.split("$")
+    except ValueError:
+        return False
+
+    if algorithm != "scrypt":
+        return False
+
+    expected_digest = _decoded(digest)
+
+    return compare_digest(
+        scrypt(
+            password.encode(),
+            salt=_decoded(salt),
+            n=int(cost),
+            r=int(block_size),
+            p=int(parallelism),
+            dklen=len(expected_digest)
+        ),
+        expected_digest
+    )
+
+
+def _encoded(data: bytes) -> str:
+    return urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _decoded(line: str) -> bytes:
+    return urlsafe_b64decode(line + "=" * (-len(line) % 4))
+
+
+_worker_context = get_context("forkserver" if "forkserver" in get_all_start_methods() else "spawn")
+
+
+class PoolPasswordHasher(IPasswordHasher):
+    """
+    Scrypt password hasher running hashing in a pool of processes, so that
+    slow hashing doesn't hold the GIL of the calling process.
+
+    No more than `max_queue_depth` hashings can be pending at once, further
+    ones are rejected immediately with PasswordHashingOverloadError. The pool
+    is started on the first hashing, with workers started by a fork server
+    where it's available or spawned otherwise, so that they don't inherit
+    threads, locks and connections of the calling process.
+    """
+
+    def __init__(
+        self,
+        *,
+        worker_number: Optional[int] = None,
+        max_queue_depth: int = 64,
+        cost: int = 2 ** 14,
+        block_size: int = 8,
+        parallelism: int = 1
+    ):
+        self.worker_number = worker_number
+        self.max_queue_depth = max_queue_depth
+        self.cost = cost
+        self.block_size = block_size
+        self.parallelism = parallelism
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending_number = 0
+        self._lock = Lock()
+
+    @property
+    def queue_depth(self) -> int:
+        return self._pending_number
+
+    @property
+    def dummy_hash(self) -> str:
+        """
+        Hash to verify passwords of missing accounts against, so that they take
+        as long as passwords of existing ones.
+        """
+
+        return dummy_scrypt_hash_of(cost=self.cost, block_size=self.block_size, parallelism=self.parallelism)
+
+    def hash(self, password: str, *, timeout: Optional[float] = None) -> str:
+        return self._submit(self._hashing, password).result(timeout)
+
+    def verify(self, password: str, password_hash: str, *, timeout: Optional[float] = None) -> bool:
+        return self._submit(is_scrypt_hash_of, password, password_hash).result(timeout)
+
+    async def hash_async(self, password: str) -> str:
+        return await wrap_future(self._submit(self._hashing, password))
+
+    async def verify_async(self, password: str, password_hash: str) -> bool:
+        return await wrap_future(self._submit(is_scrypt_hash_of, password, password_hash))
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+
+        if executor is not None:
+            executor.shutdown()
+
+    @property
+    def _hashing(self) -> Callable[[str], str]:
+        return partial(scrypt_hash_of, cost=self.cost, block_size=self.block_size, parallelism=self.parallelism)
+
+    def _submit(self, function: Callable, *args: Any) -> Future:
+        with self._lock:
+            if self._pending_number >= self.max_queue_depth:
+                raise PasswordHashingOverloadError(
+                    f"Password hashing queue is full ({self.max_queue_depth} pending)"
+                )
+
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(self.worker_number, mp_context=_worker_context)
+
+            self._pending_number += 1
+
+            try:
+                future = self._executor.submit(function, *args)
+            except RuntimeError as error:
+                self._pending_number -= 1
+                raise PasswordHashingError("Password hashing pool is unavailable") from error
+
+        future.add_done_callback(self._release)
+
+        return future
+
+    def _release(self, _: Future) -> None:
+        with self._lock:
+            self._pending_number -= 1
+
+
+def hash_password_in(hasher: IPasswordHasher, data: dict) -> dict:
+    """
+    Function to replace a plain `password` of the input data with its
+    `password_hash` made by the hasher.
+
+    A `password_hash` of the input data itself is always dropped, so that a
+    client can't store a hash bypassing the hasher.
+    """
+
+    if "password" not in data and "password_hash" not in data:
+        return data
+
+    data = dict(data)
+    data.pop("password_hash", None)
+
+    if "password" in data:
+        data["password_hash"] = hasher.hash(data.pop("password"))
+
+    return data
@@ -0,0 +1,304 @@
+from typing import Iterable, Optional, Tuple, Final
+
+from services.repositories.search_annotations import *
+
+
+class _Constant(SearchAnnotation):
+    def __init__(self, name: str):
+        self._name = name
+
+    def __repr__(self) -> str:
+        return self._name
+
+
+_always: Final[_Constant] = _Constant("always")
+_never: Final[_Constant] = _Constant("never")
+_no_bound: Final[object] = object()
+
+
+def optimized_conditions(
+    conditions: dict[str, Iterable[SearchAnnotation | object]]
+) -> Optional[dict[str, Tuple[SearchAnnotation | object]]]:
+    """
+    Function to simplify conditions of attributes before a search.
+
+    Returns None when no object can satisfy the conditions, which is detected
+    only when provable regardless of how a backend treats missing values.
+    """
+
+    if all(map(_is_simple, conditions.values())):
+        return conditions
+
+    optimized = dict()
+
+    for attribute_name, attribute_conditions in conditions.items():
+        condition = optimized_annotation(And(*attribute_conditions))
+
+        if condition is _never:
+            return None
+        elif condition is _always:
+            continue
+
+        optimized[attribute_name] = (
+            condition.annotations if isinstance(condition, And) else (condition, )
+        )
+
+    return optimized
+
+
+def optimized_annotation(condition: SearchAnnotation | object, *, is_exact: bool = False) -> SearchAnnotation:
+    """
+    Function to flatten groups of the input condition, remove duplicates,
+    merge ranges into Between and Equal alternatives into In.
+
+    Returns `_always` or `_never` for conditions proven to be constant.
+
+    An exact result has the same three-valued truth as the condition for each
+    value, so that it can be negated, and its `_never` is false for all values.
+    Other results only keep the values satisfying the condition, so their
+    `_never` can be unknown rather than false for missing values.
+    """
+
+    if not isinstance(condition, SearchAnnotation):
+        return Equal(condition)
+    elif isinstance(condition, And):
+        return _optimized_conjunction(condition.annotations, is_exact=is_exact)
+    elif isinstance(condition, Or):
+        return _optimized_disjunction(condition.annotations, is_exact=is_exact)
+    elif isinstance(condition, Not):
+        return _optimized_negation(optimized_annotation(condition.value, is_exact=True))
+    elif isinstance(condition, In):
+        return _in_of(_unique(condition.value))
+    elif isinstance(condition, Between):
+        return _range_of(*condition.value, is_exact=is_exact)
+
+    return condition
+
+
+def _is_simple(conditions: Tuple[SearchAnnotation | object]) -> bool:
+    if len(conditions) != 1:
+        return False
+
+    condition, = conditions
+
+    return not isinstance(condition, SearchAnnotation) or type(condition) in (Equal, Greater, Lesser)
+
+
+def _optimized_negation(condition: SearchAnnotation) -> SearchAnnotation:
+    """Function to negate an exact optimized condition."""
+
+    if condition is _always:
+        return _never
+    elif condition is _never:
+        return _always
+    elif isinstance(condition, Not):
+        return condition.value
+
+    return Not(condition)
+
+
+def _optimized_conjunction(annotations: Iterable[SearchAnnotation | object], *, is_exact: bool) -> SearchAnnotation:
+    conditions = list()
+
+    for condition in (optimized_annotation(annotation, is_exact=is_exact) for annotation in annotations):
+        if condition is _never:
+            return _never
+        elif isinstance(condition, And):
+            conditions.extend(condition.annotations)
+        elif condition is not _always:
+            conditions.append(condition)
+
+    conditions = _merged_ranges_of(_unique(conditions), is_exact=is_exact)
+
+    if conditions is _never:
+        return _never
+
+    conditions = _merged_values_of(conditions, is_exact=is_exact)
+
+    if conditions is _never:
+        return _never
+
+    return _grouped(And, conditions, _always)
+
+
+def _optimized_disjunction(annotations: Iterable[SearchAnnotation | object], *, is_exact: bool) -> SearchAnnotation:
+    conditions = list()
+    values = list()
+
+    for condition in (optimized_annotation(annotation, is_exact=is_exact) for annotation in annotations):
+        if condition is _always:
+            return _always
+        elif isinstance(condition, Or):
+            conditions.extend(condition.annotations)
+        elif condition is not _never:
+            conditions.append(condition)
+
+    for condition in tuple(conditions):
+        if isinstance(condition, In) or isinstance(condition, Equal) and condition.value is not None:
+            values.extend(condition.value if isinstance(condition, In) else (condition.value, ))
+            conditions.remove(condition)
+
+    values = _unique(values)
+
+    if values:
+        conditions.insert(0, _in_of(values))
+
+    return _grouped(Or, _unique(conditions), _never)
+
+
+def _merged_ranges_of(conditions: list[SearchAnnotation], *, is_exact: bool) -> list[SearchAnnotation] | _Constant:
+    lower_bounds = [
+        condition.value if isinstance(condition, Greater) else condition.value[0]
+        for condition in conditions
+        if isinstance(condition, Greater | Between)
+    ]
+    upper_bounds = [
+        condition.value if isinstance(condition, Lesser) else condition.value[1]
+        for condition in conditions
+        if isinstance(condition, Lesser | Between)
+    ]
+
+    if len(lower_bounds) + len(upper_bounds) < 2 and not any(
+        isinstance(condition, Between) for condition in conditions
+    ):
+        return conditions
+
+    try:
+        range_ = _range_of(
+            max(lower_bounds) if lower_bounds else _no_bound,
+            min(upper_bounds) if upper_bounds else _no_bound,
+            is_exact=is_exact
+        )
+    except TypeError:
+        return conditions
+
+    if range_ is _never:
+        return _never
+
+    return [
+        range_,
+        *(condition for condition in conditions if not isinstance(condition, Greater | Lesser | Between))
+    ]
+
+
+def _range_of(lower_bound: object, upper_bound: object, *, is_exact: bool) -> SearchAnnotation:
+    """
+    Function to get a range condition by its bounds. An empty range is `_never`
+    unless the result is exact, since missing values are unknown for it.
+    """
+
+    if lower_bound is _no_bound:
+        return Lesser(upper_bound)
+    elif upper_bound is _no_bound:
+        return Greater(lower_bound)
+
+    if not is_exact:
+        try:
+            if not lower_bound < upper_bound:
+                return _never
+        except TypeError:
+            pass
+
+    return Between(lower_bound, upper_bound)
+
+
+def _in_of(values: list) -> SearchAnnotation:
+    """
+    Function to get a condition of unique alternative values. Missing value
+    among alternatives isn't equal to missing values, so it stays in In.
+    """
+
+    if not values:
+        return _never
+
+    return Equal(values[0]) if len(values) == 1 and values[0] is not None else In(values)
+
+
+def _merged_values_of(conditions: list[SearchAnnotation], *, is_exact: bool) -> list[SearchAnnotation] | _Constant:
+    """
+    Function to intersect Equal and In conditions of a conjunction, checking
+    the remaining value against its other conditions.
+
+    Conditions without remaining values are `_never` unless the result is
+    exact, since missing values are unknown for them, so exact ones are kept.
+    """
+
+    value_sets = [
+        condition.value if isinstance(condition, In) else (condition.value, )
+        for condition in conditions
+        if isinstance(condition, Equal | In)
+    ]
+
+    if not value_sets or any(None in values for values in value_sets):
+        return conditions
+
+    values = [value for value in value_sets[0] if all(value in other_values for other_values in value_sets[1:])]
+    other_conditions = list()
+
+    for condition in conditions:
+        if isinstance(condition, Equal | In):
+            continue
+
+        if not _is_decidable_by_values(condition):
+            other_conditions.append(condition)
+            continue
+
+        try:
+            values = [value for value in values if is_satisfying(value, condition)]
+        except TypeError:
+            other_conditions.append(condition)
+
+    if not values:
+        return conditions if is_exact else _never
+
+    return [Equal(values[0]) if len(values) == 1 else In(values), *other_conditions]
+
+
+def _is_decidable_by_values(condition: SearchAnnotation) -> bool:
+    """
+    Function to check whether the condition is decided for non-missing values
+    the same way in memory and by backends, so that it can be replaced by
+    them.
+    """
+
+    if isinstance(condition, Not | And | Or):
+        annotations = condition.annotations if isinstance(condition, And | Or) else (condition.value, )
+
+        return all(map(_is_decidable_by_values, annotations))
+
+    return isinstance(condition, Equal | In | Greater | Lesser | Between) and (
+        None not in (condition.value if isinstance(condition, In | Between) else (condition.value, ))
+    )
+
+
+def _grouped(
+    group_type: type[GroupingAnnotation],
+    conditions: list[SearchAnnotation],
+    identity: _Constant
+) -> SearchAnnotation:
+    if not conditions:
+        return identity
+
+    return conditions[0] if len(conditions) == 1 else group_type(*conditions)
+
+
+def _unique(items: Iterable) -> list:
+    unique_items = list()
+    hashable_items = set()
+    unhashable_items = list()
+
+    for item in items:
+        try:
+            if item in hashable_items:
+                continue
+
+            hashable_items.add(item)
+        except TypeError:
+            if item in unhashable_items:
+                continue
+
+            unhashable_items.append(item)
+
+        unique_items.append(item)
+
+    return unique_items
@@ -1,14 +1,21 @@
 from abc import ABC, abstractmethod
-from typing import Optional, Iterable, Union, Callable, Generic, Iterator, TypeVar
+from typing import Optional, Iterable, Union, Callable, Generic, Iterator, TypeVar, Tuple, Hashable
 
 from pyannotating import Special, many_or_one
+from pyhandling import as_collection
 
+from services.repositories.optimization import optimized_conditions
 from services.repositories.search_annotations import *
+from tools.utils import dict_value_map, chunks_of
 
 
 StoredT = TypeVar("StoredT")
 
 
+def as_condition_collection(resource: many_or_one[Special[SearchAnnotation]]) -> Tuple:
+    return (resource, ) if isinstance(resource, str | bytes) else as_collection(resource)
+
+
 class IRepository(Generic[StoredT], ABC):
     @abstractmethod
     def __iter__(self) -> Iterator[StoredT]:
@@ -22,6 +29,19 @@ class IRepository(Generic[StoredT], ABC):
     def add(self, instance: StoredT) -> None:
         pass
 
+    @abstractmethod
+    def add_many(self, instances: Iterable[StoredT]) -> None:
+        pass
+
+    @abstractmethod
+    def add_if_absent(self, instance: StoredT) -> bool:
+        """
+        Method to atomically add an object unless it conflicts with a stored
+        one by a unique attribute.
+
+        Returns whether the object was added.
+        """
+
     @abstractmethod
     def get_by(
         self,
@@ -32,15 +52,72 @@ class IRepository(Generic[StoredT], ABC):
     ) -> Optional[many_or_one[StoredT]]:
         pass
 
+    @abstractmethod
+    def get_each_by(self, attribute_name: str, values: Iterable[Hashable]) -> Tuple[Optional[StoredT]]:
+        """
+        Method for batch search of objects whose attribute is equal to each of
+        the input values.
+
+        Returns the found objects in the order of the input values with None in
+        place of values for which nothing is found. None value is searched
+        as a missing value of the attribute, like by `get_by`.
+        """
+
+    @abstractmethod
+    def stream_by(
+        self,
+        conditions: dict[str, Special[SearchAnnotation]] = dict(),
+        *,
+        order_by: str,
+        is_descending: bool = False,
+        limit: Optional[int] = None,
+        **keyword_conditions: Special[SearchAnnotation]
+    ) -> Iterator[StoredT]:
+        """
+        Method for lazy search of objects ordered by the input attribute.
+
+        Paired with a Greater or Lesser condition on the ordering attribute
+        provides keyset pagination.
+        """
+
     @abstractmethod
     def remove(self, instance: StoredT) -> None:
         pass
 
+    @abstractmethod
+    def remove_many(self, instances: Iterable[StoredT]) -> None:
+        pass
+
+    @abstractmethod
+    def remove_by(
+        self,
+        conditions: dict[str, Special[SearchAnnotation]] = dict(),
+        **keyword_conditions: Special[SearchAnnotation]
+    ) -> None:
+        """Method to remove all objects satisfying the input conditions."""
+
 
 class MonolithicRepository(IRepository, ABC):
+    _max_batch_size: int = 1000
+
     def __iter__(self) -> Iterator[StoredT]:
         return iter(self.all())
 
+    def add_many(self, instances: Iterable[StoredT]) -> None:
+        for instance in instances:
+            self.add(instance)
+
+    def remove_many(self, instances: Iterable[StoredT]) -> None:
+        for instance in instances:
+            self.remove(instance)
+
+    def remove_by(
+        self,
+        conditions: dict[str, Special[SearchAnnotation]] = dict(),
+        **keyword_conditions: Special[SearchAnnotation]
+    ) -> None:
+        self.remove_many(self.get_by(conditions, is_many=True, **keyword_conditions))
+
     def get_by(
         self,
         conditions: dict[str, Special[SearchAnnotation]] = dict(),
@@ -48,9 +125,57 @@ class MonolithicRepository(IRepository, ABC):
         is_many: bool = False,
         **keyword_conditions: Special[SearchAnnotation]
     ) -> Optional[many_or_one[StoredT]]:
-        return self._get_by_conditions(
-            dict_value_map(as_collection, conditions | keyword_conditions),
-            is_many
+        conditions = optimized_conditions(
+            dict_value_map(as_condition_collection, conditions | keyword_conditions)
+        )
+
+        if conditions is None:
+            return tuple() if is_many else None
+
+        return self._get_by_conditions(conditions, is_many)
+
+    def get_each_by(self, attribute_name: str, values: Iterable[Hashable]) -> Tuple[Optional[StoredT]]:
+        values = tuple(values)
+        unique_values = dict.fromkeys(values)
+        found_object_by_value = dict()
+
+        # In never matches missing values, so they are searched by Equal
+        if None in unique_values:
+            del unique_values[None]
+            found_object_by_value[None] = self._get_by_conditions({attribute_name: (Equal(None), )}, False)
+
+        for value_chunk in chunks_of(self._max_batch_size, unique_values):
+            found_object_by_value.update(
+                (getattr(found_object, attribute_name), found_object)
+                for found_object in self._get_by_conditions(
+                    {attribute_name: (In(value_chunk), )},
+                    True
+                )
+            )
+
+        return tuple(map(found_object_by_value.get, values))
+
+    def stream_by(
+        self,
+        conditions: dict[str, Special[SearchAnnotation]] = dict(),
+        *,
+        order_by: str,
+        is_descending: bool = False,
+        limit: Optional[int] = None,
+        **keyword_conditions: Special[SearchAnnotation]
+    ) -> Iterator[StoredT]:
+        conditions = optimized_conditions(
+            dict_value_map(as_condition_collection, conditions | keyword_conditions)
+        )
+
+        if conditions is None:
+            return iter(tuple())
+
+        return self._stream_by_conditions(
+            conditions,
+            order_by,
+            is_descending,
+            limit
         )
 
     @abstractmethod
@@ -59,4 +184,15 @@ class MonolithicRepository(IRepository, ABC):
         conditions: dict[str, many_or_one[Special[SearchAnnotation]]],
         is_many: bool
     ) -> Optional[many_or_one[StoredT]]:
-        pass
\ No newline at end of file
+        pass
+
+
+    @abstractmethod
+    def _stream_by_conditions(
+        self,
+        conditions: dict[str, many_or_one[Special[SearchAnnotation]]],
+        order_by: str,
+        is_descending: bool,
+        limit: Optional[int]
+    ) -> Iterator[StoredT]:
+        pass
@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import Iterable, Optional
 
 
 class SearchAnnotation:
@@ -11,8 +12,11 @@ class ValueAnnotation(SearchAnnotation):
 
 
 @dataclass(frozen=True)
-class In(SearchAnnotation):
-    pass
+class In(ValueAnnotation):
+    value: tuple
+
+    def __init__(self, values: Iterable):
+        object.__setattr__(self, "value", tuple(values))
 
 
 @dataclass(frozen=True)
@@ -30,6 +34,16 @@ class Lesser(ValueAnnotation):
     pass
 
 
+@dataclass(frozen=True)
+class Between(ValueAnnotation):
+    """Annotation of values strictly greater and lesser than its bounds."""
+
+    value: tuple
+
+    def __init__(self, lower_bound: any, upper_bound: any):
+        object.__setattr__(self, "value", (lower_bound, upper_bound))
+
+
 @dataclass(frozen=True)
 class Not(ValueAnnotation):
     pass
@@ -39,10 +53,70 @@ class GroupingAnnotation(SearchAnnotation):
     def __init__(self, *annotations: SearchAnnotation):
         self.annotations = annotations
 
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({', '.join(map(repr, self.annotations))})"
+
+    def __eq__(self, other: object) -> bool:
+        return type(self) is type(other) and self.annotations == other.annotations
+
+    def __hash__(self) -> int:
+        return hash((type(self), self.annotations))
+
 
 class And(GroupingAnnotation):
     pass
 
 
 class Or(GroupingAnnotation):
-    pass
\ No newline at end of file
+    pass
+
+
+def is_satisfying(value: any, condition: SearchAnnotation | object) -> bool:
+    """
+    Function to check the input value against a condition in memory the way
+    SQL does, so that comparisons with a missing (None) value are unknown and
+    a condition that is unknown is not satisfied.
+    """
+
+    return truth_of(value, condition) is True
+
+
+def truth_of(value: any, condition: SearchAnnotation | object) -> Optional[bool]:
+    """
+    Function to evaluate the input condition for a value by three-valued logic
+    of SQL, returning None for the unknown result.
+    """
+
+    if isinstance(condition, And):
+        truths = tuple(truth_of(value, annotation) for annotation in condition.annotations)
+
+        return False if False in truths else (None if None in truths else True)
+    elif isinstance(condition, Or):
+        truths = tuple(truth_of(value, annotation) for annotation in condition.annotations)
+
+        return True if True in truths else (None if None in truths else False)
+    elif isinstance(condition, Not):
+        truth = truth_of(value, condition.value)
+
+        return None if truth is None else not truth
+    elif isinstance(condition, Equal) and condition.value is None or condition is None:
+        return value is None
+    elif isinstance(condition, In) and not condition.value:
+        return False
+    elif value is None:
+        return None
+    elif isinstance(condition, Greater):
+        return None if condition.value is None else value > condition.value
+    elif isinstance(condition, Lesser):
+        return None if condition.value is None else value < condition.value
+    elif isinstance(condition, Between):
+        return truth_of(value, And(Greater(condition.value[0]), Lesser(condition.value[1])))
+    elif isinstance(condition, In):
+        if any(value == in_value for in_value in condition.value if in_value is not None):
+            return True
+
+        return None if None in condition.value else False
+    elif isinstance(condition, Equal):
+        return value == condition.value
+    else:
+        return value == condition
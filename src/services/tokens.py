@@ -1,7 +1,10 @@
-from typing import Callable, Optional
+from typing import Callable, Optional, Protocol
 from enum import Enum, auto
+from uuid import uuid4
 
-from services.errors import AccessTokenError
+from services.errors import AccessTokenError, RefreshTokenError
+from tools.caches import LRUCache
+from tools.utils import get_time_after
 
 
 class TokenDecoderResult(Enum):
@@ -12,9 +15,158 @@ token_coder = Callable[[dict], str]
 token_decoder = Callable[[str], dict | TokenDecoderResult]
 
 
+class CachingTokenDecoder:
+    """
+    Decoder proxy that remembers the successfully decoded tokens until their
+    expiration time (`exp` claim), so that the same token is verified only once.
+
+    Incorrect tokens are not cached.
+    """
+
+    def __init__(self, decoder: token_decoder, *, max_size: int = 4096):
+        self.decoder = decoder
+        self.cache = LRUCache[str, dict](max_size)
+
+    def __call__(self, token: str) -> dict | TokenDecoderResult:
+        data = self.cache.get(token)
+
+        if data is not None:
+            return data
+
+        data = self.decoder(token)
+
+        if isinstance(data, dict):
+            self.cache.set(token, data, expiration_time=data.get("exp"))
+
+        return data
+
+
+class RevocationIndex(Protocol):
+    def is_revoked(self, token_id: str, expiration_time: float) -> bool:
+        ...
+
+    def revoke(self, token_id: str, expiration_time: float) -> bool:
+        ...
+
+
+class RevocationCheckingTokenDecoder:
+    """
+    Decoder proxy considering tokens revoked in the input index incorrect.
+    Tokens without an id (`jti` claim) can't be revoked.
+    """
+
+    def __init__(self, decoder: token_decoder, revocation_index: RevocationIndex):
+        self.decoder = decoder
+        self.revocation_index = revocation_index
+
+    def __call__(self, token: str) -> dict | TokenDecoderResult:
+        data = self.decoder(token)
+
+        if isinstance(data, dict) and "jti" in data and self.revocation_index.is_revoked(data["jti"], data["exp"]):
+            return TokenDecoderResult.INCORRECT
+
+        return data
+
+
+def token_claims_for(subject: str, life_minutes: int | float, *, token_type: str = "access") -> dict:
+    return dict(
+        token=subject,
+        type=token_type,
+        jti=uuid4().hex,
+        exp=get_time_after(life_minutes, is_time_raw=True)
+    )
+
+
+def rotated_tokens_of(
+    refresh_token: Optional[str],
+    token_decoder: token_decoder,
+    token_coder: token_coder,
+    revocation_index: RevocationIndex,
+    *,
+    access_token_life_minutes: int | float,
+    refresh_token_life_minutes: int | float
+) -> dict[str, str]:
+    """
+    Function to exchange a refresh token for new access and refresh tokens,
+    revoking the input one so that it can be exchanged only once.
+    """
+
+    data = _refresh_token_data_of(refresh_token, token_decoder)
+
+    if not revocation_index.revoke(data["jti"], data["exp"]):
+        raise RefreshTokenError("Refresh token is revoked")
+
+    return dict(
+        access_token=token_coder(token_claims_for(data["token"], access_token_life_minutes)),
+        refresh_token=token_coder(token_claims_for(
+            data["token"],
+            refresh_token_life_minutes,
+            token_type="refresh"
+        ))
+    )
+
+
+def revoke_refresh_token(
+    refresh_token: Optional[str],
+    token_decoder: token_decoder,
+    revocation_index: RevocationIndex
+) -> None:
+    data = _refresh_token_data_of(refresh_token, token_decoder)
+    revocation_index.revoke(data["jti"], data["exp"])
+
+
+def _refresh_token_data_of(refresh_token: Optional[str], token_decoder: token_decoder) -> dict:
+    if not refresh_token:
+        raise RefreshTokenError("Refresh token is missing")
+
+    data = token_decoder(refresh_token)
+
+    if data is TokenDecoderResult.INCORRECT or data.get("type") != "refresh" or "jti" not in data:
+        raise RefreshTokenError("Refresh token is invalid")
+
+    return data
+
+
+def bearer_token_of(authorization: Optional[str]) -> Optional[str]:
+    """
+    Function to get a token from the value of an Authorization header with the
+    Bearer scheme, whose name is case-insensitive. Values of other schemes
+    have no token.
+    """
+
+    if authorization is None:
+        return None
+
+    scheme, _, token = authorization.strip().partition(" ")
+
+    return (token.strip() or None) if scheme.lower() == "bearer" else None
+
+
 def validate_access_token(token: Optional[str], token_decoder: token_decoder) -> None:
     if not token:
         raise AccessTokenError("Access token is missing")
 
-    if token_decoder(token) is TokenDecoderResult.INCORRECT:
-        raise AccessTokenError("Access token is invalid")
\ No newline at end of file
+    data = token_decoder(token)
+
+    if data is TokenDecoderResult.INCORRECT or data.get("type") != "access":
+        raise AccessTokenError("Access token is invalid")
+
+
+def revoke_access_token(
+    access_token: Optional[str],
+    token_decoder: token_decoder,
+    revocation_index: RevocationIndex
+) -> None:
+    """
+    Function to revoke the input access token until its expiration, so that
+    it's rejected before it expires, like on logout. Incorrect tokens and
+    tokens without an id are left as they are.
+    """
+
+    if not access_token:
+        return
+
+    data = token_decoder(access_token)
+
+    if data is not TokenDecoderResult.INCORRECT and data.get("type") == "access" and "jti" in data:
+        revocation_index.revoke(data["jti"], data["exp"])
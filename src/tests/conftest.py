@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+from typing import Iterator
+from uuid import uuid4
+
+import pytest
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import create_engine
+
+import config
+import orm.models
+from app import create_app, stop_app
+from orm import db
+
+
+@pytest.fixture
+def app_config(tmp_path) -> dict:
+    database_uri = f"sqlite:///{tmp_path / 'online-chat.db'}"
+
+    engine = create_engine(database_uri)
+    db.Model.metadata.create_all(engine)
+    engine.dispose()
+
+    return (
+        {name: getattr(config, name) for name in dir(config) if name.isupper() and name != "DATABASE_PASSWORD"}
+        | dict(
+            TESTING=True,
+            SECRET_KEY="test-secret-key",
+            SQLALCHEMY_DATABASE_URI=database_uri,
+            SESSION_PURGE_INTERVAL_SECONDS=3600,
+            TOKEN_REVOCATION_SYNC_INTERVAL_SECONDS=3600,
+            BROKER_SOCKET_PATH=None
+        )
+    )
+
+
+@pytest.fixture
+def app(app_config: dict) -> Iterator[Flask]:
+    app = create_app(SimpleNamespace(**app_config))
+
+    yield app
+
+    stop_app(app)
+
+
+@pytest.fixture
+def url_token() -> str:
+    return f"user-{uuid4().hex[:16]}"
+
+
+@pytest.fixture
+def database(tmp_path) -> Iterator[SQLAlchemy]:
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'repositories.db'}"
+
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+
+        yield db
+
+        db.session.remove()
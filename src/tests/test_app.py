@@ -0,0 +1,51 @@
+from types import SimpleNamespace
+
+from flask import Flask
+
+from app import create_app, stop_app
+
+
+def test_components_by_app_config(app: Flask, app_config: dict):
+    other_app = create_app(SimpleNamespace(**(app_config | dict(USER_CACHE_SIZE=7))))
+
+    try:
+        for name in ("user_repository", "url_token_filter", "session_store", "token_revocations", "password_hasher"):
+            assert app.extensions[name] is not other_app.extensions[name]
+
+        assert app.extensions["user_repository"].cache.max_size == app_config["USER_CACHE_SIZE"]
+        assert other_app.extensions["user_repository"].cache.max_size == 7
+    finally:
+        stop_app(other_app)
+
+
+def test_app_stopping(app_config: dict):
+    app = create_app(SimpleNamespace(**app_config))
+    stopping_events = tuple(app.extensions["stopping_events"])
+
+    stop_app(app)
+
+    assert stopping_events
+    assert all(stopping_event.is_set() for stopping_event in stopping_events)
+    assert not app.extensions["stopping_events"]
+
+
+def test_profiling_by_app_config(app: Flask, app_config: dict, monkeypatch):
+    from tools.profiling import profiler
+
+    for attribute_name in ("is_enabled", "sampling_rate", "profile_directory"):
+        monkeypatch.setattr(profiler, attribute_name, getattr(profiler, attribute_name))
+
+    profiler.clear()
+    app.test_client().get("/api/users?limit=1")
+
+    assert "api.userresource" not in profiler.report()
+
+    profiling_app = create_app(SimpleNamespace(**(app_config | dict(PROFILING=True))))
+
+    try:
+        profiling_app.test_client().get("/api/users?limit=1")
+
+        assert "api.userresource" in profiler.report()
+    finally:
+        stop_app(profiling_app)
+        profiler.clear()
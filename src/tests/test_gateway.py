@@ -0,0 +1,151 @@
+from asyncio import StreamReader, StreamWriter, open_connection, wait_for, sleep, run, TimeoutError
+from base64 import b64encode
+from os import urandom
+from typing import Awaitable, Callable, Tuple
+
+import pytest
+
+from adapters.repositories import MemoryRepository
+from adapters.revocations import TokenRevocationIndex
+from adapters.tokens import JWTSerializator, key_ring_from
+from gateway.protocols import Opcode, websocket_frame_of, read_websocket_frame, sse_event_of
+from gateway.server import Gateway
+from middlewares.middlewares import access_token_decoder_of
+from services.brokers import LocalBroker
+from services.tokens import token_claims_for, token_decoder
+
+
+_serializator = JWTSerializator(key_ring_from(secret_key="test-secret-key"))
+_access_token = _serializator.encode(token_claims_for("user", 60))
+
+_client = Tuple[StreamReader, StreamWriter]
+
+
+async def _connected_client_of(port: int, *, is_websocket: bool, access_token: str = _access_token) -> _client:
+    reader, writer = await open_connection("127.0.0.1", port)
+    websocket_lines = (
+        "Upgrade: websocket\r\n"
+        f"Sec-WebSocket-Key: {b64encode(urandom(16)).decode()}\r\n"
+        "Sec-WebSocket-Version: 13\r\n"
+    )
+
+    writer.write((
+        "GET /rooms/1 HTTP/1.1\r\n"
+        + (websocket_lines if is_websocket else "")
+        + f"Authorization: Bearer {access_token}\r\n"
+        + "\r\n"
+    ).encode())
+
+    head = await reader.readuntil(b"\r\n\r\n")
+    assert head.startswith(b"HTTP/1.1 101" if is_websocket else b"HTTP/1.1 200"), head
+
+    return reader, writer
+
+
+def _run_with_gateway(
+    test: Callable[[Gateway, LocalBroker, int], Awaitable[None]],
+    *,
+    token_decoder: token_decoder = _serializator.decode
+) -> None:
+    async def run_test() -> None:
+        broker = LocalBroker()
+        gateway = Gateway(token_decoder, broker=broker)
+        server = await gateway.start("127.0.0.1", 0)
+
+        async with server:
+            await test(gateway, broker, server.sockets[0].getsockname()[1])
+
+    run(run_test())
+
+
+async def _wait_for_connections(gateway: Gateway, number: int) -> None:
+    while gateway.hub.connection_number_of("1") != number:
+        await sleep(0.01)
+
+
+def test_delivery_of_broker_messages():
+    async def test(gateway: Gateway, broker: LocalBroker, port: int) -> None:
+        websocket_reader, websocket_writer = await _connected_client_of(port, is_websocket=True)
+        sse_reader, sse_writer = await _connected_client_of(port, is_websocket=False)
+        await wait_for(_wait_for_connections(gateway, 2), 5)
+
+        broker.publish("1", "message")
+
+        assert await wait_for(read_websocket_frame(websocket_reader, 1024, is_masked=False), 5) == (
+            True, Opcode.TEXT, b"message"
+        )
+        assert await wait_for(sse_reader.readuntil(b"\n\n"), 5) == sse_event_of("message")
+
+        websocket_writer.close()
+        sse_writer.close()
+
+    _run_with_gateway(test)
+
+
+def test_refusal_of_websocket_data():
+    async def test(gateway: Gateway, broker: LocalBroker, port: int) -> None:
+        sender_reader, sender_writer = await _connected_client_of(port, is_websocket=True)
+        receiver_reader, receiver_writer = await _connected_client_of(port, is_websocket=True)
+        await wait_for(_wait_for_connections(gateway, 2), 5)
+
+        sender_writer.write(websocket_frame_of(b"message", mask=urandom(4)))
+
+        assert await wait_for(read_websocket_frame(sender_reader, 1024, is_masked=False), 5) == (
+            True, Opcode.CLOSE, (1003).to_bytes(2, "big")
+        )
+
+        with pytest.raises(TimeoutError):
+            await wait_for(read_websocket_frame(receiver_reader, 1024, is_masked=False), 0.2)
+
+        receiver_writer.close()
+
+    _run_with_gateway(test)
+
+
+def test_discarding_of_sse_client_data():
+    async def test(gateway: Gateway, broker: LocalBroker, port: int) -> None:
+        reader, writer = await _connected_client_of(port, is_websocket=False)
+        await wait_for(_wait_for_connections(gateway, 1), 5)
+
+        writer.write(urandom(1 << 20))
+        await writer.drain()
+        broker.publish("1", "message")
+
+        assert await wait_for(reader.readuntil(b"\n\n"), 5) == sse_event_of("message")
+
+        writer.close()
+        await wait_for(_wait_for_connections(gateway, 0), 5)
+
+    _run_with_gateway(test)
+
+
+def test_connection_without_access_token():
+    async def test(gateway: Gateway, broker: LocalBroker, port: int) -> None:
+        reader, writer = await open_connection("127.0.0.1", port)
+        writer.write(b"GET /rooms/1 HTTP/1.1\r\n\r\n")
+
+        assert (await wait_for(reader.readuntil(b"\r\n\r\n"), 5)).startswith(b"HTTP/1.1 401")
+
+    _run_with_gateway(test)
+
+
+def test_connection_with_revoked_access_token():
+    revoked_token_claims = token_claims_for("user", 60)
+    token_revocations = TokenRevocationIndex(MemoryRepository())
+    token_revocations.remember(revoked_token_claims["jti"], revoked_token_claims["exp"])
+
+    async def test(gateway: Gateway, broker: LocalBroker, port: int) -> None:
+        reader, writer = await _connected_client_of(port, is_websocket=False)
+        writer.close()
+
+        reader, writer = await open_connection("127.0.0.1", port)
+        writer.write(
+            f"GET /rooms/1 HTTP/1.1\r\nAuthorization: Bearer {_serializator.encode(revoked_token_claims)}\r\n\r\n".encode()
+        )
+
+        assert (await wait_for(reader.readuntil(b"\r\n\r\n"), 5)).startswith(b"HTTP/1.1 401")
+
+    _run_with_gateway(
+        test,
+        token_decoder=access_token_decoder_of(_serializator.decode, token_revocations, 16)
+    )
@@ -0,0 +1,39 @@
+from jwt import encode
+
+from adapters.tokens import JWTSerializator, key_ring_from
+from services.tokens import TokenDecoderResult, token_claims_for
+
+
+def test_key_ring_with_algorithms_by_key(tmp_path):
+    (tmp_path / "old.HS256.key").write_bytes(b"o" * 32)
+    (tmp_path / "new.HS512.key").write_bytes(b"n" * 64)
+    (tmp_path / "legacy.v1.key").write_bytes(b"l" * 32)
+
+    old_serializator = JWTSerializator(key_ring_from(key_directory=str(tmp_path), active_key_id="old"))
+    serializator = JWTSerializator(key_ring_from(
+        algorithm="HS384",
+        key_directory=str(tmp_path),
+        active_key_id="new"
+    ))
+
+    assert {key.id: key.algorithm for key in serializator.key_ring.keys} == {
+        "old": "HS256",
+        "new": "HS512",
+        "legacy.v1": "HS384",
+    }
+
+    old_token = old_serializator.encode(token_claims_for("user", 1))
+    new_token = serializator.encode(token_claims_for("user", 1))
+
+    assert serializator.decode(old_token)["token"] == "user"
+    assert serializator.decode(new_token)["token"] == "user"
+    assert old_serializator.decode(new_token)["token"] == "user"
+
+
+def test_key_ring_rejects_tokens_of_other_algorithms(tmp_path):
+    (tmp_path / "key.HS256.key").write_bytes(b"k" * 32)
+
+    serializator = JWTSerializator(key_ring_from(key_directory=str(tmp_path), active_key_id="key"))
+    token = encode(token_claims_for("user", 1), b"k" * 32, algorithm="HS512", headers=dict(kid="key"))
+
+    assert serializator.decode(token) is TokenDecoderResult.INCORRECT
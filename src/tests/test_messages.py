@@ -0,0 +1,117 @@
+from json import loads
+
+import pytest
+from flask import Flask
+from flask.testing import FlaskClient
+
+from orm import db
+from orm.models import User, Room, Message
+from services.tokens import token_claims_for
+from tools.errors import ReportingError
+
+
+@pytest.fixture
+def room_id(app: Flask) -> int:
+    with app.app_context():
+        room = Room(name="room")
+        db.session.add(room)
+        db.session.commit()
+
+        return room.id
+
+
+@pytest.fixture
+def authorization(app: Flask, url_token: str) -> dict:
+    with app.app_context():
+        db.session.add(User(url_token=url_token, password_hash="hash"))
+        db.session.commit()
+
+    access_token = app.extensions["token_serializator"].encode(token_claims_for(url_token, 60))
+
+    return {"Authorization": f"Bearer {access_token}"}
+
+
+def _post(client: FlaskClient, room_id: int, text: str, authorization: dict):
+    return client.post(f"/api/rooms/{room_id}/messages", json=dict(text=text), headers=authorization)
+
+
+def _texts_of(response) -> list[str]:
+    return [message["text"] for message in response.json["messages"]]
+
+
+def test_message_posting(app: Flask, room_id: int, authorization: dict):
+    published_messages = list()
+    app.extensions["broker"].subscribe(str(room_id), lambda _, message: published_messages.append(loads(message)))
+
+    response = _post(app.test_client(), room_id, "message", authorization)
+
+    assert response.status_code == 201
+    assert response.json["text"] == "message"
+    assert published_messages == [response.json]
+
+    with app.app_context():
+        message = db.session.get(Message, response.json["id"])
+
+        assert (message.room_id, message.text) == (room_id, "message")
+
+
+def test_message_posting_with_empty_text(app: Flask, room_id: int, authorization: dict):
+    assert _post(app.test_client(), room_id, "  ", authorization).status_code == 400
+
+    with app.app_context():
+        assert db.session.query(Message).count() == 0
+
+
+def test_message_posting_without_access_token(app: Flask, room_id: int):
+    assert _post(app.test_client(), room_id, "message", dict()).status_code == 401
+
+
+def test_message_posting_to_missing_room(app: Flask, room_id: int, authorization: dict):
+    assert _post(app.test_client(), room_id + 1, "message", authorization).status_code == 404
+
+
+def test_message_history(app: Flask, room_id: int, authorization: dict):
+    client = app.test_client()
+
+    for index in range(5):
+        assert _post(client, room_id, f"message-{index}", authorization).status_code == 201
+
+    last_page = client.get(f"/api/rooms/{room_id}/messages?limit=2")
+    previous_page = client.get(f"/api/rooms/{room_id}/messages?limit=2&before={last_page.json['messages'][0]['id']}")
+    next_page = client.get(f"/api/rooms/{room_id}/messages?limit=2&after={previous_page.json['messages'][0]['id']}")
+
+    assert _texts_of(last_page) == ["message-3", "message-4"]
+    assert _texts_of(previous_page) == ["message-1", "message-2"]
+    assert _texts_of(next_page) == ["message-2", "message-3"]
+    assert _texts_of(client.get(f"/api/rooms/{room_id}/messages")) == [f"message-{index}" for index in range(5)]
+
+
+def test_message_write_through(app: Flask, room_id: int, authorization: dict):
+    client = app.test_client()
+    statistics = app.extensions["message_repository"].statistics
+
+    assert _texts_of(client.get(f"/api/rooms/{room_id}/messages")) == list()
+    assert _post(client, room_id, "message", authorization).status_code == 201
+    assert _texts_of(client.get(f"/api/rooms/{room_id}/messages")) == ["message"]
+
+    assert (statistics.hits, statistics.misses) == (2, 0)
+
+
+def test_message_write_through_on_rollback(app: Flask, room_id: int, authorization: dict, url_token: str):
+    client = app.test_client()
+    message_repository = app.extensions["message_repository"]
+
+    assert _texts_of(client.get(f"/api/rooms/{room_id}/messages")) == list()
+
+    with app.app_context():
+        author = db.session.query(User).filter_by(url_token=url_token).one()
+        message_repository.add(Message(room_id=room_id, author_id=author.id, text="message"))
+        db.session.rollback()
+
+    assert _texts_of(client.get(f"/api/rooms/{room_id}/messages")) == list()
+    assert message_repository.statistics.hits == 2
+
+
+def test_message_history_of_incorrect_size(app: Flask, room_id: int):
+    with pytest.raises(ReportingError):
+        app.test_client().get(f"/api/rooms/{room_id}/messages?limit=0")
@@ -0,0 +1,105 @@
+from typing import Iterator, Iterable, Optional
+
+import pytest
+from flask import Flask
+from hypothesis import given, strategies as st
+from sqlalchemy import insert
+
+from adapters.repositories import SQLAlchemyRepository, MemoryRepository
+from orm import db
+from orm.models import User
+from services.repositories import IRepository, as_condition_collection
+from services.repositories.search_annotations import SearchAnnotation, Equal, In, Greater, Lesser, Between, Not, And, Or
+
+
+class _Record:
+    def __init__(self, id: int, session_id: Optional[int]):
+        self.id = id
+        self.session_id = session_id
+
+
+_records = tuple(
+    _Record(id_, session_id)
+    for id_, session_id in enumerate((None, -3, -2, None, -1, 0, 1, None, 2, 3), start=1)
+)
+
+_memory_repositories = (
+    MemoryRepository(_records),
+    MemoryRepository(_records, hash_indexed=("session_id", ), sorted_indexed=("session_id", )),
+)
+
+
+_values = st.none() | st.integers(-4, 4)
+
+_conditions = st.recursive(
+    st.one_of(
+        _values,
+        _values.map(Equal),
+        _values.map(Greater),
+        _values.map(Lesser),
+        st.builds(Between, _values, _values),
+        st.lists(_values, max_size=4).map(In),
+    ),
+    lambda conditions: st.one_of(
+        conditions.map(Not),
+        st.lists(conditions, max_size=3).map(lambda annotations: And(*annotations)),
+        st.lists(conditions, max_size=3).map(lambda annotations: Or(*annotations)),
+    ),
+    max_leaves=8
+)
+
+_condition_collections = st.lists(_conditions, min_size=1, max_size=3).map(tuple)
+
+
+@pytest.fixture(scope="module")
+def sqlite_repository() -> Iterator[SQLAlchemyRepository]:
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        db.session.execute(insert(User), [
+            dict(id=record.id, url_token=f"user-{record.id}", password_hash="hash", session_id=record.session_id)
+            for record in _records
+        ])
+        db.session.commit()
+
+        yield SQLAlchemyRepository(User, db)
+
+        db.session.remove()
+
+
+def _ids_of(objects: Iterable) -> list[int]:
+    return sorted(object_.id for object_ in objects)
+
+
+def _assert_optimization_keeps_results(
+    repository: IRepository,
+    conditions: tuple[SearchAnnotation | object]
+) -> None:
+    raw_conditions = dict(session_id=as_condition_collection(conditions))
+
+    assert _ids_of(repository.get_by(session_id=conditions, is_many=True)) == _ids_of(
+        repository._get_by_conditions(raw_conditions, True)
+    )
+
+
+@given(_condition_collections)
+def test_optimization_in_memory(conditions: tuple[SearchAnnotation | object]):
+    for repository in _memory_repositories:
+        _assert_optimization_keeps_results(repository, conditions)
+
+
+@given(conditions=_condition_collections)
+def test_optimization_in_sqlite(sqlite_repository: SQLAlchemyRepository, conditions: tuple[SearchAnnotation | object]):
+    _assert_optimization_keeps_results(sqlite_repository, conditions)
+
+
+@given(_condition_collections)
+def test_memory_repositories_match_sqlite(sqlite_repository: SQLAlchemyRepository, conditions: tuple[SearchAnnotation | object]):
+    sqlite_ids = _ids_of(sqlite_repository.get_by(session_id=conditions, is_many=True))
+
+    for repository in _memory_repositories:
+        assert _ids_of(repository.get_by(session_id=conditions, is_many=True)) == sqlite_ids
@@ -0,0 +1,60 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError
+
+from adapters.pools import InstrumentedQueuePool
+
+
+def _engine_of(tmp_path, name: str = "pool.db") -> Engine:
+    return create_engine(
+        f"sqlite:///{tmp_path / name}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05
+    )
+
+
+def test_pool_metrics(tmp_path):
+    engine = _engine_of(tmp_path)
+    connection = engine.connect()
+
+    with pytest.raises(TimeoutError):
+        engine.connect()
+
+    report = engine.pool.report()
+
+    assert (report["size"], report["checked_out"], report["checked_in"]) == (1, 1, 0)
+    assert (report["max_overflow"], report["timeout"]) == (0, 0.05)
+    assert (report["checkouts"], report["waits"], report["timeouts"], report["waiting"]) == (1, 1, 1, 0)
+    assert report["opened_connections"] == 1
+
+    connection.close()
+    report = engine.pool.report()
+
+    assert (report["checked_out"], report["checked_in"], report["checkins"]) == (0, 1, 1)
+
+
+def test_pool_metrics_of_separate_pools(tmp_path):
+    engine = _engine_of(tmp_path)
+    other_engine = _engine_of(tmp_path, "other-pool.db")
+
+    engine.connect().close()
+
+    assert engine.pool.metrics is not other_engine.pool.metrics
+    assert engine.pool.report()["checkouts"] == 1
+    assert other_engine.pool.report()["checkouts"] == 0
+
+
+def test_pool_metrics_after_recreation(tmp_path):
+    engine = _engine_of(tmp_path)
+    engine.connect().close()
+    metrics = engine.pool.metrics
+
+    engine.dispose()
+    engine.connect().close()
+
+    assert engine.pool.metrics is metrics
+    assert (metrics.checkouts, metrics.checkins, metrics.opened_connections) == (2, 2, 2)
+    assert metrics.closed_connections == 1
@@ -0,0 +1,175 @@
+from typing import Optional
+
+import pytest
+from flask import current_app
+from flask_sqlalchemy import SQLAlchemy
+
+from adapters.repositories import SQLAlchemyRepository, MemoryRepository, CachingRepository
+from orm.models import User
+from services.repositories import IRepository
+from services.repositories.search_annotations import Greater
+
+
+def _stored_users(database: SQLAlchemy, session_ids: tuple[Optional[int]]) -> tuple[User]:
+    users = tuple(
+        User(url_token=f"user-{index}", password_hash="hash", session_id=session_id)
+        for index, session_id in enumerate(session_ids)
+    )
+
+    database.session.add_all(users)
+    database.session.commit()
+
+    return users
+
+
+@pytest.fixture(params=["sqlalchemy", "memory"])
+def user_repository(request, database: SQLAlchemy) -> IRepository[User]:
+    users = _stored_users(database, (None, 1, 2))
+
+    if request.param == "sqlalchemy":
+        return SQLAlchemyRepository(User, database)
+
+    return MemoryRepository(users, hash_indexed=("session_id", ))
+
+
+def test_each_by_missing_value(user_repository: IRepository[User]):
+    values = (2, None, 3, 1, None)
+
+    assert user_repository.get_each_by("session_id", values) == tuple(
+        user_repository.get_by(session_id=value) for value in values
+    )
+    assert user_repository.get_each_by("session_id", values)[1].url_token == "user-0"
+
+
+def test_removal_by_conditions(user_repository: IRepository[User], database: SQLAlchemy):
+    user_repository.remove_by(session_id=Greater(1))
+    database.session.commit()
+
+    assert [user.url_token for user in user_repository.stream_by(order_by="id")] == ["user-0", "user-1"]
+
+
+class _Record:
+    def __init__(self, url_token: str, session_id: Optional[int] = None):
+        self.url_token = url_token
+        self.session_id = session_id
+
+
+class _Clock:
+    def __init__(self):
+        self.time = 0.
+
+    def __call__(self) -> float:
+        return self.time
+
+
+def test_cache_invalidation():
+    users = CachingRepository(MemoryRepository(hash_indexed=("url_token", )))
+    user = _Record("user-0", 1)
+
+    assert users.get_by(url_token="user-0") is None
+    assert users.get_by(session_id=Greater(0), is_many=True) == tuple()
+    assert users.get_by(url_token="user-0") is None
+    assert users.cache.statistics.hits == 1
+
+    users.add(user)
+
+    assert users.get_by(url_token="user-0") is user
+    assert users.get_by(session_id=Greater(0), is_many=True) == (user, )
+
+    users.remove(user)
+
+    assert users.get_by(url_token="user-0") is None
+    assert users.get_by(session_id=Greater(0), is_many=True) == tuple()
+
+
+def test_negative_cache():
+    clock = _Clock()
+    stored_users = MemoryRepository(hash_indexed=("url_token", ))
+    users = CachingRepository(stored_users, time_to_live=10, negative_time_to_live=1, clock=clock)
+    user = _Record("user-0")
+
+    assert users.get_by(url_token="user-0") is None
+
+    stored_users.add(user)
+    clock.time = 0.5
+
+    assert users.get_by(url_token="user-0") is None
+
+    clock.time = 1.5
+
+    assert users.get_by(url_token="user-0") is user
+
+    stored_users.remove(user)
+    clock.time = 5
+
+    assert users.get_by(url_token="user-0") is user
+
+
+def test_cache_invalidation_by_removal_by_conditions():
+    users = CachingRepository(MemoryRepository(
+        (_Record("user-0", 1), _Record("user-1", 2)),
+        hash_indexed=("url_token", )
+    ))
+
+    assert users.get_by(url_token="user-1").session_id == 2
+
+    users.remove_by(session_id=2)
+
+    assert users.get_by(url_token="user-1") is None
+    assert users.get_by(url_token="user-0").session_id == 1
+
+
+def test_cache_of_uncommitted_changes():
+    ending_actions = list()
+    users = CachingRepository(MemoryRepository(hash_indexed=("url_token", )), after_transaction=ending_actions.append)
+
+    users.add(_Record("user-0"))
+
+    assert users.get_by(url_token="user-0") is not None
+    assert len(users.cache) == 0
+
+    ending_actions.pop()()
+
+    assert users.get_by(url_token="user-0") is not None
+    assert len(users.cache) == 1
+
+
+def _caching_user_repository_of(database: SQLAlchemy) -> CachingRepository[User]:
+    stored_users = SQLAlchemyRepository(User, database)
+
+    return CachingRepository(
+        stored_users,
+        identity_of=stored_users.identity_of,
+        detacher=stored_users.detached_copy_of,
+        attacher=stored_users.attached,
+        after_transaction=stored_users.after_transaction
+    )
+
+
+def test_cache_by_reading_during_commit(database: SQLAlchemy):
+    users = _caching_user_repository_of(database)
+    app = current_app._get_current_object()
+
+    users.add(User(url_token="user-0", password_hash="hash"))
+    database.session.flush()
+
+    with app.app_context():
+        assert users.get_by(url_token="user-0") is None
+
+    database.session.commit()
+
+    with app.app_context():
+        assert users.get_by(url_token="user-0").url_token == "user-0"
+
+
+def test_cache_by_reading_during_rollback(database: SQLAlchemy):
+    users = _caching_user_repository_of(database)
+
+    users.add(User(url_token="user-0", password_hash="hash"))
+    database.session.flush()
+
+    assert users.get_by(url_token="user-0") is not None
+
+    database.session.rollback()
+
+    assert users.get_by(url_token="user-0") is None
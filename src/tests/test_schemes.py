@@ -0,0 +1,69 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+from hypothesis import given, strategies as st
+from marshmallow import Schema, fields, EXCLUDE
+
+from api.schemes import UserSchema, user_schema_without_passwords
+from tools.schemes import compiled
+
+
+class _MessageSchema(Schema):
+    class Meta:
+        unknown = EXCLUDE
+
+    id = fields.Integer(required=True)
+    text = fields.String(data_key="body")
+    author = fields.String(attribute="author_name", dump_default="anonymous")
+    creation_time = fields.DateTime()
+
+
+_texts = st.text(max_size=40)
+_values = st.none() | st.integers(-10, 10) | _texts | st.booleans()
+
+_users = st.fixed_dictionaries(
+    dict(url_token=_values),
+    optional=dict(password_hash=_values, password=_values, session_id=_values)
+)
+
+_messages = st.fixed_dictionaries(
+    dict(),
+    optional=dict(
+        id=st.integers(-10, 10) | st.none(),
+        text=_texts,
+        body=_values,
+        author_name=_texts,
+        creation_time=st.datetimes(min_value=datetime(2000, 1, 1), max_value=datetime(2100, 1, 1)),
+    )
+)
+
+_schemas = (
+    UserSchema(),
+    UserSchema(exclude=["password"]),
+    user_schema_without_passwords(),
+    _MessageSchema(),
+)
+
+
+@given(st.one_of(_users, _messages))
+def test_compiled_dump(data: dict):
+    for schema in _schemas:
+        compiled_schema = compiled(schema)
+
+        assert compiled_schema.is_compiled
+        assert compiled_schema.dump(data) == schema.dump(data)
+        assert compiled_schema.dump(SimpleNamespace(**data)) == schema.dump(SimpleNamespace(**data))
+
+
+@given(st.one_of(_users, _messages))
+def test_compiled_validation(data: dict):
+    for schema in _schemas:
+        assert compiled(schema).validate(data) == schema.validate(data)
+
+
+@given(st.lists(_users, max_size=4))
+def test_compiled_many(users: list[dict]):
+    schema = user_schema_without_passwords(many=True)
+
+    assert compiled(schema).dump(users) == schema.dump(users)
+    assert compiled(schema).validate(users) == schema.validate(users)
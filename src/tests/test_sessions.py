@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta
+
+from flask_sqlalchemy import SQLAlchemy
+
+from adapters.repositories import SQLAlchemyRepository
+from adapters.sessions import SessionStore
+from orm.models import UserSession
+
+
+class _Clock:
+    def __init__(self):
+        self.time = datetime(2020, 1, 1)
+
+    def __call__(self) -> datetime:
+        return self.time
+
+
+def _session_of(user_id: int, clock: _Clock, life_seconds: float) -> UserSession:
+    return UserSession(
+        user_id=user_id,
+        token=f"token-{user_id}",
+        cancellation_time=clock.time + timedelta(seconds=life_seconds)
+    )
+
+
+def test_session_expiry(database: SQLAlchemy):
+    clock = _Clock()
+    sessions = SessionStore(SQLAlchemyRepository(UserSession, database), clock=clock)
+
+    sessions.add(_session_of(1, clock, 10))
+    sessions.add(_session_of(2, clock, 100))
+    clock.time += timedelta(seconds=5)
+
+    assert sessions.is_active("token-1")
+    assert sessions.get_by_user_id(1).token == "token-1"
+
+    clock.time += timedelta(seconds=50)
+
+    assert not sessions.is_active("token-1")
+    assert sessions.get_by_user_id(1) is None
+    assert sessions.is_active("token-2")
+    assert len(sessions) == 1
+
+
+def test_session_replacement(database: SQLAlchemy):
+    clock = _Clock()
+    sessions = SessionStore(SQLAlchemyRepository(UserSession, database), clock=clock)
+
+    sessions.remember(_session_of(1, clock, 10))
+    sessions.remember(UserSession(user_id=1, token="other-token", cancellation_time=clock.time + timedelta(seconds=100)))
+    clock.time += timedelta(seconds=50)
+
+    assert not sessions.is_active("token-1")
+    assert sessions.get_by_user_id(1).token == "other-token"
+    assert len(sessions) == 1
+
+
+def test_session_purge(database: SQLAlchemy):
+    clock = _Clock()
+
+    database.session.add_all((_session_of(1, clock, -10), _session_of(2, clock, 10), _session_of(3, clock, 100)))
+    database.session.commit()
+
+    sessions = SessionStore(SQLAlchemyRepository(UserSession, database), clock=clock)
+    sessions.load()
+
+    assert len(sessions) == 2
+
+    clock.time += timedelta(seconds=50)
+    sessions.purge()
+    database.session.commit()
+
+    assert len(sessions) == 1
+    assert [session.token for session in database.session.query(UserSession)] == ["token-3"]
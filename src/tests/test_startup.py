@@ -0,0 +1,62 @@
+from importlib import import_module
+from sys import modules
+from threading import Thread
+
+import pytest
+
+from tools.startup import StartupRecorder
+
+
+@pytest.fixture
+def module_directory(tmp_path, monkeypatch):
+    (tmp_path / "startup_parent.py").write_text("import startup_child\n")
+    (tmp_path / "startup_child.py").write_text("from time import sleep\n\nsleep(0.05)\n")
+    (tmp_path / "startup_lazy.py").write_text("from time import sleep\n\nsleep(0.05)\n")
+    (tmp_path / "startup_other.py").write_text("")
+
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    for name in ("startup_parent", "startup_child", "startup_lazy", "startup_other"):
+        monkeypatch.delitem(modules, name, raising=False)
+
+    return tmp_path
+
+
+def test_import_recording(module_directory):
+    recorder = StartupRecorder()
+
+    with recorder.stage("imports"):
+        import startup_parent
+        import_module("startup_lazy")
+
+    import_times = recorder.report.import_times
+
+    assert import_times["startup_child"].self_seconds >= 0.05
+    assert import_times["startup_parent"].cumulative_seconds >= import_times["startup_child"].cumulative_seconds
+    assert import_times["startup_parent"].self_seconds < 0.05
+    assert import_times["startup_lazy"].self_seconds >= 0.05
+
+    assert startup_parent.__loader__ is startup_parent.__spec__.loader
+    assert type(startup_parent.__loader__).__name__ == "SourceFileLoader"
+
+
+def test_import_recording_of_other_threads(module_directory):
+    recorder = StartupRecorder()
+
+    with recorder.stage("imports"):
+        thread = Thread(target=import_module, args=("startup_other", ))
+        thread.start()
+        thread.join()
+
+    assert "startup_other" not in recorder.report.import_times
+
+
+def test_import_recording_outside_stages(module_directory):
+    recorder = StartupRecorder()
+
+    with recorder.stage("imports"):
+        pass
+
+    import_module("startup_lazy")
+
+    assert not recorder.report.import_times
@@ -0,0 +1,95 @@
+import pytest
+from flask import Flask
+from flask.testing import FlaskClient
+
+from services.errors import AccessTokenError
+from services.tokens import validate_access_token
+
+
+@pytest.fixture
+def client(app: Flask, url_token: str) -> FlaskClient:
+    client = app.test_client()
+
+    assert client.post("/api/users", json=dict(url_token=url_token, password="password")).status_code == 201
+
+    return client
+
+
+def _login(client: FlaskClient, url_token: str, password: str = "password") -> dict:
+    response = client.post("/api/tokens", json=dict(url_token=url_token, password=password))
+
+    assert response.status_code == 200
+
+    return response.json
+
+
+def _validate_access_token(app: Flask, token: str) -> None:
+    validate_access_token(token, app.extensions["access_token_decoder"])
+
+
+def test_login(app: Flask, client: FlaskClient, url_token: str):
+    tokens = _login(client, url_token)
+
+    _validate_access_token(app, tokens["access_token"])
+
+    with pytest.raises(AccessTokenError):
+        _validate_access_token(app, tokens["refresh_token"])
+
+
+@pytest.mark.parametrize("credentials, status_code", [
+    (dict(password="other password"), 401),
+    (dict(url_token="unknown-user", password="password"), 401),
+    (dict(password=None), 400),
+])
+def test_login_with_incorrect_credentials(client: FlaskClient, url_token: str, credentials: dict, status_code: int):
+    response = client.post("/api/tokens", json=dict(url_token=url_token) | credentials)
+
+    assert response.status_code == status_code
+    assert "access_token" not in response.json
+
+
+def test_login_of_unknown_user(app: Flask, client: FlaskClient, url_token: str, monkeypatch):
+    password_hasher = app.extensions["password_hasher"]
+    verify = password_hasher.verify
+    verified_hashes = list()
+
+    def recording_verify(password: str, password_hash: str, **kwargs) -> bool:
+        verified_hashes.append(password_hash)
+        return verify(password, password_hash, **kwargs)
+
+    monkeypatch.setattr(password_hasher, "verify", recording_verify)
+
+    assert client.post("/api/tokens", json=dict(url_token="unknown-user", password="password")).status_code == 401
+    assert client.post("/api/tokens", json=dict(url_token=url_token, password="password")).status_code == 200
+
+    dummy_hash, user_hash = verified_hashes
+
+    assert dummy_hash.split("$")[:4] == user_hash.split("$")[:4]
+
+
+def test_refresh_token_rotation(app: Flask, client: FlaskClient, url_token: str):
+    refresh_token = _login(client, url_token)["refresh_token"]
+
+    response = client.post("/api/tokens/refresh", json=dict(refresh_token=refresh_token))
+
+    assert response.status_code == 200
+    _validate_access_token(app, response.json["access_token"])
+
+    assert client.post("/api/tokens/refresh", json=dict(refresh_token=refresh_token)).status_code == 401
+
+
+def test_logout(app: Flask, client: FlaskClient, url_token: str):
+    tokens = _login(client, url_token)
+
+    response = client.delete(
+        "/api/tokens/refresh",
+        json=dict(refresh_token=tokens["refresh_token"]),
+        headers=dict(Authorization=f"Bearer {tokens['access_token']}")
+    )
+
+    assert response.status_code == 204
+
+    with pytest.raises(AccessTokenError):
+        _validate_access_token(app, tokens["access_token"])
+
+    assert client.post("/api/tokens/refresh", json=dict(refresh_token=tokens["refresh_token"])).status_code == 401
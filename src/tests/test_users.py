@@ -0,0 +1,111 @@
+from typing import Iterable
+
+import pytest
+from flask import Flask
+
+from orm import db
+from orm.models import User
+from services.hashing import is_scrypt_hash_of
+from tools.errors import ReportingError
+
+
+def _user_by(app: Flask, url_token: str) -> User | None:
+    with app.app_context():
+        return db.session.query(User).filter_by(url_token=url_token).one_or_none()
+
+
+def test_user_registration(app: Flask, url_token: str):
+    response = app.test_client().post("/api/users", json=dict(url_token=url_token, password="password"))
+
+    assert response.status_code == 201
+
+    user = _user_by(app, url_token)
+
+    assert user is not None
+    assert is_scrypt_hash_of("password", user.password_hash)
+
+
+def test_user_registration_ignores_client_password_hash(app: Flask, url_token: str):
+    response = app.test_client().post(
+        "/api/users",
+        json=dict(url_token=url_token, password="password", password_hash="client-hash")
+    )
+
+    assert response.status_code == 201
+    assert is_scrypt_hash_of("password", _user_by(app, url_token).password_hash)
+
+
+def test_user_registration_with_taken_url_token(app: Flask, url_token: str):
+    client = app.test_client()
+
+    assert client.post("/api/users", json=dict(url_token=url_token, password="password")).status_code == 201
+
+    response = client.post("/api/users", json=dict(url_token=url_token, password="other password"))
+
+    assert response.status_code == 409
+    assert is_scrypt_hash_of("password", _user_by(app, url_token).password_hash)
+
+
+def test_user_registration_on_hashing_overload(app: Flask, url_token: str, monkeypatch):
+    monkeypatch.setattr(app.extensions["password_hasher"], "max_queue_depth", 0)
+
+    response = app.test_client().post("/api/users", json=dict(url_token=url_token, password="password"))
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert _user_by(app, url_token) is None
+
+
+def _store_users(app: Flask, url_tokens: Iterable[str]) -> None:
+    with app.app_context():
+        db.session.add_all(User(url_token=url_token, password_hash="hash") for url_token in url_tokens)
+        db.session.commit()
+
+
+def _page_url_tokens_of(response) -> list[str]:
+    return [user["url_token"] for user in response.json["users"]]
+
+
+def test_user_pages(app: Flask):
+    _store_users(app, (f"user-{index}" for index in range(5)))
+    client = app.test_client()
+
+    first_page = client.get("/api/users?limit=2")
+    second_page = client.get(f"/api/users?limit=2&after={first_page.json['next_cursor']}")
+    last_page = client.get(f"/api/users?limit=2&after={second_page.json['next_cursor']}")
+
+    assert _page_url_tokens_of(first_page) == ["user-0", "user-1"]
+    assert _page_url_tokens_of(second_page) == ["user-2", "user-3"]
+    assert _page_url_tokens_of(last_page) == ["user-4"]
+    assert last_page.json["next_cursor"] is None
+
+
+def test_user_pages_ending_on_full_page(app: Flask):
+    _store_users(app, ("user-0", "user-1"))
+    client = app.test_client()
+
+    full_page = client.get("/api/users?limit=2")
+    empty_page = client.get(f"/api/users?limit=2&after={full_page.json['next_cursor']}")
+
+    assert _page_url_tokens_of(full_page) == ["user-0", "user-1"]
+    assert empty_page.json == dict(users=list(), next_cursor=None)
+
+
+@pytest.mark.parametrize("limit", [0, 3])
+def test_user_pages_of_incorrect_size(app: Flask, limit: int):
+    app.config["PAGE_MAX_SIZE"] = 2
+
+    with pytest.raises(ReportingError):
+        app.test_client().get(f"/api/users?limit={limit}")
+
+
+def test_user_page_filters(app: Flask):
+    _store_users(app, ("user-0", "user-1"))
+    client = app.test_client()
+
+    response = client.get("/api/users?limit=2", json=dict(url_token="user-1", session_id=1))
+
+    assert _page_url_tokens_of(response) == ["user-1"]
+
+    with pytest.raises(ReportingError):
+        client.get("/api/users?limit=2", json=dict(url_token="user 1"))
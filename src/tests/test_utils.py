@@ -0,0 +1,79 @@
+from functools import partial
+from typing import Callable
+
+import pytest
+from pyhandling import then, mergely, on_condition, returnly, eventually, post_partial, take, close, return_
+
+from tools.utils import fused, merge
+
+
+class _CallLog:
+    def __init__(self):
+        self.calls = list()
+
+    def action(self, name: str, result: object = None) -> Callable:
+        def logged_action(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            return name if result is None else result
+
+        return logged_action
+
+
+def _merging_factory_of(log: _CallLog) -> Callable:
+    def merging_factory(*args, **kwargs):
+        log.calls.append(("factory", args, kwargs))
+        return log.action("merged")
+
+    return merging_factory
+
+
+_chain_factories = {
+    "chain": lambda log: log.action("first") |then>> log.action("second") |then>> log.action("third"),
+    "partial": lambda log: partial(log.action("partial"), "bound", key="value") |then>> log.action("next"),
+    "post_partial": lambda log: post_partial(log.action("post partial"), "bound", bound_key="value"),
+    "positive branch": lambda log: on_condition(
+        log.action("checker", True),
+        log.action("positive"),
+        else_=log.action("negative")
+    ),
+    "negative branch": lambda log: on_condition(
+        log.action("checker", False),
+        log.action("positive"),
+        else_=log.action("negative")
+    ),
+    "returnly": lambda log: log.action("first") |then>> returnly(log.action("ignored")) |then>> log.action("last"),
+    "eventually": lambda log: eventually(log.action("eventual")) |then>> log.action("next"),
+    "merge": lambda log: merge(log.action("first"), log.action("second")) |then>> log.action("merged"),
+    "mergely": lambda log: mergely(
+        _merging_factory_of(log),
+        log.action("positional 1"),
+        log.action("positional 2"),
+        first_keyword=log.action("keyword 1"),
+        second_keyword=log.action("keyword 2")
+    ) |then>> log.action("after"),
+    "nested mergely": lambda log: take(log.action("inner")) |then>> mergely(
+        take(mergely),
+        take(close(log.action("combined"))),
+        second=return_
+    ),
+    "mergely in branch": lambda log: on_condition(
+        log.action("checker", True),
+        mergely(_merging_factory_of(log), log.action("positional"), keyword=log.action("keyword")),
+        else_=log.action("negative")
+    ),
+}
+
+
+@pytest.mark.parametrize("chain_name", _chain_factories.keys())
+def test_fused_chain_equivalence(chain_name: str):
+    unfused_log, fused_log = _CallLog(), _CallLog()
+
+    unfused_result = _chain_factories[chain_name](unfused_log)(1, 2, key="argument")
+    fused_result = fused(_chain_factories[chain_name](fused_log))(1, 2, key="argument")
+
+    # Decorators built by the chains are compared by their results
+    if callable(unfused_result):
+        unfused_result, fused_result = unfused_result("decorated"), fused_result("decorated")
+
+    assert fused_result == unfused_result
+    assert fused_log.calls == unfused_log.calls
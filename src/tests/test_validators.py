@@ -0,0 +1,37 @@
+import pytest
+from hypothesis import given, strategies as st
+from marshmallow import ValidationError
+
+from tools.validators import CharactersValidator
+
+
+_characters = st.sampled_from("ab-_^]\\[.*é 1")
+_character_sets = st.frozensets(_characters, max_size=5)
+
+
+def _wrong_characters_of(line: str, extra_characters: frozenset[str], allowable_characters: frozenset[str]) -> list[str]:
+    return list(dict.fromkeys(
+        character for character in line
+        if character in extra_characters or (allowable_characters and character not in allowable_characters)
+    ))
+
+
+@given(st.text(_characters, max_size=12), _character_sets, _character_sets)
+def test_characters_validator(line: str, extra_characters: frozenset[str], allowable_characters: frozenset[str]):
+    validator = CharactersValidator(extra_characters, allowable_characters, line_name="Url token")
+    wrong_characters = _wrong_characters_of(line, extra_characters, allowable_characters)
+
+    if not wrong_characters:
+        validator(line)
+        return
+
+    with pytest.raises(ValidationError) as error_info:
+        validator(line)
+
+    assert error_info.value.messages == [
+        f"Url token has extra characters: {', '.join(wrong_characters)}".capitalize()
+    ]
+
+
+def test_characters_validator_without_characters():
+    CharactersValidator()("any line ]^\\")
@@ -0,0 +1,120 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from time import time
+from typing import Generic, TypeVar, Optional, Hashable, Any, Tuple, Callable
+
+from pyhandling.annotations import event_for
+
+
+@dataclass
+class CacheStatistics:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        requests = self.hits + self.misses
+
+        return self.hits / requests if requests else 0.
+
+
+KeyT = TypeVar("KeyT", bound=Hashable)
+ValueT = TypeVar("ValueT")
+
+
+class LRUCache(Generic[KeyT, ValueT]):
+    """
+    Thread-safe cache bounded by the number of stored entries, evicting the
+    least recently used ones.
+
+    Each entry can have its own expiration time, measured by the input clock.
+    Expired entries are removed when they are accessed.
+
+    Keys of entries evicted or expired are passed to the input handler under
+    the lock of the cache.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        *,
+        clock: event_for[float] = time,
+        discarding_handler: Optional[Callable[[KeyT], Any]] = None
+    ):
+        if max_size <= 0:
+            raise ValueError("Cache max size must be positive")
+
+        self.max_size = max_size
+        self.statistics = CacheStatistics()
+
+        self._clock = clock
+        self._discarding_handler = discarding_handler
+        self._entries: OrderedDict[KeyT, Tuple[ValueT, Optional[float]]] = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: KeyT) -> bool:
+        with self._lock:
+            return self.__get_alive_entry_by(key) is not None
+
+    def get(self, key: KeyT, default: Any = None) -> ValueT | Any:
+        with self._lock:
+            entry = self.__get_alive_entry_by(key)
+
+            if entry is None:
+                self.statistics.misses += 1
+                return default
+
+            self.statistics.hits += 1
+            self._entries.move_to_end(key)
+
+            return entry[0]
+
+    def set(self, key: KeyT, value: ValueT, *, expiration_time: Optional[float] = None) -> None:
+        if expiration_time is not None and expiration_time <= self._clock():
+            return
+
+        with self._lock:
+            self._entries[key] = (value, expiration_time)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                evicted_key, _ = self._entries.popitem(last=False)
+                self.statistics.evictions += 1
+
+                if self._discarding_handler is not None:
+                    self._discarding_handler(evicted_key)
+
+    def remove(self, key: KeyT) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def remove_where(self, checker: Callable[[KeyT, ValueT], bool]) -> None:
+        with self._lock:
+            for key in tuple(
+                key for key, (value, _) in self._entries.items() if checker(key, value)
+            ):
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __get_alive_entry_by(self, key: KeyT) -> Optional[Tuple[ValueT, Optional[float]]]:
+        entry = self._entries.get(key)
+
+        if entry is not None and entry[1] is not None and entry[1] <= self._clock():
+            del self._entries[key]
+            self.statistics.expirations += 1
+
+            if self._discarding_handler is not None:
+                self._discarding_handler(key)
+
+            return None
+
+        return entry
@@ -0,0 +1,89 @@
+from hashlib import blake2b
+from math import ceil, log
+from threading import Lock
+from typing import Iterable, Tuple
+
+
+class BloomFilter:
+    """
+    Thread-safe probabilistic set of strings sized for the input number of
+    values and false positive rate.
+
+    Never gives false negatives, so a missing value is certainly absent, and a
+    found one is present with the probability of `1 - false_positive_rate`
+    while the number of values doesn't exceed the expected one.
+    """
+
+    def __init__(self, expected_size: int, *, false_positive_rate: float = 0.01):
+        if expected_size <= 0:
+            raise ValueError("Bloom filter expected size must be positive")
+
+        if not 0 < false_positive_rate < 1:
+            raise ValueError("Bloom filter false positive rate must be between 0 and 1")
+
+        self.expected_size = expected_size
+        self.false_positive_rate = false_positive_rate
+
+        self._bit_number = ceil(-expected_size * log(false_positive_rate) / log(2) ** 2)
+        self._hash_number = max(1, round(self._bit_number / expected_size * log(2)))
+
+        self._bits = bytearray(ceil(self._bit_number / 8))
+        self._size = 0
+        self._lock = Lock()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def __contains__(self, value: str) -> bool:
+        bits = self._bits
+
+        return all(bits[index >> 3] & (1 << (index & 7)) for index in self.__bit_indexes_of(value))
+
+    def add(self, value: str) -> None:
+        bit_indexes = self.__bit_indexes_of(value)
+
+        with self._lock:
+            self.__set(self._bits, bit_indexes)
+            self._size += 1
+
+    def update(self, values: Iterable[str]) -> None:
+        for value in values:
+            self.add(value)
+
+    def rebuild(self, values: Iterable[str]) -> None:
+        """
+        Method to replace stored values with the input ones, answering by the
+        previous values until the new ones are all added.
+        """
+
+        bits = bytearray(len(self._bits))
+        size = 0
+
+        for value in values:
+            self.__set(bits, self.__bit_indexes_of(value))
+            size += 1
+
+        with self._lock:
+            self._bits = bits
+            self._size = size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._bits = bytearray(len(self._bits))
+            self._size = 0
+
+    def __bit_indexes_of(self, value: str) -> Tuple[int]:
+        digest = blake2b(value.encode(), digest_size=16).digest()
+        first_hash = int.from_bytes(digest[:8], "little")
+        second_hash = int.from_bytes(digest[8:], "little") | 1
+
+        return tuple(
+            (first_hash + hash_number * second_hash) % self._bit_number
+            for hash_number in range(self._hash_number)
+        )
+
+    @staticmethod
+    def __set(bits: bytearray, bit_indexes: Iterable[int]) -> None:
+        for index in bit_indexes:
+            bits[index >> 3] |= 1 << (index & 7)
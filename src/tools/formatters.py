@@ -1,4 +1,5 @@
-from typing import Callable, Any
+from json import dumps
+from typing import Callable, Any, Iterable, Generator
 
 
 def format_dict(
@@ -24,4 +25,42 @@ def wrap_in_brackets(data: Any, bracket: str) -> str:
         (bracket[0] if len(bracket) > 1 else bracket)
         + str(data)
         + (bracket[1] if len(bracket) > 1 else bracket)
-    )
\ No newline at end of file
+    )
+
+
+def json_object_chunks_with(
+    items_key: str,
+    items: Iterable[Any],
+    *,
+    chunk_size: int = 100,
+    tail: Callable[[], dict] = dict,
+    serializer: Callable[[Any], str] = dumps
+) -> Generator[str, None, None]:
+    """
+    Function to lazy serialize a JSON object containing an array of input
+    items, yielding the text of every chunk of items as soon as it is ready.
+
+    Other object values are taken from the tail after all the items are
+    serialized.
+    """
+
+    yield f"{{{serializer(items_key)}: ["
+
+    chunk = list()
+    is_first_chunk = True
+
+    for item in items:
+        chunk.append(serializer(item))
+
+        if len(chunk) >= chunk_size:
+            yield ("" if is_first_chunk else ", ") + ", ".join(chunk)
+            chunk = list()
+            is_first_chunk = False
+
+    if chunk:
+        yield ("" if is_first_chunk else ", ") + ", ".join(chunk)
+
+    yield "]" + "".join(
+        f", {serializer(key)}: {serializer(value)}"
+        for key, value in tail().items()
+    ) + "}"
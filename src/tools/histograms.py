@@ -0,0 +1,124 @@
+from math import log, floor, sqrt, inf
+from threading import Lock
+from typing import Iterable
+
+
+class LogHistogram:
+    """
+    Thread-safe histogram of positive values with logarithmic buckets, keeping
+    quantiles within the input relative accuracy at a fixed memory cost.
+
+    Values lower than `lowest_value` are counted in the lowest bucket.
+    """
+
+    def __init__(self, *, lowest_value: float = 1e-6, relative_accuracy: float = 0.01):
+        if lowest_value <= 0:
+            raise ValueError("Histogram lowest value must be positive")
+
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("Histogram relative accuracy must be between 0 and 1")
+
+        self.lowest_value = lowest_value
+        self.relative_accuracy = relative_accuracy
+
+        self._base = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_base = log(self._base)
+
+        self._bucket_counts: dict[int, int] = dict()
+        self._count = 0
+        self._total = 0.
+        self._min = inf
+        self._max = -inf
+        self._lock = Lock()
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def total(self) -> float:
+        return self._total
+
+    @property
+    def min(self) -> float:
+        return self._min if self._count else 0.
+
+    @property
+    def max(self) -> float:
+        return self._max if self._count else 0.
+
+    @property
+    def mean(self) -> float:
+        return self._total / self._count if self._count else 0.
+
+    def record(self, value: float, count: int = 1) -> None:
+        bucket_index = self.__bucket_index_of(value)
+
+        with self._lock:
+            self._bucket_counts[bucket_index] = self._bucket_counts.get(bucket_index, 0) + count
+            self._count += count
+            self._total += value * count
+            self._min = min(self._min, value)
+            self._max = max(self._max, value)
+
+    def update(self, histogram: "LogHistogram") -> None:
+        """Method to add records of another histogram with the same buckets."""
+
+        if (histogram.lowest_value, histogram.relative_accuracy) != (self.lowest_value, self.relative_accuracy):
+            raise ValueError("Histograms with different buckets can't be merged")
+
+        with histogram._lock:
+            bucket_counts = tuple(histogram._bucket_counts.items())
+            count, total, min_, max_ = histogram._count, histogram._total, histogram._min, histogram._max
+
+        with self._lock:
+            for bucket_index, bucket_count in bucket_counts:
+                self._bucket_counts[bucket_index] = self._bucket_counts.get(bucket_index, 0) + bucket_count
+
+            self._count += count
+            self._total += total
+            self._min = min(self._min, min_)
+            self._max = max(self._max, max_)
+
+    def quantile(self, quantile: float) -> float:
+        if not 0 <= quantile <= 1:
+            raise ValueError("Quantile must be between 0 and 1")
+
+        with self._lock:
+            if not self._count:
+                return 0.
+
+            rank = quantile * (self._count - 1)
+            passed_count = 0
+
+            for bucket_index in sorted(self._bucket_counts):
+                passed_count += self._bucket_counts[bucket_index]
+
+                if passed_count > rank:
+                    return min(max(self.__value_of(bucket_index), self._min), self._max)
+
+            return self._max
+
+    def clear(self) -> None:
+        with self._lock:
+            self._bucket_counts.clear()
+            self._count = 0
+            self._total = 0.
+            self._min = inf
+            self._max = -inf
+
+    def as_dict(self, quantiles: Iterable[float] = (0.5, 0.9, 0.99, 0.999)) -> dict:
+        return dict(
+            count=self.count,
+            total=self.total,
+            min=self.min,
+            max=self.max,
+            mean=self.mean,
+            quantiles={str(quantile): self.quantile(quantile) for quantile in quantiles}
+        )
+
+    def __bucket_index_of(self, value: float) -> int:
+        return floor(log(max(value, self.lowest_value) / self.lowest_value) / self._log_base)
+
+    def __value_of(self, bucket_index: int) -> float:
+        return self.lowest_value * self._base ** bucket_index * sqrt(self._base)
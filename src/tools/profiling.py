@@ -0,0 +1,181 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from cProfile import Profile
+from functools import wraps
+from os import makedirs, path
+from random import random
+from threading import Lock
+from time import perf_counter, time
+from typing import Callable, Optional, Iterator, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from tools.histograms import LogHistogram
+
+
+class ScopeCounters:
+    __slots__ = ("statements", "statement_seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.statement_seconds = 0.
+
+
+class Profiler:
+    """
+    Recorder of durations and counts into histograms by metric and by the
+    scope they were recorded in, like a view.
+
+    Does nothing until it is enabled. Scopes can be sampled into cProfile
+    dumps when a sampling rate and a directory are set, one scope at a time,
+    so that profiles of concurrent threads don't collide.
+    """
+
+    def __init__(
+        self,
+        *,
+        is_enabled: bool = False,
+        sampling_rate: float = 0.,
+        profile_directory: Optional[str] = None
+    ):
+        self.is_enabled = is_enabled
+        self.sampling_rate = sampling_rate
+        self.profile_directory = profile_directory
+
+        self._histograms: dict[Tuple[str, str], LogHistogram] = dict()
+        self._histogram_lock = Lock()
+        self._sampling_lock = Lock()
+        self._current_scope = ContextVar[Optional[Tuple[str, ScopeCounters]]]("current_scope", default=None)
+
+    def record(self, metric_name: str, value: float, *, scope_name: Optional[str] = None) -> None:
+        if not self.is_enabled:
+            return
+
+        if scope_name is None:
+            current_scope = self._current_scope.get()
+            scope_name = "global" if current_scope is None else current_scope[0]
+
+        self.__histogram_by(scope_name, metric_name).record(value)
+
+    def record_statement(self, seconds: float) -> None:
+        current_scope = self._current_scope.get()
+
+        if current_scope is not None:
+            current_scope[1].statements += 1
+            current_scope[1].statement_seconds += seconds
+
+    def timed(self, metric_name: str, action: Callable) -> Callable:
+        """Method to get a version of the input action recording its duration."""
+
+        @wraps(action)
+        def timed_action(*args, **kwargs):
+            if not self.is_enabled:
+                return action(*args, **kwargs)
+
+            start_time = perf_counter()
+
+            try:
+                return action(*args, **kwargs)
+            finally:
+                self.record(metric_name, perf_counter() - start_time)
+
+        return timed_action
+
+    @contextmanager
+    def scope(self, name: str) -> Iterator[None]:
+        """
+        Method to record wall time and statement counters of the code inside as
+        metrics of a scope with the input name.
+        """
+
+        if not self.is_enabled:
+            yield
+            return
+
+        counters = ScopeCounters()
+        token = self._current_scope.set((name, counters))
+        profile = self.__sampled_profile()
+        start_time = perf_counter()
+
+        if profile is not None:
+            profile.enable()
+
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+
+            self.record("wall_seconds", perf_counter() - start_time, scope_name=name)
+            self.record("sql_statements", counters.statements, scope_name=name)
+            self.record("sql_seconds", counters.statement_seconds, scope_name=name)
+
+            try:
+                self._current_scope.reset(token)
+            except ValueError:
+                self._current_scope.set(None)
+
+            if profile is not None:
+                try:
+                    self.__dump(profile, name)
+                finally:
+                    self._sampling_lock.release()
+
+    def report(self) -> dict:
+        with self._histogram_lock:
+            histograms = tuple(self._histograms.items())
+
+        report = dict()
+
+        for (scope_name, metric_name), histogram in histograms:
+            report.setdefault(scope_name, dict())[metric_name] = histogram.as_dict()
+
+        return report
+
+    def clear(self) -> None:
+        with self._histogram_lock:
+            self._histograms.clear()
+
+    def __histogram_by(self, scope_name: str, metric_name: str) -> LogHistogram:
+        key = (scope_name, metric_name)
+        histogram = self._histograms.get(key)
+
+        if histogram is not None:
+            return histogram
+
+        with self._histogram_lock:
+            return self._histograms.setdefault(key, LogHistogram())
+
+    def __sampled_profile(self) -> Optional[Profile]:
+        if (
+            self.profile_directory is None
+            or random() >= self.sampling_rate
+            or not self._sampling_lock.acquire(blocking=False)
+        ):
+            return None
+
+        return Profile()
+
+    def __dump(self, profile: Profile, scope_name: str) -> None:
+        makedirs(self.profile_directory, exist_ok=True)
+
+        profile.dump_stats(path.join(
+            self.profile_directory,
+            f"{scope_name.replace('/', '.')}-{time():.6f}.prof"
+        ))
+
+
+def profile_statements_of(engine: Engine, profiler: Profiler) -> None:
+    """Function to count statements of the engine in current profiler scopes."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def remember_start_time(connection, *_) -> None:
+        connection.info.setdefault("profiling_start_times", list()).append(perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def record_statement(connection, *_) -> None:
+        profiler.record_statement(perf_counter() - connection.info["profiling_start_times"].pop())
+
+
+profiler = Profiler()
@@ -0,0 +1,205 @@
+from collections.abc import Mapping
+from threading import Lock
+from typing import Any, Callable, Optional, Hashable, Iterable
+
+from marshmallow import Schema, ValidationError, EXCLUDE, fields
+from marshmallow.utils import ensure_text_type, get_value, missing
+
+
+class CompiledSchema:
+    """
+    Schema proxy with dump and validate functions generated from the fields of
+    the input schema, returning the same results as the schema does.
+
+    Schemas with processing hooks, custom attribute getting or non-excluding
+    handling of unknown fields are not compiled and are called as is.
+    """
+
+    def __init__(self, schema: Schema):
+        self.schema = schema
+        self.many = schema.many
+        self.is_compiled = _is_compilable(schema)
+
+        if self.is_compiled:
+            self._dump_one = _compile_dumping_of(schema)
+            self._validate_one = _compile_validation_of(schema)
+
+    def dump(self, obj: Any, *, many: Optional[bool] = None) -> Any:
+        many = self.many if many is None else bool(many)
+
+        if not self.is_compiled:
+            return self.schema.dump(obj, many=many)
+
+        if many and obj is not None:
+            return [self._dump_one(item) for item in obj]
+
+        return self._dump_one(obj)
+
+    def validate(self, data: Any, *, many: Optional[bool] = None, partial: Any = None) -> dict:
+        many = self.many if many is None else bool(many)
+
+        if not self.is_compiled or partial or not (
+            isinstance(data, list) if many else isinstance(data, Mapping)
+        ):
+            return self.schema.validate(data, many=many, partial=partial)
+
+        if not many:
+            return self._validate_one(data)
+
+        errors = dict()
+
+        for index, item in enumerate(data):
+            item_errors = (
+                self._validate_one(item)
+                if isinstance(item, Mapping)
+                else self.schema.validate(item, many=False)
+            )
+
+            if item_errors:
+                errors[index] = item_errors
+
+        return errors
+
+
+def compiled(schema: Schema) -> CompiledSchema:
+    """
+    Function to get a compiled version of the input schema, cached by the
+    schema type and its field selection options.
+    """
+
+    key = _compilation_key_of(schema)
+
+    with _compiled_schema_lock:
+        if key not in _compiled_schemas:
+            _compiled_schemas[key] = CompiledSchema(schema)
+
+        return _compiled_schemas[key]
+
+
+_compiled_schemas: dict[Hashable, CompiledSchema] = dict()
+_compiled_schema_lock = Lock()
+
+
+def _compilation_key_of(schema: Schema) -> Hashable:
+    return (
+        type(schema),
+        schema.many,
+        _frozen(schema.only),
+        _frozen(schema.exclude),
+        _frozen(schema.load_only),
+        _frozen(schema.dump_only),
+        schema.unknown
+    )
+
+
+def _frozen(names: Optional[Iterable[str]]) -> Optional[frozenset]:
+    return frozenset(names) if names is not None else None
+
+
+def _is_compilable(schema: Schema) -> bool:
+    return (
+        not any(schema._hooks.values())
+        and type(schema).get_attribute is Schema.get_attribute
+        and schema.unknown == EXCLUDE
+        and schema.dict_class is dict
+    )
+
+
+def _compile_dumping_of(schema: Schema) -> Callable[[Any], dict]:
+    namespace = dict(
+        missing=missing,
+        get_value=get_value,
+        ensure_text_type=ensure_text_type,
+        get_attribute=schema.get_attribute
+    )
+    getting_lines = list()
+    storing_lines = list()
+
+    for index, (attribute_name, field) in enumerate(schema.dump_fields.items()):
+        key = field.data_key if field.data_key is not None else attribute_name
+        value_name = f"value_{index}"
+
+        if not _is_field_inlinable(attribute_name, field):
+            namespace[f"field_{index}"] = field
+            getting_lines.append(
+                f"{value_name} = field_{index}.serialize({attribute_name!r}, obj, accessor=get_attribute)"
+            )
+            storing_lines.append(f"if {value_name} is not missing: result[{key!r}] = {value_name}")
+            continue
+
+        checked_name = field.attribute if field.attribute is not None else attribute_name
+        getting_lines.append((checked_name, value_name))
+
+        storing_lines.append(
+            f"if {value_name} is not missing: result[{key!r}] = "
+            f"None if {value_name} is None else {_inline_serialization_of(field, value_name)}"
+        )
+
+    inlined_getting_lines = [line for line in getting_lines if isinstance(line, tuple)]
+
+    source_lines = [
+        "def dump(obj):",
+        "    if not hasattr(obj, '__getitem__'):",
+        *(
+            f"        {value_name} = getattr(obj, {checked_name!r}, missing)"
+            for checked_name, value_name in inlined_getting_lines
+        ),
+        "        pass",
+        "    else:",
+        *(
+            f"        {value_name} = get_value(obj, {checked_name!r}, missing)"
+            for checked_name, value_name in inlined_getting_lines
+        ),
+        "        pass",
+        *(f"    {line}" for line in getting_lines if isinstance(line, str)),
+        "    result = {}",
+        *(f"    {line}" for line in storing_lines),
+        "    return result",
+    ]
+
+    return _function_from("\n".join(source_lines), "dump", namespace)
+
+
+def _is_field_inlinable(attribute_name: str, field: fields.Field) -> bool:
+    checked_name = field.attribute if field.attribute is not None else attribute_name
+
+    return (
+        type(field) in (fields.String, fields.Integer)
+        and field.dump_default is missing
+        and "." not in checked_name
+        and not getattr(field, "as_string", False)
+    )
+
+
+def _inline_serialization_of(field: fields.Field, value_name: str) -> str:
+    if type(field) is fields.String:
+        return f"ensure_text_type({value_name})"
+
+    return f"int({value_name})"
+
+
+def _compile_validation_of(schema: Schema) -> Callable[[Mapping], dict]:
+    namespace = dict(missing=missing, get_value=get_value, ValidationError=ValidationError)
+    source_lines = ["def validate(data):", "    errors = {}"]
+
+    for index, (attribute_name, field) in enumerate(schema.load_fields.items()):
+        key = field.data_key if field.data_key is not None else attribute_name
+        namespace[f"field_{index}"] = field
+
+        source_lines.extend((
+            f"    value = get_value(data, {key!r}, missing)",
+            "    try:",
+            f"        field_{index}.deserialize(value, {key!r}, data)",
+            "    except ValidationError as error:",
+            f"        errors[{key!r}] = error.messages",
+        ))
+
+    source_lines.append("    return errors")
+
+    return _function_from("\n".join(source_lines), "validate", namespace)
+
+
+def _function_from(source: str, name: str, namespace: dict) -> Callable:
+    exec(compile(source, f"<compiled schema {name}>", "exec"), namespace)
+
+    return namespace[name]
@@ -0,0 +1,169 @@
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from importlib.abc import Loader, MetaPathFinder
+from importlib.machinery import ModuleSpec
+from sys import meta_path
+from threading import get_ident
+from time import perf_counter
+from types import ModuleType
+from typing import Iterator, Any, Optional, Sequence
+
+
+@dataclass
+class ModuleImportTime:
+    cumulative_seconds: float = 0.
+    self_seconds: float = 0.
+
+
+@dataclass
+class StartupReport:
+    stage_seconds: dict[str, float] = field(default_factory=dict)
+    import_times: dict[str, ModuleImportTime] = field(default_factory=dict)
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(self.stage_seconds.values())
+
+    def lines(self, *, module_number: int = 20) -> list[str]:
+        slowest_imports = sorted(
+            self.import_times.items(),
+            key=lambda item: item[1].self_seconds,
+            reverse=True
+        )[:module_number]
+
+        return [
+            f"Startup took {self.total_seconds * 1e3:.1f}ms",
+            *(f"  stage {name}: {seconds * 1e3:.1f}ms" for name, seconds in self.stage_seconds.items()),
+            f"Slowest of {len(self.import_times)} imported modules (self / cumulative):",
+            *(
+                f"  {name}: {import_time.self_seconds * 1e3:.1f}ms / {import_time.cumulative_seconds * 1e3:.1f}ms"
+                for name, import_time in slowest_imports
+            ),
+        ]
+
+
+class StartupRecorder:
+    """
+    Recorder of durations of startup stages and of first imports of modules
+    made during them.
+
+    Imports are timed by a finder put first in `sys.meta_path` while a stage is
+    running, so imports by statements and by `importlib` are recorded alike.
+    Only imports of the thread running the stage are recorded. Imports of
+    other threads, like background ones started by stages, pass through as is.
+    """
+
+    def __init__(self, *, is_recording_imports: bool = True):
+        self.is_recording_imports = is_recording_imports
+        self.report = StartupReport()
+
+        self._finder = _TimingFinder(self)
+        self._stage_thread_id: Optional[int] = None
+        self._child_seconds: list[float] = list()
+
+    @property
+    def stage_thread_id(self) -> Optional[int]:
+        return self._stage_thread_id
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        is_finding_imports = self.is_recording_imports and self._stage_thread_id is None
+
+        if is_finding_imports:
+            self._stage_thread_id = get_ident()
+            meta_path.insert(0, self._finder)
+
+        start_time = perf_counter()
+
+        try:
+            yield
+        finally:
+            self.report.stage_seconds[name] = (
+                self.report.stage_seconds.get(name, 0.) + perf_counter() - start_time
+            )
+
+            if is_finding_imports:
+                meta_path.remove(self._finder)
+                self._stage_thread_id = None
+
+    @contextmanager
+    def timed_import_of(self, name: str) -> Iterator[None]:
+        """Context manager to record the code inside as the import of a module."""
+
+        self._child_seconds.append(0.)
+        start_time = perf_counter()
+
+        try:
+            yield
+        finally:
+            cumulative_seconds = perf_counter() - start_time
+            child_seconds = self._child_seconds.pop()
+
+            if self._child_seconds:
+                self._child_seconds[-1] += cumulative_seconds
+
+            import_time = self.report.import_times.setdefault(name, ModuleImportTime())
+            import_time.cumulative_seconds += cumulative_seconds
+            import_time.self_seconds += cumulative_seconds - child_seconds
+
+
+class _TimingFinder(MetaPathFinder):
+    """
+    Finder giving out specs of other finders of `sys.meta_path` with loaders
+    timing execution of modules in the stage thread of the input recorder.
+    """
+
+    def __init__(self, recorder: StartupRecorder):
+        self._recorder = recorder
+
+    def find_spec(
+        self,
+        name: str,
+        path: Optional[Sequence[str]],
+        target: Optional[ModuleType] = None
+    ) -> Optional[ModuleSpec]:
+        if get_ident() != self._recorder.stage_thread_id:
+            return None
+
+        for finder in tuple(meta_path):
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+
+            spec = finder.find_spec(name, path, target)
+
+            if spec is not None:
+                break
+        else:
+            return None
+
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader, self._recorder)
+
+        return spec
+
+
+class _TimedLoader(Loader):
+    """
+    Loader recording execution of modules by the input loader, which it puts
+    back to the executed modules.
+    """
+
+    def __init__(self, loader: Loader, recorder: StartupRecorder):
+        self._loader = loader
+        self._recorder = recorder
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._loader, name)
+
+    def create_module(self, spec: ModuleSpec) -> Optional[ModuleType]:
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module: ModuleType) -> None:
+        try:
+            with self._recorder.timed_import_of(module.__name__):
+                self._loader.exec_module(module)
+        finally:
+            module.__loader__ = self._loader
+
+            if getattr(module, "__spec__", None) is not None:
+                module.__spec__.loader = self._loader
@@ -0,0 +1,138 @@
+from math import ceil
+from time import time
+from typing import Generic, TypeVar, Hashable, Tuple
+
+from pyhandling.annotations import event_for
+
+
+KeyT = TypeVar("KeyT", bound=Hashable)
+
+
+class HierarchicalTimerWheel(Generic[KeyT]):
+    """
+    Hierarchical timing wheel of key expirations with O(1) scheduling and
+    cancellation.
+
+    Each level has `slot_number` slots, a slot of the first level lasts one
+    tick and a slot of each next level lasts as long as the whole previous
+    level. Expirations move down to lower levels as their time approaches.
+    Expirations beyond the last level wait in its farthest slot.
+    """
+
+    def __init__(
+        self,
+        *,
+        tick_seconds: float = 1,
+        slot_number: int = 64,
+        level_number: int = 4,
+        clock: event_for[float] = time
+    ):
+        self.tick_seconds = tick_seconds
+        self.slot_number = slot_number
+        self.level_number = level_number
+
+        self._clock = clock
+        self._origin = clock()
+        self._current_tick = 0
+
+        self._levels: list[list[set[KeyT]]] = [
+            [set() for _ in range(slot_number)] for _ in range(level_number)
+        ]
+        self._expiration_ticks: dict[KeyT, int] = dict()
+        self._locations: dict[KeyT, Tuple[int, int]] = dict()
+        self._overdue_keys: set[KeyT] = set()
+
+    def __len__(self) -> int:
+        return len(self._expiration_ticks)
+
+    def __contains__(self, key: KeyT) -> bool:
+        return key in self._expiration_ticks
+
+    def schedule(self, key: KeyT, expiration_time: float) -> None:
+        self.cancel(key)
+
+        expiration_tick = ceil((expiration_time - self._origin) / self.tick_seconds)
+        self._expiration_ticks[key] = expiration_tick
+
+        self.__place(key, expiration_tick)
+
+    def cancel(self, key: KeyT) -> None:
+        if self._expiration_ticks.pop(key, None) is None:
+            return
+
+        location = self._locations.pop(key, None)
+
+        if location is None:
+            self._overdue_keys.discard(key)
+        else:
+            level_index, slot_index = location
+            self._levels[level_index][slot_index].discard(key)
+
+    def advance(self) -> set[KeyT]:
+        """Method to move the wheel to the current time and get expired keys."""
+
+        expired_keys = set()
+        target_tick = int((self._clock() - self._origin) // self.tick_seconds)
+
+        while self._current_tick < target_tick:
+            if not self._locations:
+                self._current_tick = target_tick
+                break
+
+            self._current_tick += 1
+
+            self.__cascade()
+
+            slot = self._levels[0][self._current_tick % self.slot_number]
+            slot_keys = tuple(slot)
+            slot.clear()
+
+            for key in slot_keys:
+                self.__place(key, self._expiration_ticks[key])
+
+        expired_keys |= self._overdue_keys
+        self._overdue_keys = set()
+
+        for key in expired_keys:
+            self._locations.pop(key, None)
+            del self._expiration_ticks[key]
+
+        return expired_keys
+
+    def __cascade(self) -> None:
+        level_index = 0
+        tick = self._current_tick
+
+        while level_index + 1 < self.level_number and tick % self.slot_number == 0:
+            level_index += 1
+            tick //= self.slot_number
+
+        for cascaded_level_index in range(level_index, 0, -1):
+            slot_index = (self._current_tick // self.slot_number ** cascaded_level_index) % self.slot_number
+            slot = self._levels[cascaded_level_index][slot_index]
+            cascaded_keys = tuple(slot)
+            slot.clear()
+
+            for key in cascaded_keys:
+                self.__place(key, self._expiration_ticks[key])
+
+    def __place(self, key: KeyT, expiration_tick: int) -> None:
+        tick_delta = expiration_tick - self._current_tick
+
+        if tick_delta <= 0:
+            self._locations.pop(key, None)
+            self._overdue_keys.add(key)
+            return
+
+        level_index = 0
+
+        while level_index + 1 < self.level_number and tick_delta >= self.slot_number ** (level_index + 1):
+            level_index += 1
+
+        if tick_delta >= self.slot_number ** (level_index + 1):
+            expiration_tick = self._current_tick + self.slot_number ** (level_index + 1) - 1
+
+        slot_index = (expiration_tick // self.slot_number ** level_index) % self.slot_number
+
+        self._levels[level_index][slot_index].add(key)
+        self._locations[key] = (level_index, slot_index)
@@ -1,13 +1,14 @@
 from dataclasses import dataclass
 from datetime import datetime
-from typing import runtime_checkable, Protocol, Generator, Iterable, Callable, Tuple
+from functools import partial
+from types import CodeType
+from typing import runtime_checkable, Protocol, Generator, Iterable, Callable, Tuple, Any, Optional
 
-from marshmallow.validate import Length
 from pyannotating import Special
-from pyhandling import on_condition, close, then, callmethod, mergely, take, return_, previous_action_decorator_of, next_action_decorator_of, getitem_of, by, documenting_by
+from pyhandling import on_condition, close, then, callmethod, mergely, take, return_, previous_action_decorator_of, next_action_decorator_of, getitem_of, by, documenting_by, returnly, eventually, post_partial, ActionChain, ArgumentKey
 from pyhandling.annotations import handler, reformer_of
 
-from orm import db
+from tools.errors import ReportingError
 
 
 @runtime_checkable
@@ -23,10 +24,6 @@ def status_code_parsing_with_default(default_status_code: int) -> Callable[Speci
     )
 
 
-def length_validator_by_column(column: str, model: db.Model) -> Length:
-    return Length(max=getattr(model, column).comparator.type.length)
-
-
 def ascii_range_as(range_: range) -> Generator[str, None, None]:
     return (chr(symbol_index) for symbol_index in range_)
 
@@ -48,6 +45,20 @@ def dict_value_map(value_transformer: handler, dict_: dict) -> dict:
     }
 
 
+def chunks_of(max_chunk_size: int, items: Iterable) -> Generator[Tuple, None, None]:
+    chunk = list()
+
+    for item in items:
+        chunk.append(item)
+
+        if len(chunk) >= max_chunk_size:
+            yield tuple(chunk)
+            chunk = list()
+
+    if chunk:
+        yield tuple(chunk)
+
+
 def combine_data_chunks(first_chunk: Iterable, second_chunk: Iterable) -> Iterable:
     if all(map(is_iterable_but_not_dict, (first_chunk, second_chunk))):
         return (*first_chunk, *second_chunk)
@@ -87,4 +98,235 @@ swap_keys_and_values: reformer_of[dict] = documenting_by(
     (callmethod |by| "items")
     |then>> close(map)(getitem_of |by| slice(1, 1, -1))
     |then>> dict
-)
\ No newline at end of file
+)
+
+def fused(action: Callable) -> Callable:
+    """
+    Function to compile an action built from pyhandling combinators into a
+    single generated function with the same behavior.
+
+    Unfolds action chains, partials, post partials, `on_condition`, `returnly`,
+    `eventually`, `mergely` and `merge` so that they take no wrapper calls.
+    Other callables are called as they are.
+    """
+
+    compiler = _FusionCompiler()
+    result_name = compiler.compile(action, _FusedArguments(("*args", ), ("kwargs", )), depth=1)
+
+    source = "\n".join(("def fused(*args, **kwargs):", *compiler.lines, f"    return {result_name}"))
+    namespace = dict(compiler.constants)
+
+    exec(compile(source, f"<fused {getattr(action, '__name__', type(action).__name__)}>", "exec"), namespace)
+
+    fused_action = namespace["fused"]
+    fused_action.__wrapped__ = action
+
+    for attribute_name in ("__name__", "__qualname__", "__doc__"):
+        if hasattr(action, attribute_name):
+            setattr(fused_action, attribute_name, getattr(action, attribute_name))
+
+    return fused_action
+
+
+@dataclass(frozen=True)
+class _FusedArguments:
+    positional: Tuple[str, ...]
+    keyword_packs: Tuple[str, ...] = tuple()
+
+    @property
+    def is_reusable(self) -> bool:
+        return all(not argument.startswith("*") or argument == "*args" for argument in self.positional)
+
+    def __str__(self) -> str:
+        return ", ".join((*self.positional, *(f"**{keyword_pack}" for keyword_pack in self.keyword_packs)))
+
+
+class _FusionCompiler:
+    _max_depth: int = 64
+
+    def __init__(self):
+        self.lines = list()
+        self.constants = dict()
+        self._name_number = 0
+
+    def compile(self, action: Callable, arguments: _FusedArguments, *, depth: int) -> str:
+        if depth > self._max_depth:
+            return self._compile_call(action, arguments, depth=depth)
+
+        if isinstance(action, ActionChain) and action.handlers:
+            result_name = self.compile(action.handlers[0], arguments, depth=depth)
+
+            for handler_ in action.handlers[1:]:
+                result_name = self.compile(handler_, _FusedArguments((result_name, )), depth=depth)
+
+            return result_name
+
+        if type(action) is partial:
+            return self.compile(
+                action.func,
+                _FusedArguments(
+                    (*map(self._constant_name_of, action.args), *arguments.positional),
+                    (
+                        (self._constant_name_of(action.keywords), )
+                        if not arguments.keyword_packs
+                        else ("{" + ", ".join(f"**{keyword_pack}" for keyword_pack in (
+                            self._constant_name_of(action.keywords),
+                            *arguments.keyword_packs
+                        )) + "}", )
+                    ) if action.keywords else arguments.keyword_packs
+                ),
+                depth=depth + 1
+            )
+
+        closure_values = _closure_values_of(action)
+
+        if closure_values is None:
+            return self._compile_call(action, arguments, depth=depth)
+
+        code = action.__code__
+
+        if code is _post_partial_code:
+            return self.compile(
+                closure_values["func"],
+                _FusedArguments(
+                    (*arguments.positional, *map(self._constant_name_of, closure_values["args"])),
+                    (*arguments.keyword_packs, self._constant_name_of(closure_values["kwargs"]))
+                ),
+                depth=depth + 1
+            )
+
+        if code is _eventually_code:
+            return self.compile(closure_values["func"], _FusedArguments(tuple()), depth=depth + 1)
+
+        if not arguments.is_reusable:
+            return self._compile_call(action, arguments, depth=depth)
+
+        if code is _on_condition_code:
+            return self._compile_branching(closure_values, arguments, depth=depth + 1)
+
+        if (
+            code is _returnly_code
+            and closure_values["argument_key_to_return"] == ArgumentKey(0)
+            and arguments.positional
+            and arguments.positional[0] != "*args"
+        ):
+            self.compile(closure_values["func"], arguments, depth=depth + 1)
+
+            return arguments.positional[0]
+
+        if code is _mergely_code:
+            # Keyword functions are called before positional ones, as the
+            # positional generator of `mergely` is unpacked only by its call
+            factory_result_name = self.compile(closure_values["merge_function_factory"], arguments, depth=depth + 1)
+            keyword_parallel_result_names = {
+                keyword: self.compile(keyword_parallel_function, arguments, depth=depth + 1)
+                for keyword, keyword_parallel_function in closure_values["keyword_parallel_functions"].items()
+            }
+            parallel_result_names = tuple(
+                self.compile(parallel_function, arguments, depth=depth + 1)
+                for parallel_function in closure_values["parallel_functions"]
+            )
+
+            merged_arguments = ", ".join((
+                *parallel_result_names,
+                *(f"{keyword}={name}" for keyword, name in keyword_parallel_result_names.items())
+            ))
+
+            return self._assigned(f"{factory_result_name}({merged_arguments})")
+
+        if code is _merge_code:
+            return self._assigned(
+                "(" + "".join(
+                    f"{self.compile(func, arguments, depth=depth + 1)}, " for func in closure_values["funcs"]
+                ) + ")"
+            )
+
+        return self._compile_call(action, arguments, depth=depth)
+
+    def _compile_branching(self, closure_values: dict, arguments: _FusedArguments, *, depth: int) -> str:
+        result_name = self._new_name()
+        condition_name = self.compile(closure_values["condition_checker"], arguments, depth=depth)
+
+        self.lines.append(f"    if {condition_name}:")
+        branch_start_index = len(self.lines)
+        positive_result_name = self.compile(closure_values["positive_condition_func"], arguments, depth=depth)
+        self.lines.append(f"    {result_name} = {positive_result_name}")
+        self.lines[branch_start_index:] = [f"    {line}" for line in self.lines[branch_start_index:]]
+
+        self.lines.append("    else:")
+        branch_start_index = len(self.lines)
+        negative_result_name = self.compile(closure_values["else_"], arguments, depth=depth)
+        self.lines.append(f"    {result_name} = {negative_result_name}")
+        self.lines[branch_start_index:] = [f"    {line}" for line in self.lines[branch_start_index:]]
+
+        return result_name
+
+    def _compile_call(self, action: Callable, arguments: _FusedArguments, *, depth: int) -> str:
+        return self._assigned(f"{self._constant_name_of(action)}({arguments})")
+
+    def _assigned(self, expression: str) -> str:
+        name = self._new_name()
+        self.lines.append(f"    {name} = {expression}")
+
+        return name
+
+    def _constant_name_of(self, value: Any) -> str:
+        name = f"constant_{len(self.constants)}"
+        self.constants[name] = value
+
+        return name
+
+    def _new_name(self) -> str:
+        self._name_number += 1
+
+        return f"value_{self._name_number}"
+
+
+def _closure_values_of(action: Callable) -> Optional[dict[str, Any]]:
+    code = getattr(action, "__code__", None)
+    closure = getattr(action, "__closure__", None)
+
+    if code not in _fusible_codes or closure is None:
+        return None
+
+    return dict(zip(code.co_freevars, (cell.cell_contents for cell in closure)))
+
+
+def _fusible_code_of(action: Callable, freevar_names: Iterable[str]) -> Optional[CodeType]:
+    """
+    Function to get the code of functions built like the input combinator
+    result, if it has all the input closure variables the fusion unfolds.
+
+    Combinators of pyhandling versions building their results in another shape
+    get None, so that their results are called as they are.
+    """
+
+    code = getattr(action, "__code__", None)
+
+    if code is None or not set(freevar_names) <= set(code.co_freevars):
+        return None
+
+    return code
+
+
+_post_partial_code = _fusible_code_of(post_partial(return_), ("func", "args", "kwargs"))
+_on_condition_code = _fusible_code_of(
+    on_condition(return_, return_),
+    ("condition_checker", "positive_condition_func", "else_")
+)
+_eventually_code = _fusible_code_of(eventually(return_), ("func", ))
+_returnly_code = _fusible_code_of(returnly(return_), ("func", "argument_key_to_return"))
+_mergely_code = _fusible_code_of(
+    mergely(return_),
+    ("merge_function_factory", "parallel_functions", "keyword_parallel_functions")
+)
+_merge_code = _fusible_code_of(merge(return_), ("funcs", ))
+
+_fusible_codes = frozenset(code for code in (
+    _post_partial_code,
+    _on_condition_code,
+    _eventually_code,
+    _returnly_code,
+    _mergely_code,
+    _merge_code,
+) if code is not None)
@@ -1,40 +1,62 @@
-from typing import Iterable
+from re import compile as compile_regex, escape, Pattern
+from typing import Iterable, Optional
 
 from marshmallow import ValidationError
+from marshmallow.validate import Length
 from pyhandling import DelegatingProperty
 
+from orm import db
 
-class _CharacterAttribute:
-    characters = DelegatingProperty("__characters", settable=True, setting_converter=frozenset)
 
-    def __init__(self, characters: Iterable[str]):
-        self.characters = characters
-
-    def __get__(self, instance: any, owner: any) -> any:
-        return self.characters
-
-    def __set__(self, instance: any, characters: Iterable[str]) -> None:
-        self.characters = characters
+class CharactersValidator:
+    """
+    Validator of characters in a line, compiling allowed and extra characters
+    into a single regular expression character class once on creation.
+    """
 
+    extra_characters = DelegatingProperty("_extra_characters")
+    allowable_characters = DelegatingProperty("_allowable_characters")
 
-class CharactersValidator:
     def __init__(self, extra_characters: Iterable[str] = tuple(), allowable_characters: Iterable[str] = tuple(), line_name='The line'):
-        self.extra_characters = _CharacterAttribute(extra_characters)
-        self.allowable_characters = _CharacterAttribute(allowable_characters)
+        self._extra_characters = frozenset(extra_characters)
+        self._allowable_characters = frozenset(allowable_characters)
         self.line_name = line_name
 
+        self._wrong_character_pattern = _wrong_character_pattern_by(
+            self._extra_characters,
+            self._allowable_characters
+        )
+
     def __call__(self, line: str) -> None:
-        line_characters = frozenset(line)
-        extra_characters = (
-            (line_characters - self.allowable_characters.characters)
-            if self.allowable_characters.characters else frozenset()
-            | self.extra_characters.characters & line_characters
+        if self._wrong_character_pattern is None or self._wrong_character_pattern.search(line) is None:
+            return
+
+        raise ValidationError(
+            "{line_name} has extra characters: {extra_characters}".format(
+                line_name=self.line_name,
+                extra_characters=', '.join(dict.fromkeys(self._wrong_character_pattern.findall(line)))
+            ).capitalize()
         )
 
-        if extra_characters:
-            raise ValidationError(
-                "{line_name} has extra characters: {extra_characters}".format(
-                    line_name=self.line_name,
-                    extra_characters=', '.join(extra_characters)
-                ).capitalize()
-            )
+
+def _wrong_character_pattern_by(
+    extra_characters: frozenset[str],
+    allowable_characters: frozenset[str]
+) -> Optional[Pattern]:
+    character_classes = list()
+
+    if allowable_characters:
+        character_classes.append(f"[^{_character_class_body_of(allowable_characters)}]")
+
+    if extra_characters:
+        character_classes.append(f"[{_character_class_body_of(extra_characters)}]")
+
+    return compile_regex('|'.join(character_classes)) if character_classes else None
+
+
+def _character_class_body_of(characters: frozenset[str]) -> str:
+    return ''.join(map(escape, sorted(characters)))
+
+
+def length_validator_by_column(column: str, model: db.Model) -> Length:
+    return Length(max=getattr(model, column).comparator.type.length)